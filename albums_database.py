@@ -3,6 +3,11 @@ albums_database.py
 
 Database of albums and songs for the Song-Guesser game.
 This file contains a structured collection of albums and songs from various artists.
+
+Each album has a "release_year", "cover_art" and a list of "songs". An album may also
+have an "aliases" dict mapping a song title to the alternate or short titles players
+commonly use for it. Simple short forms (parts of "A / B" titles, titles without a
+trailing "(...)" or "[...]", "&" spelled as "and") are derived automatically.
 """
 
 # The Weeknd Albums and Songs Database
@@ -41,7 +46,11 @@ the_weeknd_albums = {
             "Next",
             "Echoes of Silence",
             "Till Dawn (Here Comes the Sun)"
-        ]
+        ],
+        "aliases": {
+            "The Party & The After Party": ["The Party", "The After Party"],
+            "Till Dawn (Here Comes the Sun)": ["Here Comes the Sun"]
+        }
     },
     "Kiss Land": {
         "release_year": 2013,
@@ -576,7 +585,10 @@ kanye_west_albums = {
             "Facts (Charlie Heat Version)",
             "Fade",
             "Saint Pablo"
-        ]
+        ],
+        "aliases": {
+            "Pt. 2": ["Father Stretch My Hands Pt. 2"]
+        }
     },
     "ye": {
         "release_year": 2018,
@@ -1350,7 +1362,10 @@ xxxtentacion_albums = {
             "Hope",
             "schizophrenia",
             "before I close my eyes"
-        ]
+        ],
+        "aliases": {
+            "$$$ (Money)": ["Money"]
+        }
     },
     "Skins": {
         "release_year": 2018,
@@ -1743,6 +1758,9 @@ bring_me_the_horizon_albums = {
             "dELTA",
             "DiE4EVA",
             "sTraNgeRs² [w/ AI]"
-        ]
+        ],
+        "aliases": {
+            "sTraNgeRs² [w/ AI]": ["Strangers 2", "Strangers Squared"]
+        }
     }
 }
\ No newline at end of file
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+benchmarks/fake_genius.py
+
+Local stand-ins for Genius used by the benchmarks, so lyric fetching can be exercised
+offline and reproducibly.
+
+FakeGenius has the search_song interface of lyricsgenius.Genius and answers in-process
+after a configurable delay. Install it with lyrics.set_genius(FakeGenius(...)).
+
+FakeGeniusServer is an HTTP service mimicking the endpoints lyricsgenius.Genius.search_song
+uses: the public search (/api/search/multi), song details (/v1/songs/<id>) and the lyrics
+page it scrapes. It serves a fixture corpus (every catalog song with generated lyrics,
+plus the edge cases in fixtures/genius_fixtures.json) with tunable latency, error rate
+and rate limiting. Point the game at it with MELO_GENIUS_URL and any token:
+
+    python benchmarks/fake_genius.py --port 8777 --latency-ms 150 --error-rate 0.01
+    MELO_GENIUS_URL=http://127.0.0.1:8777 GENIUS_ACCESS_TOKEN=fake python main.py
+"""
+
+import argparse
+import html
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "genius_fixtures.json")
+
+# Words the generated lyrics are made of
+WORDS = ("love", "night", "baby", "heart", "city", "lights", "forever", "dancing", "tears",
+         "money", "summer", "dream", "cold", "fire", "alone", "tonight", "gold", "running",
+         "highway", "midnight", "blue", "wild", "stars", "falling", "home", "never", "again",
+         "you", "me", "we", "they", "I", "know", "want", "feel", "say", "the", "a", "in", "on",
+         "and", "but", "when", "like", "my", "your", "all", "away", "down", "through")
+
+
+class FakeSong:
+    """Search result with the attributes of a lyricsgenius Song that the game reads"""
+
+    __slots__ = ("title", "artist", "lyrics")
+
+    def __init__(self, title, artist, lyrics):
+        self.title = title
+        self.artist = artist
+        self.lyrics = lyrics
+
+
+def generate_lyrics(title, artist, verses=3, lines_per_verse=6):
+    """
+    Deterministic lyrics for a song, laid out like a Genius lyrics page: a header line,
+    bracketed section labels and a trailing Embed line that the line cleaner drops.
+
+    Args:
+        title (str): Song title
+        artist (str): Artist name
+        verses (int): Number of sections
+        lines_per_verse (int): Lyric lines per section
+
+    Returns:
+        str: Lyrics text
+    """
+    rng = random.Random(f"{artist}\n{title}")
+    lines = [f"{rng.randint(1, 400)} Contributors{title} Lyrics"]
+    for verse in range(1, verses + 1):
+        lines.append(f"[Verse {verse}]" if verse % 2 else "[Chorus]")
+        for _ in range(lines_per_verse):
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 11))).capitalize())
+        lines.append("")
+    lines.append(f"{rng.randint(1, 99)}Embed")
+    return "\n".join(lines)
+
+
+class FakeGenius:
+    """
+    In-process Genius client with tunable latency and failures.
+    """
+
+    def __init__(self, latency_ms=150, jitter_ms=50, error_rate=0.0, missing_rate=0.0, seed=None):
+        """
+        Args:
+            latency_ms (float): Mean delay of a search, in milliseconds
+            jitter_ms (float): Uniform +/- variation of the delay
+            error_rate (float): Share of searches that raise ConnectionError
+            missing_rate (float): Share of songs that are never found
+            seed (int): Seed for the latency and error draws
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.missing_rate = missing_rate
+        self.rng = random.Random(seed)
+        self.searches = 0
+        self.songs = set()
+        self._lock = threading.Lock()
+
+    def search_song(self, title, artist):
+        """
+        Look a song up, after the configured delay.
+
+        Returns:
+            FakeSong or None: The song, or None if it is one of the missing songs
+        """
+        with self._lock:
+            self.searches += 1
+            self.songs.add((title, artist))
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self.rng.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise ConnectionError("Fake Genius: simulated network error")
+        if random.Random(f"missing\n{artist}\n{title}").random() < self.missing_rate:
+            return None
+        return FakeSong(title, artist, generate_lyrics(title, artist))
+
+
+def slugify(text):
+    """Genius-style URL slug"""
+    return re.sub(r"[^A-Za-z0-9]+", "-", text).strip("-").capitalize()
+
+
+def search_key(text):
+    """Loose form of a search term or title for matching"""
+    return " ".join(re.sub(r"[^\w]+", " ", text.lower()).split())
+
+
+def load_corpus(catalog=None, fixtures_path=FIXTURES_PATH):
+    """
+    Build the fixture corpus: every catalog song with generated lyrics, with the entries
+    of the fixtures file added or replacing generated ones.
+
+    Args:
+        catalog (Catalog): Catalog to cover, defaults to the shared catalog
+        fixtures_path (str): JSON list of {title, artist, lyrics, instrumental?} entries
+
+    Returns:
+        list: Song dicts with id, title, artist, lyrics, instrumental and slug
+    """
+    if catalog is None:
+        sys.path.insert(0, REPO_DIR)
+        from catalog import get_catalog
+
+        catalog = get_catalog()
+
+    songs = {}
+    for name in catalog.artist_names():
+        for song in catalog.artist(name).songs:
+            songs[(song.title, song.artist)] = {"title": song.title, "artist": song.artist,
+                                                "lyrics": generate_lyrics(song.title, song.artist),
+                                                "instrumental": False}
+    if fixtures_path and os.path.exists(fixtures_path):
+        with open(fixtures_path, "r", encoding="utf-8") as fixtures_file:
+            for entry in json.load(fixtures_file):
+                songs[(entry["title"], entry["artist"])] = dict(entry, instrumental=entry.get("instrumental", False))
+
+    corpus = []
+    for song_id, song in enumerate(songs.values(), 1):
+        song["id"] = song_id
+        song["slug"] = f"{slugify(song['artist'])}-{slugify(song['title'])}-lyrics"
+        corpus.append(song)
+    return corpus
+
+
+def song_json(song, base_url):
+    """The song object of a Genius API response, with the fields lyricsgenius reads"""
+    artist_id = zlib.crc32(song["artist"].encode("utf-8")) % 10 ** 6
+    url = f"https://genius.com/{song['slug']}"  # lyricsgenius strips this prefix to get the page path
+    return {
+        "id": song["id"],
+        "title": song["title"],
+        "title_with_featured": song["title"],
+        "full_title": f"{song['title']} by {song['artist']}",
+        "url": url,
+        "path": f"/{song['slug']}",
+        "api_path": f"/songs/{song['id']}",
+        "lyrics_state": "complete",
+        "instrumental": song["instrumental"],
+        "lyrics_owner_id": 1,
+        "annotation_count": 0,
+        "pyongs_count": 0,
+        "header_image_url": f"{base_url}/images/{song['id']}.png",
+        "header_image_thumbnail_url": f"{base_url}/images/{song['id']}.thumb.png",
+        "song_art_image_url": f"{base_url}/images/{song['id']}.png",
+        "song_art_image_thumbnail_url": f"{base_url}/images/{song['id']}.thumb.png",
+        "stats": {"unreviewed_annotations": 0, "hot": False, "pageviews": 1000 + song["id"]},
+        "featured_artists": [],
+        "primary_artist": {
+            "id": artist_id,
+            "name": song["artist"],
+            "url": f"https://genius.com/artists/{slugify(song['artist'])}",
+            "api_path": f"/artists/{artist_id}",
+            "image_url": f"{base_url}/images/artist-{artist_id}.png",
+            "header_image_url": f"{base_url}/images/artist-{artist_id}.png",
+            "is_meme_verified": False,
+            "is_verified": False
+        }
+    }
+
+
+def lyrics_page(song):
+    """HTML lyrics page in the layout lyricsgenius scrapes"""
+    body = "<br/>".join(html.escape(line) for line in song["lyrics"].split("\n"))
+    return (f"<!DOCTYPE html><html><head><title>{html.escape(song['artist'])} – "
+            f"{html.escape(song['title'])} Lyrics | Genius Lyrics</title></head><body>"
+            f'<div class="Lyrics__Root-sc-1ynbvzw-0" data-lyrics-container="true">{body}</div>'
+            "</body></html>")
+
+
+class FakeGeniusServer(ThreadingHTTPServer):
+    """
+    HTTP stand-in for the Genius API, public API and lyrics pages.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, corpus=None, latency_ms=150, jitter_ms=50,
+                 error_rate=0.0, rate_limit=0, missing_rate=0.0, seed=None):
+        """
+        Args:
+            host (str): Interface to listen on
+            port (int): Port, 0 for any free port
+            corpus (list): Songs to serve, defaults to load_corpus()
+            latency_ms (float): Mean delay of every response, in milliseconds
+            jitter_ms (float): Uniform +/- variation of the delay
+            error_rate (float): Share of requests answered with 500
+            rate_limit (float): Requests per second allowed before answering 429 (0: no limit)
+            missing_rate (float): Share of songs the search never finds
+            seed (int): Seed for the latency and error draws
+        """
+        super().__init__((host, port), FakeGeniusHandler)
+        self.corpus = corpus if corpus is not None else load_corpus()
+        self.by_id = {song["id"]: song for song in self.corpus}
+        self.by_slug = {song["slug"]: song for song in self.corpus}
+        self.by_search = {}
+        for song in self.corpus:
+            self.by_search.setdefault(search_key(f"{song['title']} {song['artist']}"), song)
+            self.by_search.setdefault(search_key(song["title"]), song)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.missing_rate = missing_rate
+        self.rng = random.Random(seed)
+        self.counts = {"search": 0, "song": 0, "page": 0, "errors": 0, "rate_limited": 0, "not_found": 0}
+        self._lock = threading.Lock()
+        self._tokens = float(rate_limit)
+        self._refilled_at = time.monotonic()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit(self):
+        """
+        Decide the fate of a request: sleep for the latency, then 'ok', 'error' or
+        'rate_limited'.
+        """
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            failed = self.rng.random() < self.error_rate
+            limited = False
+            if self.rate_limit:
+                # Token bucket holding up to one second of requests
+                now = time.monotonic()
+                self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                else:
+                    limited = True
+            if limited:
+                self.counts["rate_limited"] += 1
+            elif failed:
+                self.counts["errors"] += 1
+        time.sleep(delay)
+        return "rate_limited" if limited else "error" if failed else "ok"
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def is_missing(self, song):
+        return random.Random(f"missing\n{song['artist']}\n{song['title']}").random() < self.missing_rate
+
+    def search(self, query):
+        """Search hits for a query, best match first"""
+        key = search_key(query)
+        song = self.by_search.get(key)
+        if song is None:
+            # Longest title contained in the query
+            matches = [candidate for candidate in self.corpus if search_key(candidate["title"]) in key]
+            song = max(matches, key=lambda candidate: len(candidate["title"]), default=None)
+        if song is None or self.is_missing(song):
+            return []
+        return [song]
+
+
+class FakeGeniusHandler(BaseHTTPRequestHandler):
+    """Routes requests to the FakeGeniusServer's corpus"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def send_body(self, status, body, content_type="application/json"):
+        if not isinstance(body, (bytes, str)):
+            body = json.dumps(body, ensure_ascii=False)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_api(self, status, response=None, message=None):
+        meta = {"status": status}
+        if message:
+            meta["message"] = message
+        payload = {"meta": meta}
+        if response is not None:
+            payload["response"] = response
+        self.send_body(status, payload)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        path = url.path
+
+        if path == "/_stats":
+            self.send_body(200, dict(server.counts, songs=len(server.corpus)))
+            return
+
+        fate = server.admit()
+        if fate == "rate_limited":
+            self.send_api(429, message="Rate limit exceeded")
+            return
+        if fate == "error":
+            self.send_api(500, message="Fake Genius: simulated server error")
+            return
+
+        if path in ("/api/search/multi", "/api/search/song", "/api/search"):
+            server.count("search")
+            query = parse_qs(url.query).get("q", [""])[0]
+            hits = [{"index": "song", "type": "song", "highlights": [], "result": song_json(song, server.url)}
+                    for song in server.search(query)]
+            self.send_api(200, {"sections": [{"type": "top_hit", "hits": hits[:1]},
+                                             {"type": "song", "hits": hits}]})
+        elif path.startswith("/v1/songs/"):
+            server.count("song")
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                self.send_api(401, message="This call requires an access_token.")
+                return
+            song = server.by_id.get(int(path.rsplit("/", 1)[1])) if path.rsplit("/", 1)[1].isdigit() else None
+            if song is None:
+                server.count("not_found")
+                self.send_api(404, message="Not found")
+            else:
+                self.send_api(200, {"song": song_json(song, server.url)})
+        else:
+            server.count("page")
+            song = server.by_slug.get(path.lstrip("/"))
+            if song is None:
+                server.count("not_found")
+                self.send_body(404, "<html><body>Page not found</body></html>", "text/html")
+            else:
+                self.send_body(200, lyrics_page(song), "text/html")
+
+
+def start_server(**options):
+    """
+    Start a FakeGeniusServer on a background thread.
+
+    Returns:
+        FakeGeniusServer: The running server; call shutdown() to stop it
+    """
+    server = FakeGeniusServer(**options)
+    threading.Thread(target=server.serve_forever, name="fake-genius", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Genius API")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8777, help="port to listen on")
+    parser.add_argument("--latency-ms", type=float, default=150, help="mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="response latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests per second before 429s (0: none)")
+    parser.add_argument("--missing-rate", type=float, default=0.0, help="share of songs never found")
+    parser.add_argument("--seed", type=int, default=1, help="seed for latency and error draws")
+    args = parser.parse_args()
+
+    server = FakeGeniusServer(args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                              error_rate=args.error_rate, rate_limit=args.rate_limit,
+                              missing_rate=args.missing_rate, seed=args.seed)
+    print(f"Fake Genius serving {len(server.corpus)} songs on {server.url}")
+    print(f"Use it with: MELO_GENIUS_URL={server.url} GENIUS_ACCESS_TOKEN=fake python main.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
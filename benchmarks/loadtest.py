@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+benchmarks/loadtest.py
+
+Load test for the Song-Guesser game with simulated players.
+Each player picks a selection and plays rounds: waits for the round, types part of a
+title with an autocomplete query per keystroke, sometimes asks for a hint or guesses
+wrong, then answers or skips. Players run against the headless engine (the shared
+RoundScheduler, as the server uses it) or against the WebSocket server, with lyrics
+served by a local Genius stand-in with configurable latency (benchmarks/fake_genius.py).
+
+Reports throughput, p50/p95/p99 round and autocomplete latency, lyrics cache hit rate
+and how many Genius searches were made per distinct song.
+
+Usage:
+    python benchmarks/loadtest.py [--target engine|server] [--players 200] [--rounds 10]
+                                  [--latency-ms 150] [--url ws://host:port/ws] [--json load.json]
+
+--target server starts a server in this process unless --url points at a running one;
+a separately started server needs its own Genius stand-in (see benchmarks/fake_genius.py).
+Server players do not know the answers, so they skip where engine players guess right.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from urllib.parse import urlparse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Every run starts from an empty lyrics cache unless one is given
+os.environ.setdefault("MELO_LYRICS_CACHE", tempfile.mkdtemp(prefix="melo-loadtest-"))
+
+from catalog import get_catalog
+from engine import GameEngine
+import lyrics
+from rounds import RoundScheduler
+from fake_genius import FakeGenius
+
+WRONG_GUESS = "definitely not a song title"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class LoadStats:
+    """Counters and latency samples shared by all simulated players"""
+
+    def __init__(self):
+        self.round_latencies = []
+        self.suggest_latencies = []
+        self.rounds = 0
+        self.guesses = 0
+        self.hints = 0
+        self.skips = 0
+        self.messages = 0
+        self.errors = 0
+
+
+class WebSocketClient:
+    """Minimal WebSocket client for simulated players (text frames only)"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host, port, path="/ws"):
+        reader, writer = await asyncio.open_connection(host, port)
+        key = "bWVsby1sb2FkdGVzdC1rZXk="
+        writer.write((f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                      "Sec-WebSocket-Version: 13\r\n\r\n").encode("ascii"))
+        head = await reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 101"):
+            raise ConnectionError(f"WebSocket upgrade refused: {head.splitlines()[0]!r}")
+        return cls(reader, writer)
+
+    async def send(self, message):
+        from websocket import unmask
+
+        payload = json.dumps(message).encode("utf-8")
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x81, 0x80 | length)
+        else:
+            header = struct.pack("!BBH", 0x81, 0x80 | 126, length)
+        self.writer.write(header + mask + unmask(payload, mask))
+        await self.writer.drain()
+
+    async def receive(self, *kinds):
+        """Next message, skipping any whose type is not in kinds (if given)"""
+        while True:
+            first, second = await self.reader.readexactly(2)
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+            payload = await self.reader.readexactly(length)
+            if first & 0x0F != 0x1:
+                continue
+            message = json.loads(payload)
+            if not kinds or message.get("type") in kinds:
+                return message
+
+    def close(self):
+        self.writer.close()
+
+
+def pick_selection(catalog, rng):
+    """A random artist and either All Albums or one of their albums"""
+    artist = catalog.artist(rng.choice(catalog.artist_names()))
+    if rng.random() < 0.5:
+        return artist, "All Albums", artist.song_ids
+    album = rng.choice(artist.albums)
+    return artist, album.name, album.song_ids
+
+
+async def engine_player(args, rng, stats, catalog, scheduler):
+    """One simulated player on the headless engine, preparing rounds like a server session"""
+    engine = GameEngine(catalog, rng)
+    artist, album, songs = pick_selection(catalog, rng)
+    engine.select(artist.name, album, songs)
+    pending = asyncio.wrap_future(scheduler.prepare(engine.draw_playable_song()))
+
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        try:
+            round_ = await pending
+        except Exception:
+            stats.errors += 1
+            pending = asyncio.wrap_future(scheduler.prepare(engine.draw_playable_song()))
+            continue
+        engine.start_round(round_)
+        pending = asyncio.wrap_future(scheduler.prepare(engine.draw_playable_song()))
+        stats.round_latencies.append(time.perf_counter() - start)
+        stats.rounds += 1
+
+        title = engine.current_song
+        for length in range(1, min(len(title), args.typed_chars) + 1):
+            began = time.perf_counter()
+            engine.suggestions(title[:length])
+            stats.suggest_latencies.append(time.perf_counter() - began)
+            if args.keystroke_ms:
+                await asyncio.sleep(args.keystroke_ms / 1000)
+
+        if rng.random() < args.hint_rate:
+            engine.show_hint()
+            stats.hints += 1
+        if rng.random() < args.wrong_rate:
+            engine.submit_guess(WRONG_GUESS)
+            stats.guesses += 1
+        if rng.random() < args.skip_rate:
+            engine.skip_song()
+            stats.skips += 1
+        else:
+            engine.submit_guess(title)
+            stats.guesses += 1
+        await asyncio.sleep(args.think_ms / 1000)
+    pending.cancel()
+
+
+async def server_player(args, rng, stats, catalog, host, port):
+    """One simulated player over the server's WebSocket protocol"""
+    client = await WebSocketClient.connect(host, port)
+    try:
+        await client.receive("hello")
+        artist, album, songs = pick_selection(catalog, rng)
+        start = time.perf_counter()
+        await client.send({"type": "select", "artist": artist.name, "album": album})
+        stats.messages += 1
+
+        for _ in range(args.rounds):
+            message = await client.receive("round", "error")
+            stats.messages += 1
+            if message["type"] == "error":
+                stats.errors += 1
+                return
+            stats.round_latencies.append(time.perf_counter() - start)
+            stats.rounds += 1
+
+            # Players type a title from the selection, as they would after reading the lyric
+            title = catalog.song(rng.choice(songs)).title
+            for length in range(1, min(len(title), args.typed_chars) + 1):
+                began = time.perf_counter()
+                await client.send({"type": "suggest", "text": title[:length]})
+                await client.receive("suggestions")
+                stats.suggest_latencies.append(time.perf_counter() - began)
+                stats.messages += 2
+                if args.keystroke_ms:
+                    await asyncio.sleep(args.keystroke_ms / 1000)
+
+            if rng.random() < args.hint_rate:
+                await client.send({"type": "hint"})
+                stats.hints += 1
+                stats.messages += 1
+            if rng.random() < args.wrong_rate:
+                await client.send({"type": "guess", "text": WRONG_GUESS})
+                await client.receive("result")
+                stats.guesses += 1
+                stats.messages += 2
+            await asyncio.sleep(args.think_ms / 1000)
+
+            start = time.perf_counter()
+            await client.send({"type": "skip"})
+            await client.receive("result")
+            stats.skips += 1
+            stats.messages += 2
+    finally:
+        client.close()
+
+
+async def run_load(args, stats, catalog):
+    """Start the players (and an in-process server if needed) and wait for them all"""
+    rngs = [random.Random(args.seed * 100003 + i) for i in range(args.players)]
+    server_task = None
+
+    if args.target == "engine":
+        scheduler = RoundScheduler(max_workers=args.workers)
+        players = [engine_player(args, rng, stats, catalog, scheduler) for rng in rngs]
+    else:
+        if args.url:
+            url = urlparse(args.url)
+            host, port = url.hostname, url.port
+        else:
+            from server import GameServer
+
+            game_server = GameServer(catalog, RoundScheduler(max_workers=args.workers))
+            ready = asyncio.get_running_loop().create_future()
+            server_task = asyncio.ensure_future(game_server.serve("127.0.0.1", 0, ready))
+            host, port = "127.0.0.1", await ready
+        players = [server_player(args, rng, stats, catalog, host, port) for rng in rngs]
+
+    results = await asyncio.gather(*players, return_exceptions=True)
+    stats.errors += sum(1 for result in results if isinstance(result, Exception))
+    if server_task is not None:
+        server_task.cancel()
+        await asyncio.gather(server_task, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Song-Guesser game with simulated players")
+    parser.add_argument("--target", choices=("engine", "server"), default="engine", help="what the players drive")
+    parser.add_argument("--url", help="WebSocket URL of a running server (--target server)")
+    parser.add_argument("--players", type=int, default=200, help="concurrent simulated players")
+    parser.add_argument("--rounds", type=int, default=10, help="rounds per player")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent lyric fetches")
+    parser.add_argument("--latency-ms", type=float, default=150, help="Genius stand-in mean latency")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="Genius stand-in latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of Genius searches that fail")
+    parser.add_argument("--typed-chars", type=int, default=4, help="autocomplete queries per round")
+    parser.add_argument("--keystroke-ms", type=float, default=0, help="delay between keystrokes")
+    parser.add_argument("--think-ms", type=float, default=0, help="delay before answering")
+    parser.add_argument("--hint-rate", type=float, default=0.2, help="share of rounds with a hint")
+    parser.add_argument("--wrong-rate", type=float, default=0.3, help="share of rounds with a wrong guess")
+    parser.add_argument("--skip-rate", type=float, default=0.2, help="share of rounds skipped")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the players' choices")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    fake = FakeGenius(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed)
+    lyrics.set_genius(fake)
+    catalog = get_catalog()
+    cache = lyrics.get_cache()
+    stats = LoadStats()
+
+    start = time.perf_counter()
+    asyncio.run(run_load(args, stats, catalog))
+    elapsed = time.perf_counter() - start
+
+    lookups = cache.hits + cache.misses
+    results = {
+        "target": args.target,
+        "players": args.players,
+        "elapsed_s": elapsed,
+        "rounds": stats.rounds,
+        "rounds_per_s": stats.rounds / elapsed,
+        "messages_per_s": stats.messages / elapsed,
+        "guesses": stats.guesses,
+        "hints": stats.hints,
+        "skips": stats.skips,
+        "errors": stats.errors,
+        "round_ms": {name: percentile(stats.round_latencies, fraction) * 1000
+                     for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "suggest_ms": {name: percentile(stats.suggest_latencies, fraction) * 1000
+                       for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "cache_hits": cache.hits,
+        "cache_misses": cache.misses,
+        "cache_hit_rate": cache.hits / lookups if lookups else 0.0,
+        "genius_searches": fake.searches,
+        "genius_songs": len(fake.songs)
+    }
+
+    print(f"{args.players} players on the {args.target}, {stats.rounds} rounds in {elapsed:.2f} s "
+          f"({results['rounds_per_s']:.0f} rounds/s, {results['messages_per_s']:.0f} messages/s)")
+    print("Round latency:        p50 {p50:.1f} ms • p95 {p95:.1f} ms • p99 {p99:.1f} ms".format(**results["round_ms"]))
+    print("Autocomplete latency: p50 {p50:.2f} ms • p95 {p95:.2f} ms • p99 {p99:.2f} ms".format(**results["suggest_ms"]))
+    print(f"Lyrics cache: {cache.hits} hits, {cache.misses} misses ({results['cache_hit_rate']:.1%} hit rate)")
+    print(f"Genius stand-in: {fake.searches} searches for {len(fake.songs)} distinct songs")
+    if stats.errors:
+        print(f"Errors: {stats.errors}")
+    if args.url:
+        print("Note: cache and Genius counters are this process's; check the server's GET / for its own")
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+    return 1 if stats.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
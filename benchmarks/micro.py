@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+benchmarks/micro.py
+
+Microbenchmarks for the Song-Guesser hot paths:
+    lyrics.*    get_random_lyric_line line cleaning, on fixture lyrics held in the cache
+    guess.*     GameEngine.is_correct_guess for exact, sloppy, typo and wrong guesses
+    suggest.*   GameEngine.suggestions (the on_guess_text_changed filtering) per keystroke
+    catalog.*   loading every artist of the real catalog and of a synthetic large one
+    dialog.*    SongSuggestionDialog.set_suggestions (skipped without PySide6)
+
+Each benchmark is calibrated to run for at least --min-time per repeat, repeated
+--repeat times, and reported as the median and minimum time per operation. Results are
+compared against a stored baseline (benchmarks/micro_baseline.json): a benchmark whose
+median is more than --threshold slower is flagged and the run exits non-zero. Baselines
+are machine-specific; record one for the machine that runs the comparison with
+--save-baseline. Only measured benchmarks are stored: a group skipped for a missing
+dependency (dialog.* without PySide6) keeps the entries of the previous baseline, and
+is recorded by saving on a machine that has the dependency.
+
+Usage:
+    python benchmarks/micro.py [--filter guess.] [--songs 20000] [--json results.json]
+                               [--baseline path] [--threshold 0.25] [--save-baseline]
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Benchmarks never touch the real lyrics cache or the network
+os.environ["MELO_LYRICS_CACHE"] = tempfile.mkdtemp(prefix="melo-micro-")
+
+from catalog import CATALOG_DIR, MANIFEST_NAME, Catalog, write_catalog
+from engine import GameEngine
+from rounds import Round
+import lyrics
+from fake_genius import load_corpus
+from keywords import configure_logging
+from synthetic_catalog import generate_artists
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "micro_baseline.json")
+
+
+def measure(operation, min_time, repeat):
+    """
+    Time an operation.
+
+    Args:
+        operation (callable): Runs one operation
+        min_time (float): Seconds each repeat runs for at least
+        repeat (int): Number of timed repeats
+
+    Returns:
+        dict: median_us and min_us per operation, loops per repeat and repeats
+    """
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        timings.append((time.perf_counter() - started) / loops)
+    return {"median_us": round(statistics.median(timings) * 1e6, 3),
+            "min_us": round(min(timings) * 1e6, 3),
+            "loops": loops, "repeats": repeat}
+
+
+def cycling(function, inputs):
+    """Operation calling function with each input in turn"""
+    next_input = itertools.cycle(inputs).__next__
+    return lambda: function(next_input())
+
+
+def typo(title, rng):
+    """A title with one character replaced"""
+    position = rng.randrange(len(title))
+    return title[:position] + ("x" if title[position] != "x" else "y") + title[position + 1:]
+
+
+def lyric_benchmarks(catalog):
+    """get_random_lyric_line over the fixture corpus, from the in-memory cache"""
+    corpus = load_corpus(catalog)
+    cache = lyrics.get_cache()
+    songs = []
+    for song in corpus:
+        cache.memory[(song["title"], song["artist"])] = song["lyrics"]
+        songs.append((song["title"], song["artist"]))
+    lyrics.set_cache_only(True)
+    random.seed(1)
+    return {"lyrics.random_line": cycling(lambda song: lyrics.get_random_lyric_line(*song), songs)}
+
+
+def guess_benchmarks(catalog, artist_name):
+    """is_correct_guess against one artist's title index"""
+    engine = GameEngine(catalog)
+    artist = catalog.artist(artist_name)
+    engine.select(artist_name, "All Albums", artist.song_ids)
+    song = artist.songs[0]
+    engine.start_round(Round(song.id, song.title, song.artist, "lyric", [], song.key))  # Guesses check against its artist
+    rng = random.Random(1)
+    titles = [song.title for song in rng.sample(artist.songs, min(500, len(artist.songs)))]
+
+    def check(pair):
+        return engine.is_correct_guess(*pair)
+
+    return {
+        "guess.exact": cycling(check, [(title, title) for title in titles]),
+        "guess.sloppy": cycling(check, [(f"  {title.upper()}!", title) for title in titles]),
+        "guess.typo": cycling(check, [(typo(title, rng), title) for title in titles]),
+        "guess.wrong": cycling(check, [("definitely not a song title", title) for title in titles])
+    }
+
+
+def suggestion_benchmarks(catalog, artist_names, label):
+    """Autocomplete queries per keystroke over a selection pool"""
+    engine = GameEngine(catalog)
+    song_ids = []
+    for name in artist_names:
+        song_ids.extend(catalog.artist(name).song_ids)
+    engine.select(artist_names[0] if len(artist_names) == 1 else "All Artists", "All Albums", song_ids)
+    rng = random.Random(1)
+    titles = [catalog.song(song_id).title for song_id in rng.sample(song_ids, min(200, len(song_ids)))]
+    return {
+        f"suggest.{label}.1_char": cycling(engine.suggestions, [title[:1] for title in titles]),
+        f"suggest.{label}.3_chars": cycling(engine.suggestions, [title[:3] for title in titles]),
+        f"suggest.{label}.full_title": cycling(engine.suggestions, titles)
+    }
+
+
+def catalog_benchmarks(manifest_path, label):
+    """Manifest read plus loading and indexing every artist"""
+    def load():
+        catalog = Catalog(manifest_path)
+        for name in catalog.artist_names():
+            catalog.artist(name)
+            catalog.title_index(name)
+
+    return {f"catalog.load_{label}": load}
+
+
+_qt_app = None
+
+
+def dialog_benchmarks(titles):
+    """SongSuggestionDialog.set_suggestions, on an offscreen Qt platform"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from gui import SongSuggestionDialog
+
+    global _qt_app
+    _qt_app = QApplication.instance() or QApplication([])
+    dialog = SongSuggestionDialog()
+    operations = {}
+    for size in (5, 50, 500):
+        lists = [titles[start:start + size] for start in range(0, len(titles) - size, max(1, size // 2))][:20]
+        operations[f"dialog.set_suggestions.{size}"] = cycling(dialog.set_suggestions, lists)
+    return operations
+
+
+def run_benchmarks(args):
+    """
+    Build the fixtures and run every benchmark whose name starts with args.filter.
+
+    Returns:
+        dict: Benchmark name -> result (or {"skipped": reason})
+    """
+    real_catalog = Catalog(os.path.join(CATALOG_DIR, MANIFEST_NAME))
+    synthetic_dir = tempfile.mkdtemp(prefix="melo-micro-catalog-")
+    synthetic_manifest = write_catalog(generate_artists(args.songs), synthetic_dir)
+    synthetic_catalog = Catalog(synthetic_manifest)
+    largest_real = max(real_catalog.artist_names(), key=real_catalog.song_count)
+
+    groups = [
+        ("lyrics", lambda: lyric_benchmarks(real_catalog)),
+        ("guess", lambda: guess_benchmarks(real_catalog, largest_real)),
+        ("guess", lambda: {f"{name}.synthetic": operation for name, operation in
+                           guess_benchmarks(synthetic_catalog, max(synthetic_catalog.artist_names(),
+                                                                   key=synthetic_catalog.song_count)).items()}),
+        ("suggest", lambda: suggestion_benchmarks(real_catalog, real_catalog.artist_names(), "all_artists")),
+        ("suggest", lambda: suggestion_benchmarks(synthetic_catalog, synthetic_catalog.artist_names(), "synthetic")),
+        ("catalog", lambda: catalog_benchmarks(os.path.join(CATALOG_DIR, MANIFEST_NAME), "real")),
+        ("catalog", lambda: catalog_benchmarks(synthetic_manifest, "synthetic")),
+        ("dialog", lambda: dialog_benchmarks([song.title for song in real_catalog.artist(largest_real).songs]))
+    ]
+
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        for group, build in groups:
+            if args.filter and not (group.startswith(args.filter) or args.filter.startswith(f"{group}.")):
+                continue
+            try:
+                with contextlib.redirect_stdout(devnull):
+                    operations = build()
+            except ImportError as e:
+                results[f"{group}.*"] = {"skipped": f"missing dependency: {e.name}"}
+                continue
+            for name, operation in operations.items():
+                if args.filter and not name.startswith(args.filter):
+                    continue
+                # Keep the log output of the measured code off the terminal
+                with contextlib.redirect_stdout(devnull):
+                    results[name] = measure(operation, args.min_time, args.repeat)
+                print(f"{name:<40} {results[name]['median_us']:>12.2f} us")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results to a baseline.
+
+    Args:
+        results (dict): Benchmark name -> result
+        baseline (dict): Baseline benchmark name -> result
+        threshold (float): Allowed slowdown of the median, as a fraction
+
+    Returns:
+        list: Names of the benchmarks that regressed
+    """
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline us':>12} {'now us':>12} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if "skipped" in result or not before or "median_us" not in before:
+            continue
+        change = result["median_us"] / before["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {before['median_us']:>12.2f} {result['median_us']:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def save_baseline(report, path):
+    """
+    Store measured results as the baseline. Skipped benchmarks are left out; the
+    previous baseline's entries for them are kept.
+
+    Args:
+        report (dict): Run metadata and results
+        path (str): Baseline file
+    """
+    benchmarks = {}
+    if os.path.exists(path):
+        with open(path, "r") as baseline_file:
+            previous = json.load(baseline_file)["benchmarks"]
+        skipped_groups = [name[:-1] for name, result in report["benchmarks"].items() if "skipped" in result]
+        benchmarks = {name: result for name, result in previous.items()
+                      if "skipped" not in result and name.startswith(tuple(skipped_groups))}
+    benchmarks.update((name, result) for name, result in report["benchmarks"].items()
+                      if "skipped" not in result)
+    with open(path, "w") as baseline_file:
+        json.dump(dict(report, benchmarks=benchmarks), baseline_file, indent=2)
+        baseline_file.write("\n")
+    print(f"Baseline saved: {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Song-Guesser microbenchmarks")
+    parser.add_argument("--filter", help="only run benchmarks whose name starts with this")
+    parser.add_argument("--songs", type=int, default=20000, help="songs in the synthetic catalog")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per timed repeat")
+    parser.add_argument("--repeat", type=int, default=7, help="timed repeats per benchmark")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    args = parser.parse_args()
+
+    # Log in the calling thread, so the stdout redirect around measured code catches it
+    configure_logging(async_console=False)
+    results = run_benchmarks(args)
+    report = {
+        "meta": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                 "machine": platform.machine(), "songs": args.songs},
+        "benchmarks": results
+    }
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"{name:<40} skipped ({result['skipped']})")
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(report, json_file, indent=2)
+
+    if args.save_baseline:
+        save_baseline(report, args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with; record one with --save-baseline")
+        return 0
+    with open(args.baseline, "r") as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline["meta"].get("songs") != args.songs:
+        print(f"Note: the baseline used a {baseline['meta'].get('songs')}-song synthetic catalog")
+    regressions = compare(results, baseline["benchmarks"], args.threshold)
+    if regressions:
+        print(f"FAIL: {len(regressions)} benchmark(s) more than {args.threshold:.0%} slower than the baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
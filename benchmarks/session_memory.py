@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+benchmarks/session_memory.py
+
+Per-session memory cost of the Song-Guesser game state.
+Creates many idle sessions the way the server does (GameEngine plus server Session,
+all on a shared song pool, half of them in a shared round) and reports the memory they
+add, measured with tracemalloc. This is the game state only: a Session built without
+a connection, so no socket, stream buffers or task. Exits non-zero if a session costs
+more than the budget.
+
+--connected N also measures real connections: a server is started in a child process,
+N WebSocket clients connect over loopback and wait for the hello message, and the
+growth of the server's resident memory is divided by N. This includes the socket
+objects, asyncio streams and transport, the session's task and its game state (kernel
+socket buffers are not part of the process's memory). Reading the resident memory
+needs Linux (/proc).
+
+Usage:
+    python benchmarks/session_memory.py [--sessions 100000] [--budget 400] [--connected 5000]
+                                        [--json memory.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog import get_catalog
+from engine import GameEngine
+from rounds import Round
+
+
+def measure(make_session, count):
+    """
+    Memory added by count sessions.
+
+    Args:
+        make_session (callable): Builds one session
+        count (int): Number of sessions to hold at once
+
+    Returns:
+        float: Bytes per session
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [make_session(i) for i in range(count)]
+    added = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return added / count
+
+
+# Game server run by --connected; prints its port once listening
+SERVER_SCRIPT = """
+import asyncio, sys
+sys.path.insert(0, sys.argv[1])
+from server import GameServer
+
+async def serve():
+    ready = asyncio.get_running_loop().create_future()
+    task = asyncio.ensure_future(GameServer().serve("127.0.0.1", 0, ready))
+    print(await ready, flush=True)
+    await task
+
+asyncio.run(serve())
+"""
+
+# Connections opened before the baseline reading, so allocator and import warm-up
+# is not counted
+WARM_UP_CONNECTIONS = 200
+
+
+def resident_bytes(pid):
+    """Resident memory of a process, from /proc"""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmRSS not found")
+
+
+def raise_file_limit(needed):
+    """Raise the open file limit (inherited by the server process) if it is too low"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+async def connect_clients(port, count, clients):
+    """Open count WebSocket connections and wait for each session's hello"""
+    from loadtest import WebSocketClient
+
+    for _ in range(count):
+        client = await WebSocketClient.connect("127.0.0.1", port)
+        await client.receive("hello")
+        clients.append(client)
+
+
+def measure_connected(count):
+    """
+    Resident memory a server gains per connected, idle session.
+
+    Args:
+        count (int): Number of connections to measure
+
+    Returns:
+        float: Bytes per connected session
+    """
+    raise_file_limit(2 * (count + WARM_UP_CONNECTIONS) + 100)
+    env = dict(os.environ, MELO_LOG_LEVEL="ERROR", MELO_TIMINGS="0",
+               MELO_LYRICS_CACHE=tempfile.mkdtemp(prefix="melo-memory-"))
+    process = subprocess.Popen([sys.executable, "-c", SERVER_SCRIPT, REPO_DIR], env=env,
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(process.stdout.readline())
+
+        async def run():
+            clients = []
+            await connect_clients(port, WARM_UP_CONNECTIONS, clients)
+            await asyncio.sleep(0.5)
+            before = resident_bytes(process.pid)
+            await connect_clients(port, count, clients)
+            await asyncio.sleep(0.5)
+            added = resident_bytes(process.pid) - before
+            for client in clients:
+                client.close()
+            return added / count
+
+        return asyncio.run(run())
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Song-Guesser per-session memory")
+    parser.add_argument("--sessions", type=int, default=100000, help="number of idle sessions to create")
+    parser.add_argument("--budget", type=float, default=400, help="bytes allowed per server session")
+    parser.add_argument("--connected", type=int, default=0,
+                        help="also measure this many real loopback connections to a server")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    # Shared state every session references: catalog, song pool, title index and a round
+    catalog = get_catalog()
+    artist = catalog.artist(catalog.artist_names()[0])
+    song = artist.song(artist.first_song_id)
+    catalog.title_index(artist.name)
+    shared_round = Round(song.id, song.title, song.artist, "lyric", ["hint one", "hint two"], song.key)
+
+    def make_engine(i):
+        engine = GameEngine(catalog)
+        engine.select(artist.name, "All Albums", artist.song_ids)
+        if i % 2:
+            engine.start_round(shared_round)
+        return engine
+
+    def make_server_session(i):
+        from server import Session
+        session = Session.__new__(Session)
+        session.server = None
+        session.websocket = None
+        session.engine = make_engine(i)
+        session.next_round = None
+        session.room = None
+        session.started = 0.0
+        return session
+
+    results = {
+        "sessions": args.sessions,
+        "engine_bytes": measure(make_engine, args.sessions),
+        "server_session_bytes": measure(make_server_session, args.sessions),
+        "budget_bytes": args.budget
+    }
+    for name in ("engine_bytes", "server_session_bytes"):
+        per_session = results[name]
+        print(f"{name:>23}: {per_session:7.1f} bytes/session, "
+              f"{per_session * args.sessions / 2 ** 20:7.1f} MiB for {args.sessions} sessions")
+    if args.connected:
+        results["connected_sessions"] = args.connected
+        results["connected_session_bytes"] = per_session = measure_connected(args.connected)
+        print(f"{'connected_session_bytes':>23}: {per_session:7.1f} bytes/session, "
+              f"{per_session * args.sessions / 2 ** 20:7.1f} MiB for {args.sessions} sessions "
+              f"(server RSS over {args.connected} connections)")
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+
+    if results["server_session_bytes"] > args.budget:
+        print("FAIL: per-session memory is over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+benchmarks/startup.py
+
+Startup budget check for the Song-Guesser game.
+Measures time-to-first-window of main.py on a fresh interpreter, reports the slowest
+imports from `python -X importtime` and the peak memory of a start. Exits non-zero if
+the median time-to-first-window is over budget or if a module that should be deferred
+is imported at startup. --tui measures the terminal game (time to its first menu).
+
+Usage:
+    python benchmarks/startup.py [--tui] [--runs 5] [--budget 1.0] [--json startup.json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported on first use, never before the window appears
+DEFERRED_MODULES = ("lyricsgenius", "requests", "spotipy")
+
+# The terminal game must not load Qt at all
+TUI_DEFERRED_MODULES = DEFERRED_MODULES + ("PySide6",)
+
+
+def startup_env():
+    """Environment for a headless startup run"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env.setdefault("GENIUS_ACCESS_TOKEN", "startup-benchmark")
+    env["MELO_STARTUP_PROBE"] = "1"
+    return env
+
+
+def time_to_first_window(main_args=()):
+    """
+    Launch main.py once and time it until the first window (or terminal menu) has been
+    shown.
+
+    Args:
+        main_args (tuple): Extra command line arguments for main.py
+
+    Returns:
+        float: Seconds from process spawn to the startup probe line
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "main.py"), *main_args],
+                               cwd=REPO_DIR, env=startup_env(),
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        for line in process.stdout:
+            if line.startswith("startup-probe"):
+                return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+    raise RuntimeError("main.py exited without showing a window")
+
+
+def import_report(modules="main, gui"):
+    """
+    Import everything the front end needs under -X importtime.
+
+    Args:
+        modules (str): Modules to import, as written in an import statement
+
+    Returns:
+        list: (module, self_us, cumulative_us) for every imported module
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+                            cwd=REPO_DIR, env=startup_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Song-Guesser startup time")
+    parser.add_argument("--runs", type=int, default=5, help="number of cold starts to time")
+    parser.add_argument("--budget", type=float, default=1.0, help="time-to-first-window budget in seconds")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--tui", action="store_true", help="measure the terminal game instead of the window")
+    args = parser.parse_args()
+
+    if args.tui:
+        main_args, modules, deferred = ("--tui",), "main, tui", TUI_DEFERRED_MODULES
+    else:
+        main_args, modules, deferred = (), "main, gui", DEFERRED_MODULES
+
+    imports = import_report(modules)
+    top_level = [row for row in imports if "." not in row[0]]
+    top_level.sort(key=lambda row: row[2], reverse=True)
+    deferred_loaded = sorted({row[0].split(".")[0] for row in imports} & set(deferred))
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for module, self_us, cumulative_us in top_level[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module}")
+    print(f"Total import time: {sum(row[1] for row in imports) / 1000:.1f} ms")
+
+    timings = [time_to_first_window(main_args) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    # ru_maxrss is in KiB on Linux, and the largest of all children so far
+    peak_rss_mib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(f"Time to first window: median {median * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms "
+          f"(budget {args.budget * 1000:.0f} ms)")
+    print(f"Peak memory: {peak_rss_mib:.1f} MiB")
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump({
+                "time_to_first_window_s": timings,
+                "median_s": median,
+                "budget_s": args.budget,
+                "mode": "tui" if args.tui else "gui",
+                "peak_rss_mib": peak_rss_mib,
+                "imports": [{"module": module, "self_us": self_us, "cumulative_us": cumulative_us}
+                            for module, self_us, cumulative_us in imports],
+                "deferred_loaded": deferred_loaded
+            }, json_file, indent=2)
+
+    failed = False
+    if deferred_loaded:
+        print(f"FAIL: imported at startup but should be deferred: {', '.join(deferred_loaded)}")
+        failed = True
+    if median > args.budget:
+        print("FAIL: time to first window is over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
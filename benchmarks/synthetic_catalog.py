@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+benchmarks/synthetic_catalog.py
+
+Synthetic catalogs for scaling tests.
+Generates catalogs of any size (10k to 1M+ songs) in the albums_database.py schema and
+writes them with catalog.write_catalog, so the game, server and benchmarks load them
+through MELO_CATALOG exactly like the real one. Titles follow the real catalog's word
+count distribution and vocabulary, with featured artists, version tags, "A / B" titles,
+punctuation, unicode and the odd all-caps or lower-case spelling. Deluxe editions
+repeat earlier tracks, as real discographies do, so the deduplicated pools have work
+to do. Artist sizes are heavy-tailed: most artists have a few albums, a few have dozens.
+
+With --scaling, catalogs of each --sizes are generated and the size-dependent paths are
+timed on them: the selector (manifest read, "All Artists" count, loading the largest
+artist, All Albums and all-artist pools, endless samplers), autocomplete over the
+largest artist and over every song, and the round scheduler drawing songs across the
+whole catalog (lyrics from the in-process Genius stand-in).
+
+Usage:
+    python benchmarks/synthetic_catalog.py --songs 100000 --out /tmp/catalog-100k
+    MELO_CATALOG=/tmp/catalog-100k/catalog_manifest.json python main.py
+
+    python benchmarks/synthetic_catalog.py --scaling [--sizes 10000,100000,1000000] [--json scaling.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog import CATALOG_DIR, MANIFEST_NAME, Catalog, write_catalog
+from keywords import configure_logging
+from matching import canonical_key
+
+# Words outside the real catalog's vocabulary, for accents, other scripts and symbols
+UNICODE_WORDS = ("Déjà", "Vu", "Café", "Señorita", "Niño", "Über", "Ça", "Coração", "Mañana",
+                 "Naïve", "Fiancé", "Ølen", "Łódź", "Straße", "Любовь", "Ночь", "夜", "東京",
+                 "사랑", "Ελπίδα", "²", "½", "№1", "Ⅱ", "ＭＯＯＮ", "ﬁre")
+EMOJI = ("💔", "🌙", "🔥", "✨", "♡", "☆")
+FEATURE_NAMES = ("Guest", "Lil Example", "The Others", "DJ Sample", "Señor Verse", "MC Test", "Ana & Bo")
+VERSION_TAGS = ("Remix", "Live", "Acoustic", "Demo", "Interlude", "Reprise", "Radio Edit",
+                "Extended Mix", "Taylor's Version", "From The Vault", "Remastered 2011")
+FALLBACK_WORDS = ("love", "night", "heart", "city", "lights", "forever", "dancing", "tears",
+                  "summer", "dream", "fire", "alone", "tonight", "gold", "midnight", "blue")
+
+# Share of titles given each decoration
+FEATURE_RATE = 0.07
+VERSION_RATE = 0.06
+SLASH_RATE = 0.02
+PUNCTUATION_RATE = 0.05
+UNICODE_RATE = 0.06
+EMOJI_RATE = 0.01
+CASE_RATE = 0.04
+
+# Album shape
+MIN_TRACKS = 8
+MAX_TRACKS = 22
+DELUXE_RATE = 0.15
+
+
+def real_title_stats(manifest_path=os.path.join(CATALOG_DIR, MANIFEST_NAME)):
+    """
+    Word count distribution and vocabulary of the real catalog's titles.
+
+    Returns:
+        tuple: (list of word counts, one per real title; list of distinct words)
+    """
+    word_counts = []
+    vocabulary = {}
+    try:
+        catalog = Catalog(manifest_path)
+        for name in catalog.artist_names():
+            for song in catalog.artist(name).songs:
+                # Drop decorations; they are added back at their own rates
+                words = re.sub(r"\s*[(\[].*?[)\]]", "", song.title).replace("/", " ").split()
+                words = [word.strip(",.!?\"") for word in words]
+                words = [word for word in words if word]
+                if words:
+                    word_counts.append(len(words))
+                    for word in words:
+                        vocabulary.setdefault(word.lower(), word)
+    except (OSError, ValueError):
+        pass
+    if not word_counts:
+        return [1, 2, 2, 3, 3, 4, 5], list(FALLBACK_WORDS)
+    return word_counts, list(vocabulary.values())
+
+
+class TitleGenerator:
+    """Draws song titles shaped like the real catalog's"""
+
+    def __init__(self, rng, word_counts, vocabulary):
+        """
+        Args:
+            rng (random.Random): Random source
+            word_counts (list): Word counts to draw title lengths from
+            vocabulary (list): Words to build titles from
+        """
+        self.rng = rng
+        self.word_counts = word_counts
+        self.vocabulary = vocabulary
+
+    def words(self, count):
+        rng = self.rng
+        words = []
+        for _ in range(count):
+            if rng.random() < UNICODE_RATE:
+                words.append(rng.choice(UNICODE_WORDS))
+            else:
+                words.append(rng.choice(self.vocabulary))
+        return words
+
+    def title(self):
+        """One title, possibly decorated"""
+        rng = self.rng
+        title = " ".join(self.words(rng.choice(self.word_counts)))
+        title = title[0].upper() + title[1:]
+
+        if rng.random() < SLASH_RATE:
+            title = f"{title} / {' '.join(self.words(rng.randint(1, 3))).title()}"
+        if rng.random() < PUNCTUATION_RATE:
+            title += rng.choice(("?", "!", "...", "!!", "?!"))
+        if rng.random() < CASE_RATE:
+            title = title.upper() if rng.random() < 0.5 else title.lower()
+        if rng.random() < FEATURE_RATE:
+            title += f" (feat. {rng.choice(FEATURE_NAMES)})"
+        if rng.random() < VERSION_RATE:
+            title += rng.choice((f" ({rng.choice(VERSION_TAGS)})", f" - {rng.choice(VERSION_TAGS)}",
+                                 f" [{rng.choice(VERSION_TAGS)}]"))
+        if rng.random() < EMOJI_RATE:
+            title += f" {rng.choice(EMOJI)}"
+        return title
+
+
+def generate_artist(rng, titles, song_count, first_year):
+    """
+    One artist's albums with about song_count distinct songs.
+
+    Args:
+        rng (random.Random): Random source
+        titles (TitleGenerator): Title source
+        song_count (int): Distinct songs to generate
+        first_year (int): Release year of the first album
+
+    Returns:
+        dict: Album name -> album data
+    """
+    albums = {}
+    keys = set()
+    year = first_year
+    remaining = song_count
+    while remaining > 0:
+        tracks = []
+        for _ in range(min(remaining, rng.randint(MIN_TRACKS, MAX_TRACKS))):
+            title = titles.title()
+            key = canonical_key(title)
+            while not key or key in keys:
+                # Keep every new title a distinct song
+                title = f"{title} Pt. {rng.randint(2, 9)}"
+                key = canonical_key(title)
+            keys.add(key)
+            tracks.append(title)
+        remaining -= len(tracks)
+
+        name = titles.title()
+        while name in albums or f"{name} (Deluxe)" in albums:
+            name = f"{name} {rng.randint(2, 99)}"
+        albums[name] = {"release_year": year, "cover_art": None, "songs": tracks}
+        if rng.random() < DELUXE_RATE:
+            # A deluxe edition: the same tracks (one respelled) plus a few new ones
+            deluxe = list(tracks)
+            index = rng.randrange(len(deluxe))
+            deluxe[index] = deluxe[index].upper()
+            extra = min(remaining, rng.randint(1, 4))
+            for _ in range(extra):
+                title = f"{titles.title()} (Bonus Track)"
+                while canonical_key(title) in keys:
+                    title = f"{title} {rng.randint(2, 9)}"
+                keys.add(canonical_key(title))
+                deluxe.append(title)
+            remaining -= extra
+            albums[f"{name} (Deluxe)"] = {"release_year": year, "cover_art": None, "songs": deluxe}
+        year += rng.randint(1, 3)
+    return albums
+
+
+def generate_artists(song_count, seed=1):
+    """
+    A synthetic catalog in the albums_database.py schema.
+
+    Args:
+        song_count (int): Total number of distinct songs
+        seed (int): Seed, so the same arguments give the same catalog
+
+    Returns:
+        dict: Artist name -> albums, ready for catalog.write_catalog
+    """
+    rng = random.Random(seed)
+    word_counts, vocabulary = real_title_stats()
+    titles = TitleGenerator(rng, word_counts, vocabulary)
+
+    artists = {}
+    remaining = song_count
+    while remaining > 0:
+        # Heavy-tailed artist sizes: median around 100 songs, a few with thousands
+        size = min(remaining, max(MIN_TRACKS, int(rng.paretovariate(1.2) * 60)), 5000)
+        name = f"{' '.join(titles.words(rng.randint(1, 3))).title()} {len(artists) + 1}"
+        artists[name] = generate_artist(rng, titles, size, rng.randint(1960, 2015))
+        remaining -= size
+    return artists
+
+
+def build_catalog(song_count, directory, seed=1):
+    """
+    Generate and write a synthetic catalog.
+
+    Args:
+        song_count (int): Total number of distinct songs
+        directory (str): Output directory
+        seed (int): Generator seed
+
+    Returns:
+        str: Path of the written manifest, for MELO_CATALOG
+    """
+    return write_catalog(generate_artists(song_count, seed), directory)
+
+
+def timed(function, repeat=3):
+    """Best of repeat timings of function(), in milliseconds, and its last result"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def measure_scaling(manifest_path, rounds=2000, lyrics_dir=None):
+    """
+    Time the size-dependent paths of the selector, autocomplete and scheduler.
+
+    Args:
+        manifest_path (str): Catalog to measure
+        rounds (int): Rounds the scheduler prepares
+        lyrics_dir (str): Empty directory for the lyrics cache the rounds fill, defaults
+            to a new temporary one
+
+    Returns:
+        dict: Measurement name -> milliseconds (rounds_per_s for the scheduler)
+    """
+    from catalog_query import CatalogQuery, SongQuery
+    from engine import GameEngine
+    from sampling import CatalogSampler
+    from rounds import Round, RoundScheduler
+    import lyrics
+    from fake_genius import FakeGenius
+
+    results = {}
+    results["selector.open_manifest_ms"], catalog = timed(lambda: Catalog(manifest_path))
+    names = catalog.artist_names()
+    results["selector.all_artists_count_ms"], _ = timed(lambda: sum(catalog.song_count(name) for name in names))
+    largest = max(names, key=catalog.song_count)
+    results["selector.load_largest_artist_ms"], _ = timed(lambda: Catalog(manifest_path).artist(largest))
+    artist = catalog.artist(largest)
+    results["selector.all_albums_pool_ms"], _ = timed(lambda: catalog.artist(largest).song_ids)
+    query = CatalogQuery(catalog)
+    results["selector.all_artists_pool_ms"], pool = timed(lambda: query.songs(SongQuery()), repeat=1)
+    results["selector.sampler_song_ms"], _ = timed(lambda: CatalogSampler(catalog, "song"), repeat=1)
+    results["selector.sampler_year_ms"], _ = timed(lambda: CatalogSampler(catalog, "year"), repeat=1)
+
+    rng = random.Random(1)
+    for label, songs in (("largest_artist", artist.song_ids), ("all_songs", pool)):
+        engine = GameEngine(catalog)
+        engine.select(largest, "All Albums", songs)
+        prefixes = [catalog.song(song_id).title[:3] for song_id in rng.sample(list(songs[:100000]), 20)]
+        results[f"autocomplete.{label}_ms"], _ = timed(lambda: [engine.suggestions(text) for text in prefixes], 1)
+        results[f"autocomplete.{label}_ms"] /= len(prefixes)
+    song = artist.songs[0]
+    engine = GameEngine(catalog)
+    engine.start_round(Round(song.id, song.title, song.artist, "lyric", [], song.key))
+    typos = []
+    for song in rng.sample(artist.songs, min(20, len(artist.songs))):
+        middle = len(song.title) // 2
+        typos.append((song.title[:middle] + ("x" if song.title[middle] != "x" else "y") + song.title[middle + 1:],
+                      song.title))
+    results["guess.typo_largest_artist_ms"], _ = timed(lambda: [engine.is_correct_guess(*typo) for typo in typos])
+    results["guess.typo_largest_artist_ms"] /= len(typos)
+
+    # Rounds drawn across the whole catalog, as endless mode does, from an empty cache
+    lyrics._cache = lyrics.LyricsCache(lyrics_dir or tempfile.mkdtemp(prefix="melo-scaling-lyrics-"))
+    lyrics.set_genius(FakeGenius(latency_ms=0, jitter_ms=0, seed=1))
+    sampler = CatalogSampler(catalog, "song", random.Random(1))
+    scheduler = RoundScheduler(max_workers=8)
+    started = time.perf_counter()
+    futures = [scheduler.prepare(catalog.song(sampler.draw())) for _ in range(rounds)]
+    for future in futures:
+        future.result()
+    results["scheduler.rounds_per_s"] = rounds / (time.perf_counter() - started)
+    scheduler.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Song-Guesser catalogs")
+    parser.add_argument("--songs", type=int, default=100000, help="distinct songs to generate")
+    parser.add_argument("--out", help="output directory (default: a temporary one)")
+    parser.add_argument("--seed", type=int, default=1, help="generator seed")
+    parser.add_argument("--scaling", action="store_true", help="measure scaling across --sizes")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="catalog sizes for --scaling")
+    parser.add_argument("--rounds", type=int, default=2000, help="rounds the scheduler prepares per size")
+    parser.add_argument("--json", help="write the scaling results to this file")
+    args = parser.parse_args()
+
+    if not args.scaling:
+        directory = args.out or tempfile.mkdtemp(prefix=f"melo-catalog-{args.songs}-")
+        started = time.perf_counter()
+        manifest_path = build_catalog(args.songs, directory, args.seed)
+        print(f"Wrote {args.songs} songs in {time.perf_counter() - started:.1f}s")
+        print(f"Use it with: MELO_CATALOG={manifest_path}")
+        return 0
+
+    # Log in the calling thread, so the stdout redirect around measurements catches it
+    configure_logging(async_console=False)
+    curves = {}
+    for size in (int(size) for size in args.sizes.split(",")):
+        directory = tempfile.mkdtemp(prefix=f"melo-catalog-{size}-")
+        started = time.perf_counter()
+        manifest_path = build_catalog(size, directory, args.seed)
+        print(f"{size} songs generated in {time.perf_counter() - started:.1f}s")
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            # Keep the game's log output off the terminal
+            # Every size starts from an empty lyrics cache of its own
+            curves[size] = measure_scaling(manifest_path, args.rounds,
+                                           tempfile.mkdtemp(prefix=f"melo-scaling-lyrics-{size}-"))
+
+    sizes = list(curves)
+    print(f"\n{'measurement':<36}" + "".join(f"{size:>14}" for size in sizes))
+    for name in curves[sizes[0]]:
+        print(f"{name:<36}" + "".join(f"{curves[size][name]:>14.3f}" for size in sizes))
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump({str(size): results for size, results in curves.items()}, json_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
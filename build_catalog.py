@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+build_catalog.py
+
+Serializes the album databases in albums_database.py into the catalog files under data/
+that the game loads at runtime. Run this after editing albums_database.py.
+"""
+
+from albums_database import (the_weeknd_albums, billie_eilish_albums,
+                             lana_del_rey_albums, tame_impala_albums,
+                             olivia_rodrigo_albums, kanye_west_albums,
+                             dua_lipa_albums, taylor_swift_albums,
+                             eminem_albums, xxxtentacion_albums, juice_wrld_albums,
+                             one_direction_albums, bring_me_the_horizon_albums)
+from catalog import write_catalog
+from keywords import print_success
+
+ARTISTS = {
+    "The Weeknd": the_weeknd_albums,
+    "Billie Eilish": billie_eilish_albums,
+    "Lana Del Rey": lana_del_rey_albums,
+    "Tame Impala": tame_impala_albums,
+    "Olivia Rodrigo": olivia_rodrigo_albums,
+    "Kanye West": kanye_west_albums,
+    "Dua Lipa": dua_lipa_albums,
+    "Taylor Swift": taylor_swift_albums,
+    "Eminem": eminem_albums,
+    "XXXTENTACION": xxxtentacion_albums,
+    "Juice WRLD": juice_wrld_albums,
+    "One Direction": one_direction_albums,
+    "Bring Me The Horizon": bring_me_the_horizon_albums
+}
+
+if __name__ == "__main__":
+    manifest_path = write_catalog(ARTISTS)
+    print_success(f"Catalog written: {manifest_path}")
@@ -0,0 +1,288 @@
+"""
+catalog.py
+
+Artist catalog for the Song-Guesser game.
+The catalog is stored in data/ as a JSON-lines file with one artist per line, plus a
+manifest holding each artist's byte offset, counts and first song ID. Artists are only
+parsed when they are first used, and are cached afterwards as immutable Artist, Album
+and Song records. Songs have integer IDs that are unique across the whole catalog, so
+selections can be passed around as arrays of IDs.
+
+Each artist record also carries the aggregates the selector needs, built once at load:
+per-album counts, the deduplicated pool of all the artist's songs (a title listed on
+several albums, or spelled differently across them, is one song) and a reverse map
+from each song to the albums it appears on.
+"""
+
+import bisect
+import json
+import os
+import sys
+import threading
+from array import array
+from collections import namedtuple
+
+from matching import TitleIndex, title_key, unique_titles
+
+CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+MANIFEST_NAME = "catalog_manifest.json"
+DATA_NAME = "catalog.jsonl"
+CATALOG_FORMAT = 3
+
+# Typecode for arrays of song IDs
+SONG_ID_TYPECODE = "I"
+
+
+class Song(namedtuple("Song", ["id", "title", "key", "artist"])):
+    """A song: catalog-wide integer ID, interned title and its canonical key"""
+    __slots__ = ()
+
+
+class Album(namedtuple("Album", ["name", "artist", "release_year", "cover_art", "song_ids"])):
+    """An album with its song IDs in track order"""
+    __slots__ = ()
+
+    @property
+    def song_count(self):
+        return len(self.song_ids)
+
+
+class Artist(namedtuple("Artist", ["name", "albums", "songs", "song_ids", "first_song_id",
+                                   "track_count", "albums_by_name", "songs_by_title",
+                                   "song_albums"])):
+    """
+    An artist's albums and distinct songs. Song IDs run from first_song_id to
+    first_song_id + len(songs) - 1, and songs[song_id - first_song_id] is the record.
+    song_ids is the deduplicated "All Albums" pool, track_count the number of album
+    tracks including repeats, and song_albums[song_id - first_song_id] the names of
+    the albums a song appears on. albums_by_name and songs_by_title are plain dicts
+    so artists pickle (e.g. to worker processes); treat them as read-only.
+    """
+    __slots__ = ()
+
+    @property
+    def song_count(self):
+        return len(self.songs)
+
+    @property
+    def album_count(self):
+        return len(self.albums)
+
+    def song(self, song_id):
+        return self.songs[song_id - self.first_song_id]
+
+    def albums_of(self, song_id):
+        return self.song_albums[song_id - self.first_song_id]
+
+
+def build_artist(name, albums, first_song_id):
+    """
+    Build the immutable records for one artist.
+
+    Args:
+        name (str): Artist name
+        albums (dict): Album name -> album data, in the albums_database.py schema
+        first_song_id (int): ID given to the artist's first distinct title
+
+    Returns:
+        Artist: Artist record
+    """
+    name = sys.intern(name)
+    songs = []
+    songs_by_key = {}
+    for song_id, title in enumerate(unique_titles(albums), first_song_id):
+        title = sys.intern(title)
+        song = Song(song_id, title, sys.intern(title_key(title)), name)
+        songs.append(song)
+        songs_by_key[song.key] = song
+
+    # Every listed spelling resolves to the shared song record
+    songs_by_title = {}
+    album_records = []
+    song_albums = [[] for _ in songs]
+    for album_name, album_data in albums.items():
+        album_name = sys.intern(album_name)
+        song_ids = array(SONG_ID_TYPECODE)
+        for title in album_data["songs"]:
+            song = songs_by_title.get(title)
+            if song is None:
+                song = songs_by_title[title] = songs_by_key[title_key(title)]
+            song_ids.append(song.id)
+            appearances = song_albums[song.id - first_song_id]
+            if album_name not in appearances:
+                appearances.append(album_name)
+        album_records.append(Album(album_name, name, album_data["release_year"],
+                                   album_data.get("cover_art"), song_ids))
+
+    return Artist(name, tuple(album_records), tuple(songs),
+                  array(SONG_ID_TYPECODE, range(first_song_id, first_song_id + len(songs))),
+                  first_song_id,
+                  sum(album.song_count for album in album_records),
+                  {album.name: album for album in album_records},
+                  songs_by_title,
+                  tuple(tuple(appearances) for appearances in song_albums))
+
+
+def write_catalog(artists, directory=CATALOG_DIR):
+    """
+    Serialize artist album databases into the catalog data file and manifest.
+
+    Args:
+        artists (dict): Artist name -> albums, in the albums_database.py schema
+        directory (str): Output directory
+
+    Returns:
+        str: Path of the written manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    entries = []
+    offset = 0
+    first_song_id = 0
+    with open(os.path.join(directory, DATA_NAME), "wb") as data_file:
+        for artist, albums in artists.items():
+            line = json.dumps({"artist": artist, "albums": albums}, ensure_ascii=False,
+                              separators=(",", ":")).encode("utf-8") + b"\n"
+            data_file.write(line)
+            song_count = len(unique_titles(albums))
+            entries.append({
+                "name": artist,
+                "offset": offset,
+                "length": len(line),
+                "album_count": len(albums),
+                "track_count": sum(len(album_data["songs"]) for album_data in albums.values()),
+                "song_count": song_count,
+                "first_song_id": first_song_id
+            })
+            offset += len(line)
+            first_song_id += song_count
+
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+        json.dump({"format": CATALOG_FORMAT, "data": DATA_NAME, "artists": entries},
+                  manifest_file, ensure_ascii=False, indent=2)
+        manifest_file.write("\n")
+    return manifest_path
+
+
+class Catalog:
+    """
+    Lazily loaded artist catalog backed by the manifest and JSON-lines data file.
+    """
+
+    def __init__(self, manifest_path=os.path.join(CATALOG_DIR, MANIFEST_NAME)):
+        """
+        Args:
+            manifest_path (str): Path to the catalog manifest
+        """
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        if manifest.get("format") != CATALOG_FORMAT:
+            raise ValueError(f"Unsupported catalog format: {manifest.get('format')}")
+
+        self.data_path = os.path.join(os.path.dirname(manifest_path), manifest["data"])
+        self.entries = {entry["name"]: entry for entry in manifest["artists"]}
+        self._first_song_ids = [entry["first_song_id"] for entry in manifest["artists"]]
+        self._artist_order = [entry["name"] for entry in manifest["artists"]]
+        self._artists = {}
+        self._title_indexes = {}
+        self._lock = threading.Lock()
+
+    def artist_names(self):
+        """Artist names in catalog order, without loading any artist"""
+        return list(self.entries)
+
+    def __contains__(self, artist):
+        return artist in self.entries
+
+    def song_count(self, artist):
+        """Number of distinct songs of an artist, from the manifest"""
+        return self.entries[artist]["song_count"]
+
+    def _load(self, artist):
+        """Read one artist from the data file and cache its records and title index"""
+        with self._lock:
+            record = self._artists.get(artist)
+            if record is None:
+                entry = self.entries[artist]
+                with open(self.data_path, "rb") as data_file:
+                    data_file.seek(entry["offset"])
+                    raw = json.loads(data_file.read(entry["length"]).decode("utf-8"))
+                self._title_indexes[artist] = TitleIndex(raw["albums"])
+                record = self._artists[artist] = build_artist(artist, raw["albums"],
+                                                              entry["first_song_id"])
+        return record
+
+    def artist(self, artist):
+        """
+        Get an artist's records, reading them from the data file on first use.
+
+        Args:
+            artist (str): Artist name
+
+        Returns:
+            Artist: Artist record
+        """
+        record = self._artists.get(artist)
+        if record is None:
+            record = self._load(artist)
+        return record
+
+    def title_index(self, artist):
+        """
+        Get the title index for an artist, built once when the artist is loaded.
+
+        Args:
+            artist (str): Artist name
+
+        Returns:
+            TitleIndex: Title index for the artist
+        """
+        index = self._title_indexes.get(artist)
+        if index is None:
+            self._load(artist)
+            index = self._title_indexes[artist]
+        return index
+
+    def song(self, song_id):
+        """
+        Get a song record by its catalog-wide ID.
+
+        Args:
+            song_id (int): Song ID
+
+        Returns:
+            Song: Song record
+        """
+        position = bisect.bisect_right(self._first_song_ids, song_id) - 1
+        return self.artist(self._artist_order[position]).song(song_id)
+
+
+_catalog = None
+
+
+def get_catalog():
+    """
+    Get the shared catalog, reading only the manifest on first call.
+
+    Returns:
+        Catalog: The catalog loaded from MELO_CATALOG or data/
+    """
+    global _catalog
+    if _catalog is None:
+        manifest_path = os.getenv("MELO_CATALOG") or os.path.join(CATALOG_DIR, MANIFEST_NAME)
+        _catalog = Catalog(manifest_path)
+    return _catalog
+
+
+def get_title_index(artist):
+    """
+    Get the precomputed title index for an artist.
+
+    Args:
+        artist (str): Artist name
+
+    Returns:
+        TitleIndex: Title index for the artist
+    """
+    return get_catalog().title_index(artist)
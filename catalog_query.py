@@ -0,0 +1,161 @@
+"""
+catalog_query.py
+
+Indexed queries over the artist catalog for the Song-Guesser game.
+Selections such as "all songs from 2015-2020 across these three artists" are answered
+from per-artist year indexes and album postings, so the cost of a query grows with the
+size of its result rather than with the size of the catalog.
+
+Only the multiplayer server uses these queries, for its select {query} messages; the game
+window and the terminal game keep their artist/album and endless selections.
+"""
+
+import bisect
+from array import array
+from collections import namedtuple
+
+from catalog import get_catalog, SONG_ID_TYPECODE
+
+
+class SongQuery(namedtuple("SongQuery", ["artists", "years", "albums", "album_songs"])):
+    """
+    A composite selection. Every field is optional (None means "no filter").
+
+    artists: iterable of artist names
+    years: (first, last) release years, inclusive
+    albums: iterable of album names
+    album_songs: (min, max) number of songs on the album, inclusive
+    """
+    __slots__ = ()
+
+    def __new__(cls, artists=None, years=None, albums=None, album_songs=None):
+        return super().__new__(cls, artists, years, albums, album_songs)
+
+
+class YearIndex:
+    """
+    One artist's albums sorted by release year, with the years in a parallel array for
+    bisecting.
+    """
+
+    def __init__(self, artist_record):
+        """
+        Args:
+            artist_record (Artist): Loaded artist record
+        """
+        self.albums = tuple(sorted(artist_record.albums, key=lambda album: album.release_year))
+        self.years = array("i", (album.release_year for album in self.albums))
+
+    def between(self, first, last):
+        """Albums released from first to last, inclusive"""
+        low = bisect.bisect_left(self.years, first)
+        high = bisect.bisect_right(self.years, last)
+        return self.albums[low:high]
+
+
+class CatalogQuery:
+    """
+    Query engine over the catalog. Indexes are built per artist the first time the
+    artist is queried and reused afterwards.
+    """
+
+    def __init__(self, catalog=None):
+        """
+        Args:
+            catalog (Catalog): Catalog to query, defaults to the shared catalog
+        """
+        self.catalog = catalog or get_catalog()
+        self._year_indexes = {}
+
+    def year_index(self, artist):
+        """Get (building once) the year index for an artist"""
+        index = self._year_indexes.get(artist)
+        if index is None:
+            index = self._year_indexes[artist] = YearIndex(self.catalog.artist(artist))
+        return index
+
+    def albums(self, query):
+        """
+        Albums matching the artist, year, album and song-count filters of a query.
+
+        Args:
+            query (SongQuery): Selection to run
+
+        Returns:
+            list: Matching Album records
+        """
+        artists = query.artists if query.artists is not None else self.catalog.artist_names()
+        album_names = set(query.albums) if query.albums is not None else None
+
+        matches = []
+        for artist in artists:
+            if query.years is not None:
+                candidates = self.year_index(artist).between(*query.years)
+            elif album_names is not None:
+                albums_by_name = self.catalog.artist(artist).albums_by_name
+                candidates = [albums_by_name[name] for name in album_names if name in albums_by_name]
+            else:
+                candidates = self.catalog.artist(artist).albums
+
+            for album in candidates:
+                if album_names is not None and album.name not in album_names:
+                    continue
+                if query.album_songs is not None:
+                    min_songs, max_songs = query.album_songs
+                    if not min_songs <= album.song_count <= max_songs:
+                        continue
+                matches.append(album)
+        return matches
+
+    def songs(self, query):
+        """
+        Song pool for a query, without duplicates.
+
+        Args:
+            query (SongQuery): Selection to run
+
+        Returns:
+            array: Song IDs, in artist then album order
+        """
+        # Whole-artist selections reuse the precomputed pools
+        if query.years is None and query.albums is None and query.album_songs is None:
+            artists = query.artists if query.artists is not None else self.catalog.artist_names()
+            song_ids = array(SONG_ID_TYPECODE)
+            for artist in artists:
+                song_ids.extend(self.catalog.artist(artist).song_ids)
+            return song_ids
+
+        seen = set()
+        song_ids = array(SONG_ID_TYPECODE)
+        for album in self.albums(query):
+            for song_id in album.song_ids:
+                if song_id not in seen:
+                    seen.add(song_id)
+                    song_ids.append(song_id)
+        return song_ids
+
+
+def describe_query(query):
+    """
+    Short labels for a query, for the game header and album display.
+
+    Args:
+        query (SongQuery): Selection
+
+    Returns:
+        tuple: (artist label, album label)
+    """
+    if query.artists is not None and len(query.artists) == 1:
+        artist_label = next(iter(query.artists))
+    else:
+        artist_label = "Various Artists"
+
+    if query.albums is not None and len(query.albums) == 1:
+        album_label = next(iter(query.albums))
+    elif query.years is not None:
+        first, last = query.years
+        album_label = str(first) if first == last else f"{first}–{last}"
+    else:
+        album_label = "All Albums"
+
+    return artist_label, album_label
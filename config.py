@@ -0,0 +1,3 @@
+# Genius API token, used when GENIUS_ACCESS_TOKEN is not set in the environment or .env.
+# Leave empty to start in cache-only mode.
+GENIUS_API_KEY = ""
@@ -0,0 +1,394 @@
+"""
+engine.py
+
+Headless game engine for the Song-Guesser game.
+Holds the selection, score, streak, hint state and guess checking, with no Qt import,
+so the same rules drive the window, simulations, servers and benchmarks. Front ends
+decide when rounds are prepared and shown; the engine decides what a guess, skip or
+hint does to the game.
+"""
+
+import random
+from collections import namedtuple
+from concurrent.futures import Future, InvalidStateError
+
+from catalog import get_catalog
+from matching import title_key
+from instrumentation import timed
+import lyrics
+import rounds
+
+# Draws tried to find a cached song when lyrics cannot be fetched
+CACHE_ONLY_DRAW_ATTEMPTS = 50
+
+# Songs drawn in a row for one round when preparations fail with LyricsUnavailable
+UNAVAILABLE_REDRAWS = 5
+
+# Extra lyric lines revealed by a hint
+HINT_LINES = 2
+
+# Song pool of a session with no selection
+NO_SONGS = ()
+
+
+class GuessResult(namedtuple("GuessResult", ["correct", "scored", "message"])):
+    """
+    Outcome of a guess.
+
+    correct: the guess matched the current song (the round is over)
+    scored: the guess raised the score and streak (correct and no hint used)
+    message: text to show the player
+    """
+    __slots__ = ()
+
+
+class NoPlayableSongs(Exception):
+    """Lyrics cannot be fetched and none of the selection's songs are cached"""
+
+
+class GameEngine:
+    """
+    One player's game: the song pool, the current round and the scores.
+
+    Sessions are compact so a server can hold many of them: state lives in __slots__,
+    the song pool is a reference to a shared catalog array or sampler (never a copy),
+    and the current song, artist and hint lines are read from the shared Round rather
+    than copied out of it. The game state of an idle session (engine plus server Session
+    object) is about 230 bytes, so 100k of them take about 22 MB; a connected server
+    session, with its socket, asyncio streams and task, costs about 8 KB of server
+    memory (see benchmarks/session_memory.py and its --connected measurement).
+    """
+
+    __slots__ = ("catalog", "rng", "selection_artist", "selected_album", "selected_songs",
+                 "_pool_artists", "score", "streak", "max_streak", "songs_played",
+                 "current_round", "hint_used", "state")
+
+    def __init__(self, catalog=None, rng=None):
+        """
+        Args:
+            catalog (Catalog): Catalog to play from, defaults to the shared catalog
+            rng (random.Random): Random source for song draws, defaults to the random module
+        """
+        self.catalog = catalog or get_catalog()
+        self.rng = rng or random
+        self.selection_artist = ""
+        self.selected_album = ""
+        self.selected_songs = NO_SONGS
+        self._pool_artists = ()
+        self.score = 0
+        self.streak = 0
+        self.max_streak = 0
+        self.songs_played = 0
+        self.reset_round()
+
+    def reset_round(self):
+        """Forget the current round"""
+        self.current_round = None
+        self.hint_used = False
+        self.state = rounds.LOADING
+
+    @property
+    def current_song(self):
+        return self.current_round.title if self.current_round is not None else ""
+
+    @property
+    def current_artist(self):
+        """Artist of the current round, or the selection's artist label between rounds"""
+        return self.current_round.artist if self.current_round is not None else self.selection_artist
+
+    @property
+    def hint_lines(self):
+        return self.current_round.hint_lines if self.current_round is not None else ()
+
+    @property
+    def title_index(self):
+        return self.catalog.title_index(self.current_round.artist) if self.current_round is not None else None
+
+    @property
+    def total_songs(self):
+        return len(self.selected_songs)
+
+    @property
+    def pool_artists(self):
+        """Artists in the selection, found on first use"""
+        if self._pool_artists is None:
+            songs = self.selected_songs
+            if hasattr(songs, 'artists'):
+                self._pool_artists = songs.artists
+            else:
+                self._pool_artists = tuple(dict.fromkeys(self.catalog.song(song_id).artist for song_id in songs))
+        return self._pool_artists
+
+    def select(self, artist, album, songs):
+        """
+        Start a new game on a selection.
+
+        Args:
+            artist (str): Artist label of the selection
+            album (str): Album label of the selection
+            songs: Array of song IDs, or an endless sampler with draw() and artists;
+                kept by reference, not copied
+        """
+        self.reset_round()
+        self.selection_artist = artist
+        self.selected_album = album
+        self.selected_songs = songs
+        self._pool_artists = None
+
+        self.score = 0
+        self.streak = 0
+        self.max_streak = 0  # Reset max streak when changing albums
+        self.songs_played = 0
+
+    def clear(self):
+        """Leave the current selection (back to the main menu)"""
+        self.reset_round()
+        self.selection_artist = ""
+        self.selected_album = ""
+        self.selected_songs = NO_SONGS
+        self._pool_artists = ()
+        self.max_streak = 0
+
+    def draw_song(self):
+        """
+        Draw a random song ID from the selection.
+
+        Returns:
+            int: Song ID
+        """
+        songs = self.selected_songs
+        if hasattr(songs, 'draw'):
+            # Endless sampler: O(1) weighted draws across its artists
+            return songs.draw()
+        return self.rng.choice(songs)
+
+    def draw_playable_song(self, can_fetch=None):
+        """
+        Draw a random song from the selection. When lyrics cannot be fetched, only songs
+        whose lyrics are cached are drawn.
+
+        Args:
+            can_fetch (callable): Returns True if missing lyrics can be fetched; only
+                called when the drawn song is not cached. Defaults to lyrics.can_fetch
+
+        Returns:
+            Song: Catalog song record
+
+        Raises:
+            NoPlayableSongs: Lyrics cannot be fetched and no cached song was found
+        """
+        can_fetch = can_fetch or lyrics.can_fetch
+        song = self.catalog.song(self.draw_song())
+        if not lyrics.needs_fetch(song.title, song.artist) or can_fetch():
+            return song
+
+        # Cache-only: a few random draws usually find a cached song
+        for _ in range(CACHE_ONLY_DRAW_ATTEMPTS):
+            song = self.catalog.song(self.draw_song())
+            if not lyrics.needs_fetch(song.title, song.artist):
+                return song
+
+        # Few or none are cached: look through the whole selection (endless samplers
+        # cover every artist, too many songs to scan)
+        songs = self.selected_songs
+        if not hasattr(songs, 'draw'):
+            cached = [song for song in map(self.catalog.song, songs)
+                      if not lyrics.needs_fetch(song.title, song.artist)]
+            if cached:
+                return self.rng.choice(cached)
+        raise NoPlayableSongs("The lyrics cache has no playable songs for this selection")
+
+    def prepare_playable_round(self, scheduler, can_fetch=None, is_stale=None):
+        """
+        Draw a song and prepare its round on a scheduler. Songs whose lyrics turn out to
+        be unavailable when the round is prepared are replaced by new draws, up to
+        UNAVAILABLE_REDRAWS songs in all.
+
+        Args:
+            scheduler (RoundScheduler): Scheduler preparing the round
+            can_fetch (callable): Fetch permission for the first draw, see
+                draw_playable_song; called on this thread, so it may ask the player for a
+                token. Redraws run on a worker thread and only check lyrics.can_fetch
+            is_stale (callable): Returns True if the round is no longer wanted
+
+        Returns:
+            concurrent.futures.Future: Resolves to the Round (None if it went stale), fails
+            with NoPlayableSongs if every song drawn was unavailable, and is cancelled if
+            the scheduler is shut down. Cancelling it stops the preparation
+
+        Raises:
+            NoPlayableSongs: The first draw found no playable song
+        """
+        round_future = Future()
+        preparing = None  # Scheduler future of the song being prepared
+        redraws = UNAVAILABLE_REDRAWS - 1
+
+        def settle(set_outcome, outcome):
+            try:
+                set_outcome(outcome)
+            except InvalidStateError:
+                pass  # Cancelled meanwhile
+
+        def prepare(song):
+            nonlocal preparing
+            preparing = scheduler.prepare(song, is_stale)
+            preparing.add_done_callback(on_prepared)
+
+        def on_prepared(future):
+            nonlocal redraws
+            if round_future.done():
+                return
+            if future.cancelled():
+                round_future.cancel()
+                return
+            error = future.exception()
+            if error is None:
+                settle(round_future.set_result, future.result())
+            elif not isinstance(error, lyrics.LyricsUnavailable):
+                settle(round_future.set_exception, error)
+            elif is_stale is not None and is_stale():
+                settle(round_future.set_result, None)
+            elif redraws <= 0:
+                settle(round_future.set_exception, NoPlayableSongs("Could not find a song with cached lyrics"))
+            else:
+                # The song left the cache or fetching was turned off: draw another
+                redraws -= 1
+                try:
+                    prepare(self.draw_playable_song())
+                except Exception as e:
+                    settle(round_future.set_exception, e)
+
+        def on_settled(future):
+            if future.cancelled():
+                preparing.cancel()
+
+        prepare(self.draw_playable_song(can_fetch))
+        round_future.add_done_callback(on_settled)
+        return round_future
+
+    def start_round(self, round_):
+        """
+        Make a prepared round the current one and wait for a guess.
+
+        Args:
+            round_ (Round): Round prepared by rounds.build_round; may be shared with
+                other sessions
+        """
+        self.current_round = round_
+        self.hint_used = False
+        self.songs_played += 1
+        self.state = rounds.READY
+
+    @timed("engine.new_song")
+    def new_song(self):
+        """
+        Draw and prepare the next round on the calling thread, then start it. Blocks
+        on Genius if the lyrics are not cached; front ends with an event loop prepare
+        rounds through the RoundScheduler and call start_round instead.
+
+        Returns:
+            Round: The started round
+
+        Raises:
+            NoPlayableSongs: Lyrics cannot be fetched and no cached song was found
+        """
+        round_ = rounds.build_round(self.draw_playable_song())
+        self.start_round(round_)
+        return round_
+
+    def is_correct_guess(self, guess, actual):
+        """Improved matching for song guesses, using the precomputed title keys"""
+        return self.title_index.is_correct_guess(guess, actual)
+
+    def submit_guess(self, guess):
+        """
+        Check a guess against the current song.
+
+        Args:
+            guess (str): The player's guess
+
+        Returns:
+            GuessResult or None: The outcome, or None if there is no round to guess
+        """
+        guess = guess.strip()
+        if not guess or self.state != rounds.READY or not self.current_song:
+            return None
+
+        if not self.is_correct_guess(guess, self.current_song):
+            # Reset score on wrong answer, but keep streak
+            self.score = 0
+            return GuessResult(False, False, "Incorrect, try again!")
+
+        self.state = rounds.ANSWERED
+        if self.hint_used:
+            return GuessResult(True, False, "Correct with hint! 🎵 The song was " + self.current_song)
+
+        # Only increase score and streak if hint wasn't used
+        self.score += 1
+        self.streak += 1
+        self.max_streak = max(self.max_streak, self.streak)
+        return GuessResult(True, True, "Correct! 🎵 The song was " + self.current_song)
+
+    def skip_song(self):
+        """
+        Give up on the current song.
+
+        Returns:
+            str or None: Message revealing the song, or None if there is no round to skip
+        """
+        if self.state != rounds.READY or not self.current_song:
+            return None
+
+        # Reset score when skipping, but keep streak
+        self.score = 0
+        self.state = rounds.ANSWERED
+        return f"The song was: {self.current_song}"
+
+    def show_hint(self):
+        """
+        Use the hint for the current round.
+
+        Returns:
+            tuple or None: (extra lyric lines, message); the lines are empty if the hint
+            was already used. None if there is no hint to give.
+        """
+        if self.state != rounds.READY or not self.current_song or not self.hint_lines:
+            return None
+
+        if self.hint_used:
+            return [], "You've already used your hint for this song!"
+
+        self.hint_used = True
+        return (list(self.hint_lines[:HINT_LINES]),
+                "Hint added! Score and streak will not increase if you guess correctly now.")
+
+    def suggestions(self, text):
+        """
+        Titles from the selection that match partly typed text.
+
+        Args:
+            text (str): Text typed so far
+
+        Returns:
+            list: Matching titles, exact alias matches first
+        """
+        text_key = title_key(text) if text else ""
+        if not text_key or not self.selected_songs:
+            return []
+
+        # Filter songs whose canonical key contains the typed text; an endless sampler
+        # covers every artist and keeps an index instead of being scanned
+        songs = self.selected_songs
+        if hasattr(songs, 'suggestion_index'):
+            matching_songs = [song.title for song in songs.suggestion_index().search(text_key)]
+        else:
+            matching_songs = [song.title for song in map(self.catalog.song, songs)
+                              if text_key in song.key]
+
+        # An exact alias ("House of Balloons", "Money") resolves straight to its title
+        for artist in self.pool_artists:
+            alias_song = self.catalog.title_index(artist).resolve(text)
+            if (alias_song and alias_song not in matching_songs
+                    and self.catalog.artist(artist).songs_by_title[alias_song].id in self.selected_songs):
+                matching_songs.insert(0, alias_song)
+        return matching_songs
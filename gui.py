@@ -0,0 +1,1263 @@
+"""
+gui.py
+
+Qt user interface for the Song-Guesser game.
+Imported by main.py only when the window is launched, so PySide6 is never loaded by
+the other entry points.
+"""
+
+import os
+import time
+
+from PySide6.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel,
+                               QVBoxLayout, QHBoxLayout, QWidget, QLineEdit,
+                               QFrame, QSizePolicy, QComboBox, QDialog,
+                               QListWidget, QSpacerItem, QInputDialog)
+from PySide6.QtCore import Qt, QRect, QPoint, Signal, QObject
+from PySide6.QtGui import QIcon, QPainterPath, QRegion
+from PySide6 import QtCore
+
+from keywords import *
+from catalog import get_catalog
+from sampling import CatalogSampler, SAMPLING_MODES
+from engine import GameEngine, NoPlayableSongs
+from instrumentation import record, span, timed
+from watchdog import start_watchdog
+import lyrics
+import rounds
+from rounds import get_scheduler, RoundBuffer
+
+# Selector entry for the endless mode across every artist
+ALL_ARTISTS = "🌍 All Artists (Endless) 🌍"
+
+
+# UI Components
+
+class RoundSignals(QObject):
+    """Carries prepared rounds from the worker threads back to the GUI thread"""
+    prepared = Signal(int, object)  # round generation, concurrent.futures.Future of a rounds.Round
+    buffered = Signal()        # a blitz round preparation finished in the RoundBuffer
+
+
+class SongSuggestionDialog(QDialog):
+    songSelected = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.Popup | Qt.FramelessWindowHint)
+        self.setObjectName("suggestionDialog")
+
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.setSpacing(0)
+
+        self.list_widget = QListWidget()
+        self.list_widget.setObjectName("suggestionList")
+        self.list_widget.itemClicked.connect(self.on_item_selected)
+
+        self.layout.addWidget(self.list_widget)
+
+        # Note: Styles are now in style.qss file
+
+    def set_suggestions(self, songs):
+        """Update the list with new song suggestions"""
+        self.list_widget.clear()
+        for song in songs:
+            self.list_widget.addItem(song)
+
+        # Set size based on content
+        item_height = 36  # Approximate height per item
+        max_height = min(350, len(songs) * item_height + 10)
+        width = max(300, self.parent().width() if self.parent() else 300)
+        self.setFixedSize(width, max_height)
+
+    def on_item_selected(self, item):
+        """Emit signal when a song is selected"""
+        self.songSelected.emit(item.text())
+        self.hide()
+
+    def keyPressEvent(self, event):
+        """Handle keyboard navigation in the list"""
+        key = event.key()
+
+        if key == Qt.Key_Escape:
+            self.hide()
+            event.accept()
+        elif key == Qt.Key_Return or key == Qt.Key_Enter:
+            current_item = self.list_widget.currentItem()
+            if current_item:
+                self.on_item_selected(current_item)
+            event.accept()
+        elif key == Qt.Key_Up or key == Qt.Key_Down:
+            # Pass arrow keys to the list
+            self.list_widget.keyPressEvent(event)
+        else:
+            # Pass other keys to the parent (input field)
+            if self.parent():
+                self.parent().keyPressEvent(event)
+            super().keyPressEvent(event)
+
+
+class RoundedFrame(QFrame):
+    def __init__(self, parent=None, radius=10):
+        super().__init__(parent)
+        self.border_radius = radius
+
+    def paintEvent(self, event):
+        # Let the original paintEvent handle the painting
+        super().paintEvent(event)
+
+    def resizeEvent(self, event):
+        # Create a rounded mask for the frame
+        path = QPainterPath()
+        path.addRoundedRect(0, 0, self.width(), self.height(), self.border_radius, self.border_radius)
+        mask = QRegion(path.toFillPolygon().toPolygon())
+        self.setMask(mask)
+        super().resizeEvent(event)
+
+
+class CustomTitleBar(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parent = parent
+        self.setFixedHeight(50)
+        self.setObjectName("titleBar")
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(15, 0, 15, 0)
+
+        # Title with logo
+        title_layout = QHBoxLayout()
+        title_layout.setSpacing(10)
+
+        # Music icon (you can replace with an actual icon)
+        logo_label = QLabel("🎵")
+        logo_label.setObjectName("logoLabel")
+
+        title = QLabel("MELO-GUESSER")
+        title.setObjectName("titleLabel")
+
+        title_layout.addWidget(logo_label)
+        title_layout.addWidget(title)
+
+        # Control buttons
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(8)
+
+        minimize_button = QPushButton("−")
+        minimize_button.setObjectName("minimizeButton")
+        minimize_button.setFixedSize(30, 30)
+        minimize_button.clicked.connect(self.parent.showMinimized)
+
+        close_button = QPushButton("✕")
+        close_button.setObjectName("closeButton")
+        close_button.setFixedSize(30, 30)
+        close_button.clicked.connect(self.parent.close)
+
+        button_layout.addWidget(minimize_button)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(title_layout)
+        layout.addStretch()
+        layout.addLayout(button_layout)
+
+        self.start_pos = None
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.start_pos = event.globalPosition().toPoint()
+            event.accept()
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton and self.start_pos:
+            delta = event.globalPosition().toPoint() - self.start_pos
+            self.parent.move(self.parent.x() + delta.x(), self.parent.y() + delta.y())
+            self.start_pos = event.globalPosition().toPoint()
+            event.accept()
+
+
+class GuessButton(QPushButton):
+    def __init__(self, text, parent=None, icon=None):
+        super().__init__(text, parent)
+        self.setObjectName("guessButton")
+        self.setMinimumHeight(50)
+        if icon:
+            self.setText(f"{icon} {text}")
+
+
+class ArtistAlbumSelector(QWidget):
+    selectionMade = Signal(str, str, object)  # artist, album, array of song IDs
+    blitzSelectionMade = Signal(str, str, object)  # same, for a timed blitz game
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("artistAlbumSelector")
+
+        # Main layout
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        main_layout.setSpacing(30)
+
+        # Welcome message section
+        welcome_frame = RoundedFrame(radius=10)
+        welcome_frame.setObjectName("welcomeFrame")
+        welcome_layout = QVBoxLayout(welcome_frame)
+        welcome_layout.setContentsMargins(25, 25, 25, 25)
+
+        welcome_logo = QLabel("🎵✨")
+        welcome_logo.setObjectName("welcomeLogo")
+        welcome_logo.setAlignment(Qt.AlignCenter)
+
+        welcome_title = QLabel("WELCOME TO MELO-GUESSER")
+        welcome_title.setObjectName("welcomeTitle")
+        welcome_title.setAlignment(Qt.AlignCenter)
+
+        welcome_text = QLabel(
+            "Test your music knowledge by guessing songs from lyrics! Select an artist and album below to start playing.")
+        welcome_text.setObjectName("welcomeText")
+        welcome_text.setWordWrap(True)
+        welcome_text.setAlignment(Qt.AlignCenter)
+
+        welcome_layout.addWidget(welcome_logo)
+        welcome_layout.addWidget(welcome_title)
+        welcome_layout.addWidget(welcome_text)
+
+        main_layout.addWidget(welcome_frame)
+
+        # Selection section frame
+        selection_frame = RoundedFrame(radius=10)
+        selection_frame.setObjectName("selectionFrame")
+        self.selection_frame = selection_frame  # Store reference for later access
+        selection_layout = QVBoxLayout(selection_frame)
+        selection_layout.setContentsMargins(25, 20, 25, 25)  # Reduced top margin to 20px
+        selection_layout.setSpacing(20)
+
+        # Title - direct positioning
+        title = QLabel("SELECT YOUR MUSIC")
+        title.setObjectName("selectorTitle")
+        title.setAlignment(Qt.AlignCenter)
+        title.setMinimumHeight(35)
+        title.setContentsMargins(0, 0, 0, 5)  # Minimal margins
+
+        # Create spacer for fine-tuned positioning
+        spacer = QSpacerItem(20, 2, QSizePolicy.Minimum, QSizePolicy.Fixed)
+
+        # Custom layout arrangement to position title higher
+        selection_layout.addSpacerItem(spacer)  # Tiny spacer at top
+        selection_layout.addWidget(title)  # Add title immediately after small spacer
+        selection_layout.addSpacing(10)  # Add space after title
+
+        # Apply specific style with negative margins to pull it up
+        title.setStyleSheet("color: #e6c15a; font-size: 24px; font-weight: bold; margin-top: -5px;")
+
+        # Artist selection
+        artist_label = QLabel("CHOOSE AN ARTIST")
+        artist_label.setObjectName("selectorLabel")
+        self.artist_combo = QComboBox()
+        self.artist_combo.setObjectName("artistCombo")
+        self.artist_combo.setMinimumHeight(45)
+
+        ###################################################################################################################
+
+        # Add artists (albums are only loaded from the catalog once an artist is chosen)
+        self.catalog = get_catalog()
+
+        ####################################################################################################################
+
+        for artist in self.catalog.artist_names():
+            self.artist_combo.addItem(artist)
+        self.artist_combo.addItem(ALL_ARTISTS)
+
+        self.artist_combo.currentTextChanged.connect(self.update_albums)
+
+        # Album selection
+        album_label = QLabel("SELECT AN ALBUM")
+        album_label.setObjectName("selectorLabel")
+        self.album_combo = QComboBox()
+        self.album_combo.setObjectName("albumCombo")
+        self.album_combo.setMinimumHeight(45)
+
+        # Let's remove these lines since we're using a simpler approach now
+        # self.album_combo.view().setItemDelegate(QtWidgets.QStyledItemDelegate())
+        # self.album_combo.currentIndexChanged.connect(self.style_album_option)
+
+        # Album info display with improved visibility
+        self.album_info = QLabel()
+        self.album_info.setObjectName("albumInfo")
+        self.album_info.setAlignment(Qt.AlignCenter)
+        self.album_info.setMinimumHeight(40)  # Taller minimum height
+        self.album_info.setStyleSheet(
+            "color: #11c9f5; font-size: 16px; font-weight: bold; margin: 15px 0;")  # Direct styling
+
+        # Confirm button
+        self.confirm_button = QPushButton("START PLAYING")
+        self.confirm_button.setObjectName("confirmButton")
+        self.confirm_button.setMinimumHeight(50)
+        self.confirm_button.clicked.connect(self.confirm_selection)
+
+        # Blitz button: timed game with instant round transitions
+        self.blitz_button = QPushButton("⚡ BLITZ")
+        self.blitz_button.setObjectName("blitzButton")
+        self.blitz_button.setMinimumHeight(50)
+        self.blitz_button.clicked.connect(lambda: self.confirm_selection(blitz=True))
+
+        # Make sure to add the album info to the layout
+        selection_layout.addWidget(artist_label)
+        selection_layout.addWidget(self.artist_combo)
+        selection_layout.addWidget(album_label)
+        selection_layout.addWidget(self.album_combo)
+
+        # Add a spacer between combo and info
+        selection_layout.addSpacing(10)
+
+        # Add album info in a separate frame to make it more visible
+        info_frame = QFrame()
+        info_frame.setMinimumHeight(50)
+        info_frame.setStyleSheet("background-color: #191b22; border-radius: 8px; padding: 5px;")
+        info_layout = QVBoxLayout(info_frame)
+        info_layout.addWidget(self.album_info)
+        selection_layout.addWidget(info_frame)
+
+        buttons_layout = QHBoxLayout()
+        buttons_layout.setSpacing(15)
+        buttons_layout.addWidget(self.confirm_button, 2)
+        buttons_layout.addWidget(self.blitz_button, 1)
+        selection_layout.addLayout(buttons_layout)
+
+        main_layout.addWidget(selection_frame)
+
+        # How to play section
+        how_to_frame = RoundedFrame(radius=10)
+        how_to_frame.setObjectName("howToFrame")
+        how_to_layout = QVBoxLayout(how_to_frame)
+        how_to_layout.setContentsMargins(25, 25, 25, 25)
+
+        how_to_title = QLabel("HOW TO PLAY")
+        how_to_title.setObjectName("howToTitle")
+        how_to_title.setAlignment(Qt.AlignCenter)
+
+        how_to_text = QLabel(
+            "1. Select an artist and album\n2. Read the displayed lyrics\n3. Guess which song they're from\n4. Use HINT for more lyrics (only once per song)\n5. Build your streak and score!")
+        how_to_text.setObjectName("howToText")
+        how_to_text.setAlignment(Qt.AlignCenter)
+
+        how_to_layout.addWidget(how_to_title)
+        how_to_layout.addWidget(how_to_text)
+
+        main_layout.addWidget(how_to_frame)
+
+        # Fill albums for initial artist
+        self.update_albums(self.artist_combo.currentText())
+
+    def update_albums(self, artist_name):
+        """Update album list when artist changes"""
+        self.album_combo.clear()
+
+        if artist_name in self.catalog:
+            # Add "All Albums" option first with special prefix
+            self.album_combo.addItem("⭐ All Albums ⭐")
+
+            # Add individual albums
+            for album in self.catalog.artist(artist_name).albums:
+                self.album_combo.addItem(album.name)
+
+            # Update album info for first album
+            self.update_album_info()
+
+            # Connect album change signal
+            self.album_combo.currentTextChanged.connect(self.update_album_info)
+        elif artist_name == ALL_ARTISTS:
+            # The endless mode offers song weightings instead of albums
+            for label in SAMPLING_MODES.values():
+                self.album_combo.addItem(label)
+            self.update_album_info()
+            self.album_combo.currentTextChanged.connect(self.update_album_info)
+
+    def update_album_info(self):
+        """Update album information display"""
+        artist = self.artist_combo.currentText()
+        album = self.album_combo.currentText()
+
+        # First make sure the label is visible
+        self.album_info.setVisible(True)
+
+        if artist == ALL_ARTISTS:
+            # Counts come from the manifest, so no artist is loaded here
+            names = self.catalog.artist_names()
+            total_songs = sum(self.catalog.song_count(name) for name in names)
+            self.album_info.setText(f"Endless • {total_songs} songs • {len(names)} artists")
+            return
+
+        if artist not in self.catalog:
+            return
+
+        artist_record = self.catalog.artist(artist)
+        if album == "⭐ All Albums ⭐":
+            # Distinct songs across all albums is precomputed on the artist record
+            self.album_info.setText(f"Total: {artist_record.song_count} songs")
+        elif album in artist_record.albums_by_name:
+            album_record = artist_record.albums_by_name[album]
+            self.album_info.setText(f"{album_record.release_year} • {album_record.song_count} songs")
+
+        # Print for debugging (the message is only built if debug output is on)
+        print_debug("Album info updated:", self.album_info.text())
+
+    def confirm_selection(self, blitz=False):
+        """Emit signal with selected artist, album and song IDs"""
+        artist = self.artist_combo.currentText()
+        album = self.album_combo.currentText()
+        signal = self.blitzSelectionMade if blitz else self.selectionMade
+
+        if artist in self.catalog:
+            artist_record = self.catalog.artist(artist)
+            if album == "⭐ All Albums ⭐":
+                # Deduplicated pool of every song by this artist, built once at load
+                signal.emit(artist, "All Albums", artist_record.song_ids)
+            elif album in artist_record.albums_by_name:
+                signal.emit(artist, album, artist_record.albums_by_name[album].song_ids)
+        elif artist == ALL_ARTISTS:
+            # Endless mode: songs are drawn through weighted alias tables, never copied into a pool
+            for mode, label in SAMPLING_MODES.items():
+                if label == album:
+                    signal.emit("All Artists", f"Endless • {label}", CatalogSampler(self.catalog, mode))
+
+
+# Main Application Class
+class SongGuesserApp(QMainWindow):
+    def __init__(self):
+        super().__init__(None, Qt.FramelessWindowHint)
+        self.setWindowTitle("Melo-Guesser")
+
+        # Get screen size and calculate window size
+        screen = QApplication.primaryScreen().geometry()
+        screen_width = screen.width()
+        screen_height = screen.height()
+
+        # Set window size based on screen resolution
+        if screen_width >= 2560:  # 2K or higher resolution
+            # For 2K+, use the original scaling
+            width = int(screen_width * 0.55)
+            height = int(screen_height * 0.7)
+        else:  # Full HD or lower resolution
+            # Make the app significantly taller on Full HD screens - increase to 85%
+            width = int(screen_width * 0.65)
+            height = int(screen_height * 0.9)  # Increased from 0.85 to 0.9 (90% of screen height)
+
+        # Enforce minimum dimensions
+        min_width = 650
+        min_height = 700  # Increased from 600 to 700
+        width = max(width, min_width)
+        height = max(height, min_height)
+
+        # Center window
+        window_x = (screen_width - width) // 2
+        window_y = (screen_height - height) // 2
+        self.setGeometry(QRect(window_x, window_y, width, height))
+        self.setFixedSize(width, height)
+
+        # Create rounded window mask
+        self.setWindowFlags(Qt.FramelessWindowHint)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+
+        # Create main container
+        self.main_container = RoundedFrame(self, radius=15)
+        self.main_container.setObjectName("mainContainer")
+        self.setCentralWidget(self.main_container)
+
+        main_layout = QVBoxLayout(self.main_container)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.setSpacing(0)
+
+        # Add custom title bar
+        title_bar = CustomTitleBar(self)
+        main_layout.addWidget(title_bar)
+
+        # Create content widget and stacked layout for game modes
+        self.content = QWidget()
+        self.content.setObjectName("mainContent")
+        self.content_layout = QVBoxLayout(self.content)
+        self.content_layout.setContentsMargins(30, 25, 30, 25)
+        self.content_layout.setSpacing(25)
+
+        # Game rules and state live in the headless engine; the window drives it
+        self.catalog = get_catalog()
+        self.engine = GameEngine(self.catalog)
+
+        # Round state machine (see rounds.py, state kept in engine.state): the next round
+        # is prepared in the background while the result of the current one is displayed
+        self.round_generation = 0   # Bumped whenever the round or selection changes
+        self.pending_round = None   # Future of the round being prepared
+        self.prepared_round = None  # Prepared round waiting to be shown
+        self.round_requested_at = None  # perf_counter() when the shown round was asked for
+        self.round_signals = RoundSignals()
+        self.round_signals.prepared.connect(self.on_round_prepared)
+        self.round_signals.buffered.connect(self.on_round_buffered)
+
+        # Blitz mode: rounds come from a ring buffer filled by the scheduler's workers
+        self.blitz_buffer = None
+        self.blitz_deadline = None
+        self.blitz_answered_at = None
+        self.blitz_message = ""
+        self.blitz_latencies = []
+        self.blitz_timer = QtCore.QTimer(self)  # Countdown display
+        self.blitz_timer.setInterval(1000)
+        self.blitz_timer.timeout.connect(self.on_blitz_tick)
+        self.blitz_end_timer = QtCore.QTimer(self)  # Fires at the deadline
+        self.blitz_end_timer.setSingleShot(True)
+        self.blitz_end_timer.setTimerType(Qt.PreciseTimer)
+        self.blitz_end_timer.timeout.connect(self.end_blitz)
+
+        # Create the album selector widget
+        self.album_selector = ArtistAlbumSelector()
+        self.album_selector.selectionMade.connect(self.on_album_selected)
+        self.album_selector.blitzSelectionMade.connect(self.on_blitz_selected)
+        self.content_layout.addWidget(self.album_selector)
+
+        # Create the game UI (initially hidden)
+        self.game_widget = QWidget()
+        self.game_layout = QVBoxLayout(self.game_widget)
+        self.game_layout.setContentsMargins(0, 0, 0, 0)
+        self.game_layout.setSpacing(25)
+        self.game_widget.hide()
+
+        # Game header with progress bar
+        header_frame = QFrame()
+        header_frame.setObjectName("headerFrame")
+        header_layout = QVBoxLayout(header_frame)
+        header_layout.setContentsMargins(0, 0, 0, 10)
+        header_layout.setSpacing(15)
+
+        self.header = QLabel("GUESS THE SONG FROM LYRICS")
+        self.header.setObjectName("gameHeader")
+        self.header.setAlignment(Qt.AlignCenter)
+        header_layout.addWidget(self.header)
+
+        # Progress bar removed from here
+
+        self.game_layout.addWidget(header_frame)
+
+        # Score and streak area
+        stats_layout = QHBoxLayout()
+        stats_layout.setSpacing(15)
+
+        # Score display
+        score_frame = RoundedFrame(radius=8)
+        score_frame.setObjectName("scoreFrame")
+        score_layout = QVBoxLayout(score_frame)
+        score_title = QLabel("SCORE")
+        score_title.setObjectName("statLabel")
+        score_title.setAlignment(Qt.AlignCenter)
+        self.score_label = QLabel("0")
+        self.score_label.setObjectName("scoreValue")
+        self.score_label.setAlignment(Qt.AlignCenter)
+        score_layout.addWidget(score_title)
+        score_layout.addWidget(self.score_label)
+        stats_layout.addWidget(score_frame)
+
+        # Streak display
+        streak_frame = RoundedFrame(radius=8)
+        streak_frame.setObjectName("streakFrame")
+        streak_layout = QVBoxLayout(streak_frame)
+        streak_title = QLabel("STREAK")
+        streak_title.setObjectName("statLabel")
+        streak_title.setAlignment(Qt.AlignCenter)
+        self.streak_label = QLabel("0")
+        self.streak_label.setObjectName("streakValue")
+        self.streak_label.setAlignment(Qt.AlignCenter)
+        streak_layout.addWidget(streak_title)
+        streak_layout.addWidget(self.streak_label)
+        stats_layout.addWidget(streak_frame)
+
+        # Album info display
+        album_display = RoundedFrame(radius=8)
+        album_display.setObjectName("albumDisplayFrame")
+        album_display_layout = QVBoxLayout(album_display)
+        album_title = QLabel("ALBUM")
+        album_title.setObjectName("statLabel")
+        album_title.setAlignment(Qt.AlignCenter)
+        self.album_label = QLabel("")
+        self.album_label.setObjectName("albumValue")
+        self.album_label.setAlignment(Qt.AlignCenter)
+        album_display_layout.addWidget(album_title)
+        album_display_layout.addWidget(self.album_label)
+        stats_layout.addWidget(album_display)
+
+        self.game_layout.addLayout(stats_layout)
+
+        # Lyric display with decorative elements
+        lyric_frame = RoundedFrame(radius=8)
+        lyric_frame.setObjectName("lyricFrame")
+        lyric_layout = QVBoxLayout(lyric_frame)
+        lyric_layout.setContentsMargins(20, 20, 20, 20)
+
+        # Add quote marks
+        quote_open = QLabel('"')
+        quote_open.setObjectName("quoteOpen")
+        quote_open.setAlignment(Qt.AlignLeft)
+        lyric_layout.addWidget(quote_open)
+
+        # Lyric text
+        self.lyric_label = QLabel("Select an artist and album to start guessing...")
+        self.lyric_label.setObjectName("lyricDisplay")
+        self.lyric_label.setWordWrap(True)
+        self.lyric_label.setAlignment(Qt.AlignCenter)
+        lyric_layout.addWidget(self.lyric_label, 1)
+
+        # Closing quote
+        quote_close = QLabel('"')
+        quote_close.setObjectName("quoteClose")
+        quote_close.setAlignment(Qt.AlignRight)
+        lyric_layout.addWidget(quote_close)
+
+        self.game_layout.addWidget(lyric_frame, 1)
+
+        # Guess input area
+        input_frame = QFrame()
+        input_frame.setObjectName("inputFrame")
+        input_layout = QVBoxLayout(input_frame)
+        input_layout.setSpacing(15)
+
+        input_label = QLabel("YOUR GUESS")
+        input_label.setObjectName("inputLabel")
+        input_layout.addWidget(input_label)
+
+        # Create a line edit with custom song suggestion dialog
+        self.guess_input = QLineEdit()
+        self.guess_input.setPlaceholderText("Start typing to see song suggestions...")
+        self.guess_input.setObjectName("guessInput")
+        self.guess_input.setMinimumHeight(50)
+        self.guess_input.textChanged.connect(self.on_guess_text_changed)
+        self.guess_input.returnPressed.connect(self.submit_guess)
+        input_layout.addWidget(self.guess_input)
+
+        # Create the suggestion dialog
+        self.suggestion_dialog = SongSuggestionDialog(self.guess_input)
+        self.suggestion_dialog.songSelected.connect(self.on_song_selected)
+
+        self.submit_button = GuessButton("SUBMIT GUESS", icon="🎯")
+        self.submit_button.clicked.connect(self.submit_guess)
+        input_layout.addWidget(self.submit_button)
+
+        self.game_layout.addWidget(input_frame)
+
+        # Results area with animated feedback
+        self.result_label = QLabel("")
+        self.result_label.setObjectName("resultLabel")
+        self.result_label.setAlignment(Qt.AlignCenter)
+        self.game_layout.addWidget(self.result_label)
+
+        # Game control buttons
+        buttons_layout = QHBoxLayout()
+        buttons_layout.setSpacing(15)
+
+        # HINT button (replacing NEW SONG button)
+        self.hint_button = GuessButton("HINT", icon="💡")
+        self.hint_button.clicked.connect(self.show_hint)
+        self.hint_button.setObjectName("newSongButton")  # Keep same styling
+
+        self.skip_button = GuessButton("SKIP", icon="⏭️")
+        self.skip_button.clicked.connect(self.skip_song)
+        self.skip_button.setObjectName("skipButton")
+
+        self.change_album_button = GuessButton("MAIN MENU", icon="💿")
+        self.change_album_button.clicked.connect(self.change_album)
+        self.change_album_button.setObjectName("changeAlbumButton")
+
+        buttons_layout.addWidget(self.hint_button)
+        buttons_layout.addWidget(self.skip_button)
+        buttons_layout.addWidget(self.change_album_button)
+
+        self.game_layout.addLayout(buttons_layout)
+
+        # Add the game widget to content
+        self.content_layout.addWidget(self.game_widget)
+
+        # Add content to main layout
+        main_layout.addWidget(self.content)
+
+        # Apply stylesheet
+        self.apply_stylesheet()
+
+        # Apply resolution-specific adjustments
+        self.adjust_for_resolution()
+
+    def on_album_selected(self, artist, album, songs):
+        """Handle album selection (songs is an array of song IDs, possibly from several artists)"""
+        self.start_game(artist, album, songs)
+
+    def on_blitz_selected(self, artist, album, songs):
+        """Handle album selection for a timed blitz game"""
+        self.start_game(artist, album, songs, blitz=True)
+
+    def start_game(self, artist, album, songs, blitz=False):
+        """Reset the game for a new selection and start loading rounds"""
+        self.stop_blitz()
+        self.engine.select(artist, album, songs)
+
+        # Update album display
+        self.album_label.setText(f"{album}")
+        self.header.setText(f"GUESS {artist.upper()} SONGS FROM LYRICS")
+
+        # Hide selector and show game
+        self.album_selector.hide()
+        self.game_widget.show()
+
+        # Reset game stats
+        self.score_label.setText("0")
+        self.streak_label.setText("0")
+
+        # Start loading the first song right away
+        self.abort_pending_rounds()
+        if blitz:
+            self.start_blitz()
+        else:
+            self.new_song()
+
+    @timed("gui.new_song")
+    def new_song(self):
+        """Start a new round: show the loading state and prepare a random song"""
+        try:
+            if not self.engine.selected_songs:
+                return
+
+            self.abort_pending_rounds()
+            self.engine.state = rounds.LOADING
+            self.lyric_label.setText("Now loading...")
+            self.result_label.setText("")
+            self.fetch_and_display_lyrics()
+        except Exception as e:
+            print_error(f"Error in new_song: {e}")
+
+    @timed("gui.fetch_and_display_lyrics")
+    def fetch_and_display_lyrics(self):
+        """
+        Pick the next song and prepare its lyrics on a worker thread. The round is shown
+        by on_round_prepared as soon as it is ready and the previous result was displayed.
+        """
+        try:
+            self.prepared_round = None
+            self.round_requested_at = time.perf_counter()
+            generation = self.round_generation
+            future = self.pending_round = self.engine.prepare_playable_round(
+                get_scheduler(), self.ensure_fetch_possible, lambda: self.round_generation != generation)
+            future.add_done_callback(lambda done: self.round_signals.prepared.emit(generation, done))
+        except NoPlayableSongs as e:
+            print_warning(e)
+            self.lyric_label.setText(str(e))
+        except Exception as e:
+            print_error(f"Error in fetch_and_display_lyrics: {e}")
+
+    def abort_pending_rounds(self):
+        """
+        Start a new round generation: cancel the round being prepared (if it has not
+        started yet) and make sure any late result for it is discarded.
+        """
+        self.round_generation += 1
+        if self.pending_round is not None:
+            self.pending_round.cancel()
+            self.pending_round = None
+        self.prepared_round = None
+
+    def on_round_prepared(self, generation, future):
+        """A round finished preparing (GUI thread); show it if the game is waiting for it"""
+        if generation != self.round_generation or future.cancelled():
+            print_debug("Discarding stale round from generation", generation)
+            return
+        self.pending_round = None
+
+        try:
+            round_ = future.result()
+        except NoPlayableSongs as e:
+            print_warning(e)
+            self.lyric_label.setText(str(e))
+            return
+        except Exception as e:
+            print_error(f"Error preparing round: {e}")
+            if self.engine.selected_songs:
+                self.fetch_and_display_lyrics()
+            return
+        if round_ is None:
+            return
+        self.prepared_round = round_
+
+        if self.engine.state in (rounds.LOADING, rounds.ADVANCING):
+            self.display_round()
+
+    def display_round(self):
+        """Show the prepared round and wait for a guess"""
+        round_ = self.prepared_round
+        self.prepared_round = None
+        self.engine.start_round(round_)
+
+        if self.round_requested_at is not None:
+            # From asking for the round to showing it, including the result display time
+            record("round.wait", time.perf_counter() - self.round_requested_at)
+            self.round_requested_at = None
+        with span("gui.set_text"):
+            self.lyric_label.setText(round_.lyric)
+        # Roughly the layout and repaint: posted update events run before a zero timer
+        shown_at = time.perf_counter()
+        QtCore.QTimer.singleShot(0, lambda: record("gui.repaint", time.perf_counter() - shown_at))
+        self.result_label.setText("")
+
+        # Reset input field safely
+        self.guess_input.clear()
+        # Hide suggestion dialog if visible
+        if hasattr(self, 'suggestion_dialog'):
+            self.suggestion_dialog.hide()
+
+        print_success(f"New song loaded: {round_.title} by {round_.artist}")
+
+    def finish_round(self, message):
+        """
+        Show the result of the current round. The next round is prepared while the
+        result is on screen and appears once both are done.
+        """
+        if self.blitz_buffer is not None:
+            # Blitz: the next round comes straight from the buffer
+            self.blitz_answered_at = time.perf_counter()
+            self.blitz_message = message
+            self.advance_blitz()
+            return
+
+        self.result_label.setText(message)
+        self.abort_pending_rounds()
+        self.fetch_and_display_lyrics()
+        generation = self.round_generation
+        shown_at = time.perf_counter()
+        QtCore.QTimer.singleShot(rounds.RESULT_DISPLAY_MS, lambda: self.on_result_displayed(generation, shown_at))
+
+    def on_result_displayed(self, generation, shown_at):
+        """The result has been shown long enough; advance as soon as the next round is ready"""
+        # How late the result timer fired, e.g. behind a blocked event loop
+        late = time.perf_counter() - shown_at - rounds.RESULT_DISPLAY_MS / 1000
+        record("gui.result_timer_late", max(0.0, late))
+        if generation != self.round_generation or self.engine.state != rounds.ANSWERED:
+            return  # The game moved on (new selection or main menu) while the result was shown
+
+        self.engine.state = rounds.ADVANCING
+        if self.prepared_round is not None:
+            self.display_round()
+        else:
+            self.lyric_label.setText("Now loading...")
+
+    def start_blitz(self):
+        """Fill the round buffer; the clock starts once it is full"""
+        self.ensure_fetch_possible()
+        self.blitz_latencies = []
+        self.blitz_answered_at = None
+        self.blitz_message = ""
+        self.blitz_deadline = None
+        # Songs are drawn here on the GUI thread; workers only prepare them and the
+        # queued buffered signal brings each finished preparation back to this thread
+        self.blitz_buffer = RoundBuffer(get_scheduler(), self.engine.draw_playable_song,
+                                        on_ready=self.round_signals.buffered.emit)
+        self.engine.state = rounds.LOADING
+        self.header.setText(f"⚡ BLITZ: {self.engine.current_artist.upper()}")
+        self.lyric_label.setText(f"Warming up... 0/{self.blitz_buffer.capacity} rounds ready")
+        self.result_label.setText("")
+        self.fill_blitz_buffer()
+
+    def fill_blitz_buffer(self):
+        """
+        Queue blitz round preparations until the buffer is full (GUI thread).
+
+        Returns:
+            bool: False if the blitz game was stopped because no song can be played
+        """
+        try:
+            self.blitz_buffer.fill()
+            return True
+        except NoPlayableSongs as e:
+            print_warning(e)
+            self.stop_blitz()
+            self.lyric_label.setText(str(e))
+            return False
+
+    def on_round_buffered(self):
+        """A blitz round preparation finished (GUI thread): refill, and use the round"""
+        buffer = self.blitz_buffer
+        if buffer is None or not self.fill_blitz_buffer():
+            return
+
+        if self.blitz_deadline is None:
+            if len(buffer) < buffer.capacity:
+                self.lyric_label.setText(f"Warming up... {len(buffer)}/{buffer.capacity} rounds ready")
+                return
+            # Buffer is full: start the clock and the first round
+            self.blitz_deadline = time.perf_counter() + rounds.BLITZ_DURATION_MS / 1000
+            self.blitz_end_timer.start(rounds.BLITZ_DURATION_MS)
+            self.blitz_timer.start()
+            self.on_blitz_tick()
+            self.advance_blitz()
+        elif self.engine.state == rounds.ADVANCING and len(buffer):
+            self.advance_blitz()
+
+    def advance_blitz(self):
+        """Show the next buffered round and record how long the transition took"""
+        round_ = self.blitz_buffer.pop()
+        if not self.fill_blitz_buffer():
+            return
+        if round_ is None:
+            # Buffer ran dry (counted by the buffer); wait for the next ready round
+            self.engine.state = rounds.ADVANCING
+            self.lyric_label.setText("Now loading...")
+            return
+
+        self.prepared_round = round_
+        self.display_round()
+
+        if self.blitz_answered_at is not None:
+            latency_ms = (time.perf_counter() - self.blitz_answered_at) * 1000
+            self.blitz_latencies.append(latency_ms)
+            self.result_label.setText(f"{self.blitz_message}   ⚡ {latency_ms:.0f} ms")
+            self.blitz_answered_at = None
+
+    def on_blitz_tick(self):
+        """Update the countdown and end the game when time is up"""
+        if self.blitz_deadline is None:
+            return
+        remaining = self.blitz_deadline - time.perf_counter()
+        if remaining <= 0:
+            self.end_blitz()
+            return
+        self.header.setText(f"⚡ BLITZ: {self.engine.current_artist.upper()} • {remaining:.0f}s LEFT")
+
+    def blitz_time_up(self):
+        """End the blitz game if its deadline has passed (the end timer may be late)"""
+        if self.blitz_deadline is not None and time.perf_counter() >= self.blitz_deadline:
+            self.end_blitz()
+            return True
+        return False
+
+    def end_blitz(self):
+        """Stop the clock and show the score and transition latency summary"""
+        buffer = self.blitz_buffer
+        if buffer is None:
+            return
+        self.stop_blitz()
+        self.engine.state = rounds.ANSWERED
+
+        latencies = sorted(self.blitz_latencies)
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            latency_text = f"Transitions: p50 {p50:.0f} ms • p95 {p95:.0f} ms • max {latencies[-1]:.0f} ms"
+        else:
+            latency_text = "No transitions recorded"
+
+        self.header.setText("⚡ BLITZ OVER")
+        self.lyric_label.setText(f"Score: {self.engine.score} • Best streak: {self.engine.max_streak} • "
+                                 f"Rounds: {self.engine.songs_played}\n{latency_text}\n"
+                                 f"Buffer ran dry {buffer.underruns} times")
+        self.result_label.setText("")
+        print_success(f"Blitz finished: {self.lyric_label.text()}")
+
+    def stop_blitz(self):
+        """Stop a running blitz game, if any"""
+        self.blitz_timer.stop()
+        self.blitz_end_timer.stop()
+        if self.blitz_buffer is not None:
+            self.blitz_buffer.close()
+            self.blitz_buffer = None
+        self.blitz_deadline = None
+
+    def ask_token(self):
+        """Ask for a Genius token in a dialog; cancelling keeps playing from the cache"""
+        token, ok = QInputDialog.getText(
+            self, "Genius API token",
+            "This song's lyrics aren't cached yet.\nEnter a Genius API token to fetch them:",
+            QLineEdit.Password)
+        return token if ok else ""
+
+    def ensure_fetch_possible(self):
+        """Make sure lyrics can be fetched, asking for a token the first time one is needed"""
+        return lyrics.ensure_fetch_possible(self.ask_token)
+
+    def show_hint(self):
+        """Show additional lyrics as a hint"""
+        hint = self.engine.show_hint()
+        if hint is None:
+            return
+
+        new_lines, message = hint
+        if new_lines:
+            # Add the extra lines under the current lyrics
+            self.lyric_label.setText(self.lyric_label.text() + "\n" + "\n".join(new_lines))
+        self.result_label.setText(message)
+
+    def skip_song(self):
+        """Skip the current song"""
+        if self.blitz_time_up():
+            return
+        message = self.engine.skip_song()
+        if message is not None:
+            # Score is reset when skipping, but the streak is kept
+            self.score_label.setText(str(self.engine.score))
+            self.finish_round(message)
+
+    def on_guess_text_changed(self, text):
+        """Handle text changes in the guess input field"""
+        try:
+            matching_songs = self.engine.suggestions(text)
+
+            # Update and show the suggestion dialog if we have matches
+            if matching_songs:
+                self.suggestion_dialog.set_suggestions(matching_songs)
+
+                # Position the dialog below the input field
+                pos = self.guess_input.mapToGlobal(
+                    QPoint(0, self.guess_input.height()))
+                self.suggestion_dialog.move(pos)
+                self.suggestion_dialog.show()
+            else:
+                self.suggestion_dialog.hide()
+        except Exception as e:
+            print_error(f"Error in on_guess_text_changed: {e}")
+
+    def on_song_selected(self, song):
+        """Handle song selection from the suggestion dialog"""
+        try:
+            self.guess_input.setText(song)
+            self.guess_input.setFocus()
+        except Exception as e:
+            print_error(f"Error in on_song_selected: {e}")
+
+    def submit_guess(self):
+        """Process the user's guess"""
+        try:
+            # Hide suggestion dialog
+            self.suggestion_dialog.hide()
+            if self.blitz_time_up():
+                return  # Guesses after the blitz deadline don't count
+
+            result = self.engine.submit_guess(self.guess_input.text())
+            if result is None:
+                return  # Empty guess, or the round is over or still loading
+
+            # Score is reset on a wrong answer, but the streak is kept
+            self.score_label.setText(str(self.engine.score))
+            if not result.correct:
+                self.result_label.setText(result.message)
+                return
+
+            if result.scored:
+                self.streak_label.setText(str(self.engine.streak))
+
+            # Highlight the score with animation
+            self.score_label.setStyleSheet("color: #6eff8a; font-size: 24px; font-weight: bold;")
+            QtCore.QTimer.singleShot(1000, lambda: self.score_label.setStyleSheet(""))
+
+            # Show success message while the next song is prepared
+            self.finish_round(result.message)
+        except Exception as e:
+            print_error(f"Error in submit_guess: {e}")
+
+    def change_album(self):
+        """Return to album selection"""
+        # Reset game; stop blitz first so no buffered round is shown on the cleared engine
+        self.stop_blitz()
+        self.engine.clear()
+        self.abort_pending_rounds()
+
+        # Hide game and show selector
+        self.game_widget.hide()
+        self.album_selector.show()
+
+    def apply_stylesheet(self):
+        """Apply the external stylesheet from style.qss with appropriate scaling"""
+        try:
+            # Find the stylesheet file
+            script_dir = os.path.dirname(os.path.abspath(__file__))
+            style_path = os.path.join(script_dir, "style.qss")
+
+            if os.path.exists(style_path):
+                # Open and read the stylesheet
+                with open(style_path, "r") as style_file:
+                    stylesheet = style_file.read()
+
+                # Apply the stylesheet
+                self.setStyleSheet(stylesheet)
+                print_success(f"Applied stylesheet from style.qss")
+            else:
+                print_error(f"Stylesheet not found at: {style_path}")
+        except Exception as e:
+            print_error(f"Error applying stylesheet: {e}")
+
+    def fix_selector_title(self):
+        """Directly fix the selector title visibility and position it higher"""
+        try:
+            # Find the title in the selection frame
+            if hasattr(self.album_selector, 'selection_frame'):
+                # Try to find the label by object name
+                for child in self.album_selector.selection_frame.findChildren(QLabel):
+                    if child.objectName() == "selectorTitle" or child.text() == "SELECT YOUR MUSIC":
+                        # Fix the label position to move it higher
+                        child.setMinimumHeight(40)
+
+                        # Modify margins to position text higher
+                        child.setContentsMargins(0, 5, 0, 10)
+
+                        # Add margin-top: -10px to move text higher in its container
+                        child.setStyleSheet(
+                            "font-size: 24px; font-weight: bold; color: #e6c15a; margin-top: -10px; margin-bottom: 10px;")
+
+                        print_debug("Moved selector title higher")
+                        return
+
+            print_debug("Could not find selector title to fix - manual adjustment may be needed")
+        except Exception as e:
+            print_error(f"Error fixing selector title: {e}")
+
+    def adjust_for_resolution(self):
+        """Apply specific size adjustments based on the screen resolution"""
+        screen = QApplication.primaryScreen().geometry()
+        screen_width = screen.width()
+
+        if screen_width <= 1920:  # Full HD or lower resolution
+            # Minimum heights for critical components
+            min_height_combo = 45
+            min_height_button = 50
+            min_height_input = 50
+
+            # Adjust selection frame vertical spacing
+            if hasattr(self.album_selector, 'layout'):
+                self.album_selector.layout().setSpacing(20)  # Increase spacing in selector view
+
+            # Fix combo box heights
+            if hasattr(self.album_selector, 'artist_combo'):
+                self.album_selector.artist_combo.setMinimumHeight(min_height_combo)
+            if hasattr(self.album_selector, 'album_combo'):
+                self.album_selector.album_combo.setMinimumHeight(min_height_combo)
+
+            # Fix button heights
+            if hasattr(self.album_selector, 'confirm_button'):
+                self.album_selector.confirm_button.setMinimumHeight(min_height_button)
+
+            # Fix game UI elements
+            if hasattr(self, 'guess_input'):
+                self.guess_input.setMinimumHeight(min_height_input)
+            if hasattr(self, 'submit_button'):
+                self.submit_button.setMinimumHeight(min_height_button)
+            if hasattr(self, 'hint_button'):
+                self.hint_button.setMinimumHeight(min_height_button)
+            if hasattr(self, 'skip_button'):
+                self.skip_button.setMinimumHeight(min_height_button)
+            if hasattr(self, 'change_album_button'):
+                self.change_album_button.setMinimumHeight(min_height_button)
+
+            # Increase vertical space throughout the app
+            self.content_layout.setContentsMargins(20, 20, 20, 20)  # Increased top/bottom margins
+            self.content_layout.setSpacing(25)  # Increased spacing between main elements
+
+            # Set specific minimum height for selection frame
+            if hasattr(self.album_selector, 'selection_frame'):
+                # Access the title label inside the selection frame
+                for child in self.album_selector.selection_frame.children():
+                    if isinstance(child, QLabel) and child.objectName() == "selectorTitle":
+                        # Ensure the label has enough space
+                        child.setMinimumHeight(35)  # Increase minimum height
+                        # Adjust margin if needed
+                        child.setContentsMargins(0, 10, 0, 10)
+                        print_debug("Adjusted selector title height and margins")
+
+                # Add more padding at the top of the selection frame layout
+                if hasattr(self.album_selector.selection_frame, 'layout'):
+                    selection_layout = self.album_selector.selection_frame.layout()
+                    if selection_layout:
+                        current_margins = selection_layout.contentsMargins()
+                        selection_layout.setContentsMargins(
+                            current_margins.left(),
+                            30,  # Increase top margin to 30px
+                            current_margins.right(),
+                            current_margins.bottom()
+                        )
+                        print_debug("Increased selection frame top margin")
+
+            # Increase the height of the welcome frame
+            if hasattr(self.album_selector, 'welcomeFrame'):
+                self.album_selector.welcomeFrame.setMinimumHeight(200)  # Set minimum height
+
+            # Increase the height of the how-to-play frame
+            if hasattr(self.album_selector, 'howToFrame'):
+                self.album_selector.howToFrame.setMinimumHeight(180)  # Set minimum height
+
+            print_debug(f"Applied Full HD resolution adjustments with increased height")
+
+            self.fix_selector_title()
+
+
+    def adjust_ui_elements(self):
+        """Adjust UI element dimensions based on window size"""
+        # Calculate a scale factor based on window height
+        scale_factor = self.height() / 900.0  # Assuming 900px is the "standard" height
+
+        # Apply minimum heights to various UI elements
+        button_height = max(int(50 * scale_factor), 40)  # Minimum 40px
+
+        # Update button heights
+        if hasattr(self, 'submit_button'):
+            self.submit_button.setMinimumHeight(button_height)
+        if hasattr(self, 'hint_button'):
+            self.hint_button.setMinimumHeight(button_height)
+        if hasattr(self, 'skip_button'):
+            self.skip_button.setMinimumHeight(button_height)
+        if hasattr(self, 'change_album_button'):
+            self.change_album_button.setMinimumHeight(button_height)
+        if hasattr(self, 'confirm_button'):
+            self.confirm_button.setMinimumHeight(button_height)
+        if hasattr(self, 'guess_input'):
+            self.guess_input.setMinimumHeight(button_height)
+
+    def showEvent(self, event):
+        """Handle window show event"""
+        super().showEvent(event)
+        # Adjust UI elements based on window size
+        QtCore.QTimer.singleShot(10, self.adjust_ui_elements)
+        # Apply resolution-specific adjustments
+        QtCore.QTimer.singleShot(20, self.adjust_for_resolution)
+
+
+def run_gui(argv):
+    """
+    Create the application and main window and run the Qt event loop.
+
+    Args:
+        argv (list): Command line arguments for QApplication
+
+    Returns:
+        int: Exit code of the event loop
+    """
+    app = QApplication(argv)
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    icon_path = os.path.join(script_dir, "assets", "image2.png")
+
+    if os.path.exists(icon_path):
+        print_success(f"Icon found at: {icon_path}")
+        app.setWindowIcon(QIcon(icon_path))
+    else:
+        print_error(f"Icon not found at: {icon_path}")
+
+    window = SongGuesserApp()
+    window.show()
+
+    # Log and measure stalls of the event loop for the whole session
+    watchdog = start_watchdog()
+
+    # Build the Genius client in the background once the window is up
+    QtCore.QTimer.singleShot(0, lyrics.warm_up)
+
+    if os.getenv("MELO_STARTUP_PROBE"):
+        # Used by benchmarks/startup.py: report once the first window has been shown, then quit
+        def report_startup():
+            print("startup-probe: window shown", flush=True)
+            app.quit()
+
+        QtCore.QTimer.singleShot(0, report_startup)
+
+    exit_code = app.exec()
+    if watchdog is not None:
+        watchdog.stop()
+    return exit_code
@@ -0,0 +1,249 @@
+"""
+instrumentation.py
+
+Per-round latency breakdown for the Song-Guesser game.
+Spans around the steps of a round (Genius search, lyrics page fetch, line cleaning,
+round preparation, Qt timer delays, label updates) are collected into in-process
+histograms, one per span name. A span costs two perf_counter calls and one bucket
+increment, so timings are on by default; MELO_TIMINGS=0 turns them off, in which case
+timed() leaves functions unwrapped and span() does nothing.
+
+Histograms use log-spaced buckets (four per doubling, from 1 microsecond to about 15
+minutes), so memory is fixed whatever the session length and percentiles are within
+about 20%. They can be exported as JSON (buckets included) or CSV (one row of
+count, mean and percentiles per span); main.py --timings DIR writes both for the
+session when the game exits.
+"""
+
+import atexit
+import bisect
+import csv
+import functools
+import json
+import os
+import threading
+import time
+
+ENABLED = os.getenv("MELO_TIMINGS", "1") != "0"
+
+# Bucket i counts durations below BUCKET_BOUNDS_US[i] microseconds (and at least the
+# previous bound); one more bucket holds everything longer
+BUCKET_BOUNDS_US = tuple(sorted({round(2 ** (i / 4)) for i in range(1, 4 * 30)}))
+BUCKET_COUNT = len(BUCKET_BOUNDS_US) + 1
+
+PERCENTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """Durations recorded under one span name"""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.buckets[bisect.bisect_right(BUCKET_BOUNDS_US, seconds * 1e6)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction):
+        """
+        Estimate a percentile from the buckets.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.99
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, in seconds,
+            clamped to the recorded range (0 if nothing was recorded)
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                if index == len(BUCKET_BOUNDS_US):
+                    return self.max
+                return min(max(BUCKET_BOUNDS_US[index] / 1e6, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        """Count, total, mean, min, max and percentiles, in milliseconds"""
+        summary = {"count": self.count,
+                   "total_ms": self.total * 1000,
+                   "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+                   "min_ms": (self.min or 0.0) * 1000,
+                   "max_ms": self.max * 1000}
+        for fraction in PERCENTILES:
+            summary[f"p{int(fraction * 100)}_ms"] = self.percentile(fraction) * 1000
+        return summary
+
+
+class Recorder:
+    """
+    Thread-safe set of histograms keyed by span name.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """Add one duration to a span's histogram"""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        Summaries and buckets of every span.
+
+        Returns:
+            dict: Session start time and span name -> summary with its bucket counts
+        """
+        with self._lock:
+            spans = {name: dict(histogram.summary(), buckets=list(histogram.buckets))
+                     for name, histogram in sorted(self.histograms.items())}
+        return {"started_at": self.started_at, "bucket_bounds_us": list(BUCKET_BOUNDS_US),
+                "spans": spans}
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as json_file:
+            json.dump(self.snapshot(), json_file, indent=2)
+
+    def export_csv(self, path):
+        spans = self.snapshot()["spans"]
+        columns = ["span", "count", "total_ms", "mean_ms", "min_ms", "max_ms"] + \
+                  [f"p{int(fraction * 100)}_ms" for fraction in PERCENTILES]
+        with open(path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(columns)
+            for name, summary in spans.items():
+                writer.writerow([name] + [round(summary[column], 3) if column != "count" else summary[column]
+                                          for column in columns[1:]])
+
+
+_recorder = Recorder()
+
+
+class _Span:
+    """Context manager timing one span"""
+
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _recorder.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NoSpan:
+    """Span used when timings are off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """
+    Time a block: with span("lyrics.clean"): ...
+
+    Args:
+        name (str): Span name, dotted by area
+
+    Returns:
+        Context manager recording the block's duration
+    """
+    return _Span(name) if ENABLED else _NO_SPAN
+
+
+def timed(name):
+    """
+    Decorator timing every call of a function under a span name.
+
+    Args:
+        name (str): Span name
+
+    Returns:
+        callable: Decorator; returns the function unchanged when timings are off
+    """
+    def decorator(function):
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _recorder.record(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def record(name, seconds):
+    """Record a duration measured elsewhere (e.g. between two events)"""
+    if ENABLED:
+        _recorder.record(name, seconds)
+
+
+def get_recorder():
+    """Get the shared recorder"""
+    return _recorder
+
+
+def export_session(directory):
+    """
+    Write this session's timings as JSON and CSV.
+
+    Args:
+        directory (str): Output directory
+
+    Returns:
+        str: Path of the JSON file; the CSV has the same name with .csv
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(_recorder.started_at))
+    base = os.path.join(directory, f"timings-{stamp}-{os.getpid()}")
+    _recorder.export_json(f"{base}.json")
+    _recorder.export_csv(f"{base}.csv")
+    return f"{base}.json"
+
+
+def export_at_exit(directory):
+    """Export the session's timings to directory when the process exits"""
+    atexit.register(export_session, directory)
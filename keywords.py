@@ -1,5 +1,33 @@
+"""
+keywords.py
+
+Console colors and the print_* logging helpers shared by every module.
+The helpers log through the "melo" logger with levels (debug, success as info, warning,
+error). A message is only built from the helper's arguments if its level is enabled,
+and it is joined and written by a background listener thread, so callers (the GUI
+thread included) only pay for putting a record on a queue. Arguments other than
+str, int and float are converted to str when the record is created, so later
+changes to them do not show up in the log. The console keeps the
+colored "[level] message" format; MELO_LOG_FILE adds a plain log file with timestamps.
+MELO_LOG_LEVEL (DEBUG, INFO, WARNING, ERROR) sets the level, DEBUG by default.
+Importing the module starts nothing: the handlers and listener thread are set up by
+main.py, or on the first message logged.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
 from colored import Fore, Style
 
+__all__ = ["c_red", "c_blue", "c_green", "c_white", "c_yellow", "c_rst",
+           "print_warning", "print_error", "print_debug", "print_success",
+           "configure_logging", "set_log_level"]
+
 #Console Colors
 c_red = Fore.red
 c_blue = Fore.blue
@@ -8,27 +36,147 @@ c_white = Fore.white
 c_yellow = Fore.yellow
 c_rst = Style.reset
 
+LOGGER_NAME = "melo"
+FILE_FORMAT = "%(asctime)s %(levelname)-7s %(threadName)s: %(message)s"
+
+# Console tag and color of each helper
+_DEBUG = {"tag": "debug", "color": c_blue}
+_SUCCESS = {"tag": "success", "color": c_green}
+_WARNING = {"tag": "warning", "color": c_yellow}
+_ERROR = {"tag": "error", "color": c_red}
+
+_logger = logging.getLogger(LOGGER_NAME)
+_logger.propagate = False
+_listener = None
+_configure_lock = threading.Lock()
+
+
+# Arguments kept as they are until the record is written; anything else may change
+# before the listener thread formats it, so it is converted to str up front
+_IMMUTABLE_TYPES = (str, int, float)
+
+
+class _Message:
+    """A helper's arguments, joined into the message only when the record is written"""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, parts):
+        self.parts = tuple(part if type(part) in _IMMUTABLE_TYPES else str(part) for part in parts)
+
+    def __str__(self):
+        string = ""
+        for substr in self.parts:
+            string += str(substr) + " "
+        return string
+
+
+class _ColoredFormatter(logging.Formatter):
+    """The "[level] message" console format"""
+
+    def format(self, record):
+        tag = getattr(record, "tag", record.levelname.lower())
+        color = getattr(record, "color", c_white)
+        return f"{c_white}[{c_rst}{color}{tag}{c_rst}{c_white}]{c_rst} " + record.getMessage()
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Writes to the current sys.stdout, so redirections made after setup apply"""
+
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queues records as they are; formatting happens on the listener thread"""
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level=None, log_file=None, async_console=True):
+    """
+    Set up (or rebuild) the handlers behind the print_* helpers.
+
+    Args:
+        level (str or int): Log level, defaults to MELO_LOG_LEVEL or DEBUG
+        log_file (str): Also write a plain log to this file, defaults to MELO_LOG_FILE
+        async_console (bool): Write the console from the listener thread; False writes
+            it in the caller's thread, keeping it in order with print() and input()
+            (the terminal game)
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+        handler.close()
+
+    set_log_level(level or os.getenv("MELO_LOG_LEVEL") or "DEBUG")
+    log_file = log_file or os.getenv("MELO_LOG_FILE")
+
+    console = _ConsoleHandler()
+    console.setFormatter(_ColoredFormatter())
+    background = []
+    if async_console:
+        background.append(console)
+    else:
+        _logger.addHandler(console)
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        background.append(file_handler)
+
+    if background:
+        records = queue.SimpleQueue()
+        _logger.addHandler(_QueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, *background)
+        _listener.start()
+
+
+def set_log_level(level):
+    """
+    Change the level of the print_* helpers.
+
+    Args:
+        level (str or int): DEBUG, INFO (success messages), WARNING or ERROR
+    """
+    _logger.setLevel(level.upper() if isinstance(level, str) else level)
+
+
+def _flush():
+    """Write out queued records before the process exits"""
+    if _listener is not None:
+        _listener.stop()
+
+
+def _log(level, txt, extra):
+    """Log a helper's message, setting up the handlers if nothing has yet"""
+    if not _logger.handlers:
+        with _configure_lock:
+            if not _logger.handlers:
+                configure_logging(_logger.level)
+    _logger.log(level, _Message(txt), extra=extra)
+
+
+atexit.register(_flush)
+set_log_level(os.getenv("MELO_LOG_LEVEL") or "DEBUG")
+
 
 def print_warning(*txt):
-    string = ""
-    for substr in txt:
-        string += str(substr) + " "
-    print(f"{c_white}[{c_rst}{c_yellow}warning{c_rst}{c_white}]{c_rst} " + string)
+    if _logger.isEnabledFor(logging.WARNING):
+        _log(logging.WARNING, txt, _WARNING)
 
 def print_error(*txt):
-    string = ""
-    for substr in txt:
-        string += str(substr) + " "
-    print(f"{c_white}[{c_rst}{c_red}error{c_rst}{c_white}]{c_rst} " + string)
+    if _logger.isEnabledFor(logging.ERROR):
+        _log(logging.ERROR, txt, _ERROR)
 
 def print_debug(*txt):
-    string = ""
-    for substr in txt:
-        string += str(substr) + " "
-    print(f"{c_white}[{c_rst}{c_blue}debug{c_rst}{c_white}]{c_rst} " + string)
+    if _logger.isEnabledFor(logging.DEBUG):
+        _log(logging.DEBUG, txt, _DEBUG)
 
 def print_success(*txt):
-    string = ""
-    for substr in txt:
-        string += str(substr) + " "
-    print(f"{c_white}[{c_rst}{c_green}success{c_rst}{c_white}]{c_rst} " + string)
\ No newline at end of file
+    if _logger.isEnabledFor(logging.INFO):
+        _log(logging.INFO, txt, _SUCCESS)
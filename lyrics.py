@@ -0,0 +1,400 @@
+"""
+lyrics.py
+
+Lyrics fetching for the Song-Guesser game.
+The Genius client, and lyricsgenius with its HTTP stack, are only imported and built on
+the first fetch, so starting the game does not pay for them.
+
+Fetched lyrics are kept in a shared LyricsCache (memory plus one JSON file per song on
+disk). Concurrent requests for the same uncached song share a single fetch. Without a Genius token the game runs in cache-only mode: cached songs play
+normally, and a token is only needed, and asked for, when a song has to be fetched.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+
+from keywords import *
+from instrumentation import span, timed
+
+CACHE_DIR = os.getenv("MELO_LYRICS_CACHE") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "lyrics_cache")
+
+# Base URL of a Genius stand-in (benchmarks/fake_genius.py) to use instead of genius.com
+GENIUS_URL_ENV = "MELO_GENIUS_URL"
+
+_genius = None
+_genius_lock = threading.Lock()
+_access_token = None
+_token_loaded = False
+_cache_only = False
+_token_declined = False
+_cache = None
+
+# Per-song locks so a song is fetched once however many threads ask for it at the same
+# time. Bounded by the number of songs in the catalog.
+_fetch_locks = {}
+_fetch_locks_lock = threading.Lock()
+
+# Returned by LyricsCache.get for songs that are not cached
+MISSING = object()
+
+
+class LyricsUnavailable(Exception):
+    """A song's lyrics are not cached and cannot be fetched (cache-only mode or no token)"""
+
+
+class LyricsCache:
+    """
+    Thread-safe lyrics cache: an in-memory dict in front of one JSON file per song.
+    Songs known to have no lyrics are cached too, as None.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        """
+        Args:
+            directory (str): Directory for the cache files
+        """
+        self.directory = directory
+        self.memory = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def path(self, title, artist):
+        """Cache file path for a song"""
+        digest = hashlib.sha1(f"{artist}\n{title}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, title, artist):
+        """
+        Look a song up in memory, then on disk.
+
+        Returns:
+            str, None or MISSING: Lyrics, None if the song has no lyrics, MISSING if not cached
+        """
+        key = (title, artist)
+        lyrics = self.memory.get(key, MISSING)
+        if lyrics is MISSING:
+            try:
+                with open(self.path(title, artist), "r", encoding="utf-8") as cache_file:
+                    lyrics = json.load(cache_file)["lyrics"]
+            except (OSError, ValueError, KeyError):
+                with self._lock:
+                    self.misses += 1
+                return MISSING
+            self.memory[key] = lyrics
+
+        with self._lock:
+            self.hits += 1
+        return lyrics
+
+    def __contains__(self, song):
+        title, artist = song
+        return (title, artist) in self.memory or os.path.exists(self.path(title, artist))
+
+    def put(self, title, artist, lyrics):
+        """Store lyrics (or None for a song without lyrics) in memory and on disk"""
+        self.memory[(title, artist)] = lyrics
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(title, artist)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                json.dump({"title": title, "artist": artist, "lyrics": lyrics}, cache_file,
+                          ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print_warning(f"Could not write lyrics cache: {e}")
+
+
+def get_cache():
+    """Get the shared lyrics cache"""
+    global _cache
+    if _cache is None:
+        _cache = LyricsCache()
+    return _cache
+
+
+def get_access_token():
+    """
+    Find the Genius API token: one set with set_access_token, the environment, .env
+    or config.py. The lookup happens once and is remembered.
+
+    Returns:
+        str or None: The token, or None if it is not configured
+    """
+    global _access_token, _token_loaded
+    if _token_loaded:
+        return _access_token
+
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
+    token = os.getenv('GENIUS_ACCESS_TOKEN')
+    if not token:
+        try:
+            # Try to import from config.py as a fallback
+            from config import GENIUS_API_KEY
+
+            token = GENIUS_API_KEY
+        except (ImportError, AttributeError):
+            token = None
+
+    _access_token = token or None
+    _token_loaded = True
+    return _access_token
+
+
+def set_access_token(token):
+    """Use a token provided at runtime (e.g. typed in by the player)"""
+    global _access_token, _token_loaded, _genius
+    with _genius_lock:
+        _access_token = token or None
+        _token_loaded = True
+        _genius = None
+
+
+def set_genius(client):
+    """
+    Use a ready-made Genius client, e.g. a local stand-in for benchmarks. Fetching is
+    enabled even if no token is configured.
+
+    Args:
+        client: Object with search_song(title, artist) like lyricsgenius.Genius
+    """
+    global _access_token, _token_loaded, _genius
+    with _genius_lock:
+        _genius = client
+        _access_token = _access_token or "local"
+        _token_loaded = True
+
+
+def set_cache_only(enabled):
+    """In cache-only mode lyrics are never fetched from the network"""
+    global _cache_only
+    _cache_only = enabled
+
+
+def is_cache_only():
+    return _cache_only
+
+
+def can_fetch():
+    """True if a network fetch is possible right now (not cache-only and a token is known)"""
+    return not _cache_only and get_access_token() is not None
+
+
+def ensure_fetch_possible(ask_token):
+    """
+    Make sure lyrics can be fetched from the network, asking the player for a Genius
+    token the first time one is needed. A declined request is not repeated.
+
+    Args:
+        ask_token (callable): Asks the player for a token; returns it, or an empty string
+            to keep playing from the cache
+
+    Returns:
+        bool: True if missing lyrics can be fetched, False in cache-only mode
+    """
+    global _token_declined
+    if can_fetch():
+        return True
+    if _cache_only or _token_declined:
+        return False
+
+    token = (ask_token() or "").strip()
+    if token:
+        set_access_token(token)
+        warm_up()
+        return True
+
+    # Don't ask again this session, keep playing from the cache
+    _token_declined = True
+    return False
+
+
+def needs_fetch(title, artist):
+    """True if the song is not cached, so getting its lyrics means a network fetch"""
+    return (title, artist) not in get_cache()
+
+
+def get_genius():
+    """
+    Get the shared Genius API client, importing lyricsgenius and building it on first use.
+
+    Returns:
+        lyricsgenius.Genius or None: Genius API client, or None without a token
+    """
+    global _genius
+    if _genius is None:
+        token = get_access_token()
+        if not token:
+            return None
+        with _genius_lock:
+            if _genius is None:
+                import lyricsgenius
+
+                genius = lyricsgenius.Genius(token, timeout=12)
+                base_url = os.getenv(GENIUS_URL_ENV)
+                if base_url:
+                    # Send the API, public API and lyrics page requests to the stand-in
+                    base_url = base_url.rstrip("/") + "/"
+                    genius.API_ROOT = base_url + "v1/"
+                    genius.PUBLIC_API_ROOT = base_url + "api/"
+                    genius.WEB_ROOT = base_url
+                # search_song runs a search, then fetches and scrapes the lyrics page
+                genius.search_all = timed("genius.search")(genius.search_all)
+                genius.lyrics = timed("genius.page")(genius.lyrics)
+                _genius = genius
+    return _genius
+
+
+def warm_up():
+    """Build the Genius client on a background thread, ahead of the first fetch"""
+    if not can_fetch():
+        return
+
+    def build():
+        try:
+            get_genius()
+        except Exception as e:
+            print_error(f"Error creating Genius client: {e}")
+
+    threading.Thread(target=build, name="genius-warm-up", daemon=True).start()
+
+
+def _fetch_lock(title, artist):
+    """Get the lock serializing fetches of one song"""
+    with _fetch_locks_lock:
+        lock = _fetch_locks.get((title, artist))
+        if lock is None:
+            lock = _fetch_locks[(title, artist)] = threading.Lock()
+        return lock
+
+
+@timed("lyrics.get_lyrics")
+def get_lyrics(title, artist):
+    """
+    Get full lyrics for a song, from the cache or the Genius API.
+
+    Args:
+        title (str): Song title
+        artist (str): Artist name
+
+    Returns:
+        str or None: Song lyrics or None if not found
+
+    Raises:
+        LyricsUnavailable: The song is not cached and no network fetch is possible
+    """
+    cache = get_cache()
+    lyrics = cache.get(title, artist)
+    if lyrics is not MISSING:
+        return lyrics
+
+    if not can_fetch():
+        raise LyricsUnavailable(f"Lyrics not cached and no network fetch possible: {title} by {artist}")
+
+    with _fetch_lock(title, artist):
+        # Another thread may have fetched the song while this one waited
+        lyrics = cache.memory.get((title, artist), MISSING)
+        if lyrics is not MISSING:
+            return lyrics
+
+        try:
+            print_debug("Searching for lyrics:", title, "by", artist)
+            with span("genius.search_song"):
+                song = get_genius().search_song(title, artist)
+            if song:
+                cache.put(title, artist, song.lyrics)
+                return song.lyrics
+            else:
+                # Debug only: the song may be the next round, and the terminal game shows warnings
+                print_debug(f"Lyrics not found for: {title} by {artist}")
+                cache.put(title, artist, None)
+                return None
+        except Exception as e:
+            print_error(f"Error getting lyrics: {e}")
+            return None
+
+
+@timed("lyrics.random_line")
+def get_random_lyric_line(title, artist):
+    """
+    Get random meaningful lines from song lyrics.
+
+    Args:
+        title (str): Song title
+        artist (str): Artist name
+
+    Returns:
+        tuple: (str, list) - A random line from the lyrics and additional lines for hints
+
+    Raises:
+        LyricsUnavailable: The song is not cached and no network fetch is possible
+    """
+    full_lyrics = get_lyrics(title, artist)
+
+    if not full_lyrics:
+        return "This song is instrumental, take a wild guess :)", []
+
+    with span("lyrics.clean"):
+        # Split into lines
+        lines = full_lyrics.split('\n')
+
+        # Filter out empty lines and headers/footers
+        clean_lines = []
+        for line in lines:
+            line = line.strip()
+            words = [word for word in line.split() if word]
+            word_count = len(words)
+
+            if (line.strip() and
+                    not line.startswith('[') and
+                    not line.endswith(']') and
+                    not line.startswith('(') and
+                    not line.endswith(')') and
+                    word_count > 4 and
+                    not 'Lyrics' in line and
+                    not 'Contributor' in line and
+                    not 'Embed' in line):
+                clean_lines.append(line.strip())
+
+    # Return random lines if we have any valid lines
+    if clean_lines:
+        if len(clean_lines) <= 1:
+            return "\n".join(clean_lines), []
+
+        # Select a random starting index
+        start_idx = random.randint(0, len(clean_lines) - 1)
+
+        # Get the first line
+        selected_line = clean_lines[start_idx]
+
+        # Get additional lines for hints
+        hint_lines = []
+        for i in range(1, 5):  # Get up to 4 additional lines for hints
+            next_idx = (start_idx + i) % len(clean_lines)
+            hint_lines.append(clean_lines[next_idx])
+
+        # Check if the first line has 7 or fewer words
+        words = [word for word in selected_line.split() if word]
+        if len(words) <= 7 and len(clean_lines) > 1:
+            # Add the next line immediately
+            next_idx = (start_idx + 1) % len(clean_lines)
+            selected_line = f"{selected_line}\n{clean_lines[next_idx]}"
+            # Remove this line from hint lines
+            if hint_lines:
+                hint_lines.pop(0)
+
+        print_debug("Selected lyric:", selected_line)
+        print_debug("Hint lines available:", len(hint_lines))
+
+        return selected_line, hint_lines
+    else:
+        print_debug(f"No suitable lyrics found for: {title} by {artist}")
+        return "No suitable lyrics found.", []
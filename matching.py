@@ -0,0 +1,449 @@
+"""
+matching.py
+
+Title canonicalization and guess matching for the Song-Guesser game.
+Canonical keys for catalog titles are computed once when the catalog is loaded,
+so checking a guess only has to normalize the player's input.
+"""
+
+import bisect
+import re
+import string
+import unicodedata
+
+# Characters that separate words in a title ("Self-Control", "XO / The Host")
+WORD_SEPARATORS = "-/‐‑‒–—―"
+
+# Fuzzy acceptance: one edit is allowed per FUZZY_CHARS_PER_EDIT characters of the title key,
+# up to FUZZY_MAX_EDITS. Keys shorter than FUZZY_CHARS_PER_EDIT must match exactly.
+FUZZY_CHARS_PER_EDIT = 5
+FUZZY_MAX_EDITS = 3
+
+# Fast path for plain ASCII input: separators become spaces, other punctuation is dropped
+_ASCII_TABLE = str.maketrans(
+    {ch: (" " if ch in WORD_SEPARATORS else None) for ch in string.punctuation}
+)
+
+
+def canonical_key(text):
+    """
+    Build the canonical comparison key for a song title or guess.
+
+    The key is compatibility-normalized (so "²" becomes "2"), stripped of accents,
+    casefolded, and has punctuation and symbols removed with whitespace collapsed.
+
+    Args:
+        text (str): Song title or player input
+
+    Returns:
+        str: Canonical key
+    """
+    if text.isascii():
+        return " ".join(text.lower().translate(_ASCII_TABLE).split())
+
+    chars = []
+    for ch in unicodedata.normalize("NFKD", text).casefold():
+        category = unicodedata.category(ch)
+        if category[0] in "LN":
+            chars.append(ch)
+        elif ch in WORD_SEPARATORS or category == "Pd" or category[0] == "Z" or ch.isspace():
+            chars.append(" ")
+        # Combining marks, other punctuation and symbols are dropped
+
+    return " ".join("".join(chars).split())
+
+
+def title_key(text):
+    """
+    Comparison key for a title or guess: its canonical key, or, for text made only of
+    punctuation and symbols ("!!!!!!", "💔") whose canonical key is empty, the
+    casefolded text with whitespace collapsed, so such titles stay distinct and
+    matchable.
+
+    Args:
+        text (str): Song title or player input
+
+    Returns:
+        str: Key, empty only for blank text
+    """
+    return canonical_key(text) or " ".join(text.casefold().split())
+
+
+# A trailing "(...)" / "[...]" or a leading "(...)" part of a title
+_BRACKETED_PART = re.compile(r"^\s*[(\[][^)\]]*[)\]]\s*|\s*[(\[][^)\]]*[)\]]\s*$")
+
+
+def derived_aliases(title):
+    """
+    Short forms players commonly type for a title.
+
+    Args:
+        title (str): Song title
+
+    Returns:
+        list: Alternate titles, e.g. both halves of "A / B", the title without a
+        trailing "(...)" or "[...]", and "&" spelled as "and"
+    """
+    aliases = []
+    if " / " in title:
+        aliases.extend(title.split(" / "))
+    stripped = _BRACKETED_PART.sub("", title)
+    if stripped and stripped != title:
+        aliases.append(stripped)
+    if "&" in title:
+        aliases.append(title.replace("&", "and"))
+    return aliases
+
+
+def unique_titles(albums):
+    """
+    Distinct songs of an artist in first-appearance order. Titles that share a
+    canonical key ("THE ONLY TIME I FEEL ALIVE" / "The Only Time I Feel Alive") are
+    one song, listed under the first spelling.
+
+    Args:
+        albums (dict): Album name -> album data, in the albums_database.py schema
+
+    Returns:
+        list: One title per distinct song
+    """
+    titles = {}
+    for album_data in albums.values():
+        for title in album_data["songs"]:
+            titles.setdefault(title_key(title), title)
+    return list(titles.values())
+
+
+def bigrams(key):
+    """Distinct two-character substrings of a key"""
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+def max_edits_for(length, chars_per_edit=FUZZY_CHARS_PER_EDIT, max_edits=FUZZY_MAX_EDITS):
+    """
+    Number of typos tolerated for a title key of the given length.
+
+    Args:
+        length (int): Length of the canonical title key
+        chars_per_edit (int): Characters of title needed per allowed edit
+        max_edits (int): Upper bound on allowed edits
+
+    Returns:
+        int: Maximum accepted edit distance
+    """
+    return min(max_edits, length // chars_per_edit)
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """
+    Damerau-Levenshtein (optimal string alignment) distance, bounded by max_distance.
+
+    Only a diagonal band of width 2 * max_distance + 1 is computed, and the search
+    stops as soon as every cell in a row exceeds the bound.
+
+    Args:
+        a (str): First string
+        b (str): Second string
+        max_distance (int): Largest distance of interest
+
+    Returns:
+        int: The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if a == b:
+        return 0
+
+    over = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return over
+
+    # Common prefixes and suffixes never contribute to the distance
+    start = 0
+    end_a, end_b = len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a = a[start:end_a]
+    b = b[start:end_b]
+
+    if len(a) > len(b):
+        a, b = b, a
+    len_a, len_b = len(a), len(b)
+    if len_a == 0:
+        return len_b if len_b <= max_distance else over
+
+    previous_previous = None
+    previous = list(range(len_b + 1))
+    for i in range(1, len_a + 1):
+        char_a = a[i - 1]
+        current = [over] * (len_b + 1)
+        current[0] = i
+        row_min = i
+        low = max(1, i - max_distance)
+        high = min(len_b, i + max_distance)
+        for j in range(low, high + 1):
+            char_b = b[j - 1]
+            cost = 0 if char_a == char_b else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (cost and i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b
+                    and previous_previous[j - 2] + 1 < value):
+                value = previous_previous[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous_previous, previous = previous, current
+
+    distance = previous[len_b]
+    return distance if distance <= max_distance else over
+
+
+class TitleIndex:
+    """
+    Precomputed canonical keys for every title in one artist's catalog.
+    Spellings sharing a canonical key are one song, as in the catalog records: aliases
+    resolve to the song's first spelling, and only other songs count as rivals.
+    """
+
+    def __init__(self, albums, fuzzy=True, chars_per_edit=FUZZY_CHARS_PER_EDIT,
+                 max_edits=FUZZY_MAX_EDITS):
+        """
+        Args:
+            albums (dict): Album name -> album data, in the albums_database.py schema
+            fuzzy (bool): Accept near-miss typos within the edit threshold
+            chars_per_edit (int): Characters of title needed per allowed edit
+            max_edits (int): Upper bound on allowed edits
+        """
+        self.fuzzy = fuzzy
+        self.chars_per_edit = chars_per_edit
+        self.max_edits = max_edits
+        # Every listed spelling -> its key; the distinct songs are the titles of
+        # unique_titles, the same list the catalog builds its song records from
+        self.titles = unique_titles(albums)
+        self.keys = {title: title_key(title) for title in self.titles}
+        titles_by_key = {key: title for title, key in self.keys.items()}
+        explicit_aliases = {}
+        for album_data in albums.values():
+            for song in album_data["songs"]:
+                if song not in self.keys:
+                    self.keys[song] = title_key(song)
+            for song, aliases in album_data.get("aliases", {}).items():
+                song = titles_by_key.get(self.key(song), song)
+                explicit_aliases.setdefault(song, []).extend(aliases)
+
+        # Alias key -> canonical title. A title's own key always wins, and a derived
+        # alias shared by several titles is dropped because it is ambiguous.
+        self.aliases = {}
+        ambiguous = set()
+        for song in self.titles:
+            for alias in derived_aliases(song):
+                alias_key = canonical_key(alias)
+                if not alias_key:
+                    continue
+                owner = self.aliases.setdefault(alias_key, song)
+                if owner != song:
+                    ambiguous.add(alias_key)
+        for alias_key in ambiguous:
+            del self.aliases[alias_key]
+        for song, aliases in explicit_aliases.items():
+            for alias in aliases:
+                alias_key = title_key(alias)
+                if alias_key:
+                    self.aliases[alias_key] = song
+        for song in self.titles:
+            if self.keys[song]:
+                self.aliases[self.keys[song]] = song
+
+        # Alias keys of each song (by its canonical key), used for typo tolerance on short forms
+        self.alias_keys = {}
+        for alias_key, song in self.aliases.items():
+            song_key = self.key(song)
+            if alias_key != song_key:
+                self.alias_keys.setdefault(song_key, []).append(alias_key)
+
+        # Every accepted key bucketed by length and by the bigrams it contains, so
+        # closer rival titles can be found without a full scan
+        self.keys_by_length = {}
+        self.keys_by_bigram = {}
+        for alias_key in self.aliases:
+            self.keys_by_length.setdefault(len(alias_key), []).append(alias_key)
+            for bigram in bigrams(alias_key):
+                self.keys_by_bigram.setdefault(bigram, []).append(alias_key)
+
+    def key(self, title):
+        """Return the cached canonical key for a title, computing it if unseen"""
+        key = self.keys.get(title)
+        if key is None:
+            key = self.keys[title] = title_key(title)
+        return key
+
+    def resolve(self, text):
+        """
+        Resolve a title or any accepted alias to its canonical title.
+
+        Args:
+            text (str): Title, alias or player input
+
+        Returns:
+            str or None: Canonical title, or None if the text is not a known title or alias
+        """
+        return self.aliases.get(title_key(text))
+
+    def is_correct_guess(self, guess, actual):
+        """
+        Check a guess against the actual song title.
+
+        Args:
+            guess (str): Player input
+            actual (str): Title of the current song
+
+        Returns:
+            bool: True if the guess is accepted
+        """
+        return self.is_correct_key(title_key(guess), actual)
+
+    def is_correct_key(self, guess_key, actual):
+        """Check an already keyed guess (see title_key) against the actual song title"""
+        if not guess_key:
+            return False
+
+        actual_key = self.key(actual)
+        if not actual_key:
+            return False
+        if guess_key == actual_key:
+            return True
+        owner = self.aliases.get(guess_key)
+        if owner is not None and self.keys[owner] == actual_key:
+            return True
+
+        # Check if guess is contained in actual or vice versa (for partial matches)
+        if len(guess_key) > 5 and (guess_key in actual_key or actual_key in guess_key):
+            return True
+
+        if self.fuzzy:
+            if self.is_near_miss(guess_key, actual_key, actual_key):
+                return True
+            for alias_key in self.alias_keys.get(actual_key, ()):
+                if self.is_near_miss(guess_key, alias_key, actual_key):
+                    return True
+
+        return False
+
+    def is_near_miss(self, guess_key, target_key, actual_key):
+        """
+        Accept a guess within the typo threshold of one of the actual song's keys
+        (target_key: its own key or an alias key), unless another song in the catalog is
+        at least as close (e.g. "The Birds Pt. 1" vs "The Birds Pt. 2"). Other spellings
+        of the actual song are not rivals.
+        """
+        limit = max_edits_for(len(target_key), self.chars_per_edit, self.max_edits)
+        if limit == 0:
+            return False
+
+        distance = bounded_edit_distance(guess_key, target_key, limit)
+        if distance > limit:
+            return False
+
+        guess_length = len(guess_key)
+        for key in self.rival_candidates(guess_key, distance):
+            if (abs(len(key) - guess_length) <= distance
+                    and self.keys[self.aliases[key]] != actual_key
+                    and bounded_edit_distance(guess_key, key, distance) <= distance):
+                return False
+
+        return True
+
+    def rival_candidates(self, guess_key, distance):
+        """
+        Keys that may be within distance edits of a guess. An edit adds at most three
+        bigrams (a transposition), so such a key has all but at most 3 * distance of
+        the guess's bigrams, and at least one of any 3 * distance + 1 of them: only the
+        keys containing one of the rarest are returned. Guesses too short for that fall
+        back to the keys of nearby lengths.
+
+        Args:
+            guess_key (str): Canonical key of the guess
+            distance (int): Largest edit distance of interest
+
+        Returns:
+            iterable: Candidate keys, a superset of the keys within distance
+        """
+        guess_bigrams = bigrams(guess_key)
+        needed = 3 * distance + 1
+        if len(guess_bigrams) >= needed and len(guess_key) > distance + 1:
+            postings = sorted((self.keys_by_bigram.get(bigram, ()) for bigram in guess_bigrams), key=len)
+            candidates = set()
+            for keys in postings[:needed]:
+                candidates.update(keys)
+            return candidates
+
+        guess_length = len(guess_key)
+        return [key for length in range(guess_length - distance, guess_length + distance + 1)
+                for key in self.keys_by_length.get(length, ())]
+
+    def check_guesses(self, guesses):
+        """
+        Score a batch of guesses, e.g. for bot simulations.
+
+        Args:
+            guesses (iterable): (guess, actual) pairs
+
+        Returns:
+            list: One bool per pair
+        """
+        guess_keys = {}
+        results = []
+        for guess, actual in guesses:
+            guess_key = guess_keys.get(guess)
+            if guess_key is None:
+                guess_key = guess_keys[guess] = title_key(guess)
+            results.append(self.is_correct_key(guess_key, actual))
+        return results
+
+
+class SubstringIndex:
+    """
+    Substring search over the canonical keys of many songs, for autocomplete on large
+    selections. The keys are joined into one string, so a search runs at str.find speed
+    and only looks at the songs that match.
+    """
+
+    def __init__(self, songs):
+        """
+        Args:
+            songs: Song records (with a key) in the order results are listed
+        """
+        self.songs = tuple(songs)
+        self.starts = []
+        position = 0
+        for song in self.songs:
+            self.starts.append(position)
+            position += len(song.key) + 1
+        # Keys never contain a newline, so no match spans two songs
+        self.text = "\n".join(song.key for song in self.songs)
+
+    def __len__(self):
+        return len(self.songs)
+
+    def search(self, text_key):
+        """
+        Songs whose key contains a canonical key.
+
+        Args:
+            text_key (str): Canonical key of the typed text, not empty
+
+        Returns:
+            list: Matching song records, in index order
+        """
+        matches = []
+        text, starts = self.text, self.starts
+        position = text.find(text_key)
+        while position != -1:
+            i = bisect.bisect_right(starts, position) - 1
+            matches.append(self.songs[i])
+            if i + 1 == len(starts):
+                break
+            position = text.find(text_key, starts[i + 1])
+        return matches
@@ -0,0 +1,271 @@
+"""
+rooms.py
+
+Multiplayer rooms for the Song-Guesser server.
+Everyone in a room sees the same lyric at the same time and races to guess it. A room
+runs its own round clock: the shared round is prepared ahead on the server's scheduler,
+shown to all members, and closed by the first correct guess (in the order the server
+received them) or by the clock. Every broadcast is serialized and framed once and the
+same bytes are written to each member, so the cost per message does not grow with the
+size of the payload times the number of players.
+"""
+
+import asyncio
+import heapq
+import json
+import time
+
+from keywords import *
+from engine import GameEngine, HINT_LINES, NoPlayableSongs
+from websocket import encode_frame
+import rounds
+
+# How long players have to guess a room round, and the pause before the next one
+ROOM_ROUND_MS = 30000
+ROOM_RESULT_MS = rounds.RESULT_DISPLAY_MS
+
+# Members listed in the scoreboard sent with each result
+SCOREBOARD_SIZE = 10
+
+# Members whose connection has this much unsent data are dropped instead of buffered
+MAX_PENDING_BYTES = 256 * 1024
+
+
+class RoomPlayer:
+    """A member's scores in a room"""
+
+    __slots__ = ("session", "name", "score", "streak", "max_streak", "hint_used", "joined_at")
+
+    def __init__(self, session, name):
+        self.session = session
+        self.name = name
+        self.score = 0
+        self.streak = 0
+        self.max_streak = 0
+        self.hint_used = False
+        self.joined_at = time.monotonic()
+
+
+class Room:
+    """
+    A shared game: one selection, one round at a time, many players.
+    """
+
+    def __init__(self, server, name, selection):
+        """
+        Args:
+            server (GameServer): Server owning the shared scheduler and catalog
+            name (str): Room name
+            selection (tuple): (artist label, album label, songs) as for GameEngine.select
+        """
+        self.server = server
+        self.name = name
+        self.artist, self.album = selection[:2]
+        self.engine = GameEngine(server.catalog)  # The room's song pool and current round
+        self.engine.select(*selection)
+        self.members = {}  # Session -> RoomPlayer
+        self.round_started_at = None
+        self.round_open = False
+        self.answered = asyncio.Event()
+        self.next_round = None
+        self.broadcasts = 0
+        self.task = None
+
+    def start(self):
+        """Start the round clock"""
+        self.prepare_next()
+        self.task = asyncio.ensure_future(self.run())
+
+    def prepare_next(self):
+        """Start drawing and preparing the next shared round"""
+        self.next_round = asyncio.ensure_future(self.server.prepare_round(self.engine))
+
+    async def next_prepared(self):
+        """
+        Wait for the round prepared ahead.
+
+        Returns:
+            Round: The prepared round
+
+        Raises:
+            NoPlayableSongs: No song of the room's selection can be played
+        """
+        if self.next_round is None:
+            self.prepare_next()
+        future, self.next_round = self.next_round, None
+        return await future
+
+    def broadcast(self, message):
+        """
+        Send a message to every member, serializing and framing it once.
+
+        Args:
+            message (dict): JSON message
+        """
+        frame = encode_frame(json.dumps(message, ensure_ascii=False))
+        self.broadcasts += 1
+        slow = []
+        for session in self.members:
+            writer = session.websocket.writer
+            if session.websocket.closed:
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+                slow.append(session)
+                continue
+            writer.write(frame)
+        for session in slow:
+            print_warning(f"Dropping slow member from room {self.name}")
+            self.leave(session)
+            asyncio.ensure_future(session.websocket.close())
+
+    def status(self):
+        return {"type": "room", "room": self.name, "members": len(self.members),
+                "artist": self.artist, "album": self.album}
+
+    def join(self, session, name):
+        """
+        Add a member; they play from the current round if it is open, else the next one.
+        Other members learn the new member count from the next round or result broadcast,
+        so joins never fan out.
+
+        Returns:
+            list: Messages for the new member
+        """
+        self.members[session] = RoomPlayer(session, name)
+        replies = [self.status()]
+        if self.round_open:
+            replies.append(self.round_message())
+        return replies
+
+    def leave(self, session):
+        """Remove a member; an empty room stops its clock and is closed"""
+        if self.members.pop(session, None) is None:
+            return
+        if session.room is self:
+            session.room = None
+        if not self.members:
+            self.close()
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+        if self.next_round is not None:
+            if self.next_round.done() and not self.next_round.cancelled():
+                self.next_round.exception()  # A failed preparation nobody will play is not an error
+            self.next_round.cancel()
+            self.next_round = None
+        self.server.rooms.pop(self.name, None)
+
+    def round_message(self):
+        engine = self.engine
+        elapsed_ms = (time.monotonic() - self.round_started_at) * 1000
+        return {"type": "round", "room": self.name, "round": engine.songs_played,
+                "lyric": engine.current_round.lyric, "album": self.album, "members": len(self.members),
+                "ends_in_ms": max(0, int(ROOM_ROUND_MS - elapsed_ms))}
+
+    def scoreboard(self):
+        """The top SCOREBOARD_SIZE members, without sorting the whole room"""
+        players = heapq.nlargest(SCOREBOARD_SIZE, self.members.values(), key=lambda player: player.score)
+        return [{"name": player.name, "score": player.score, "streak": player.streak}
+                for player in players]
+
+    async def run(self):
+        """The round clock: prepared round, guessing window, result, repeat"""
+        engine = self.engine
+        try:
+            while self.members:
+                try:
+                    round_ = await self.next_prepared()
+                except asyncio.CancelledError:
+                    raise
+                except NoPlayableSongs as e:
+                    # Nothing to play: tell the members and close the room
+                    self.broadcast({"type": "error", "room": self.name, "message": str(e)})
+                    for session in list(self.members):
+                        self.leave(session)
+                    return
+                except Exception as e:
+                    print_error(f"Error preparing room round: {e}")
+                    continue
+
+                engine.start_round(round_)
+                for player in self.members.values():
+                    player.hint_used = False
+                self.prepare_next()  # NoPlayableSongs is reported when the next round is due
+
+                self.answered.clear()
+                self.round_started_at = time.monotonic()
+                self.round_open = True
+                self.broadcast(self.round_message())
+
+                try:
+                    await asyncio.wait_for(self.answered.wait(), ROOM_ROUND_MS / 1000)
+                except asyncio.TimeoutError:
+                    # Nobody got it: everyone's streak ends
+                    self.round_open = False
+                    for player in self.members.values():
+                        player.streak = 0
+                    self.broadcast({"type": "result", "room": self.name, "winner": None,
+                                    "members": len(self.members),
+                                    "message": f"Time's up! The song was: {engine.current_song}",
+                                    "scoreboard": self.scoreboard()})
+                await asyncio.sleep(ROOM_RESULT_MS / 1000)
+        except asyncio.CancelledError:
+            pass
+
+    def guess(self, session, text, received_at):
+        """
+        Adjudicate a member's guess. Guesses are handled in the order the server received
+        them, so the first correct one wins the round.
+
+        Args:
+            session (Session): Guessing member
+            text (str): The guess
+            received_at (float): time.monotonic() when the server read the message
+
+        Returns:
+            dict or None: Private reply for the guesser, None if the round is already
+            over (everyone gets the result broadcast)
+        """
+        player = self.members.get(session)
+        if player is None or not self.round_open or received_at < self.round_started_at:
+            return None
+
+        engine = self.engine
+        if not engine.is_correct_guess(text, engine.current_song):
+            return {"type": "result", "room": self.name, "correct": False, "message": "Incorrect, try again!"}
+
+        # First correct guess closes the round
+        self.round_open = False
+        self.answered.set()
+        if not player.hint_used:
+            player.score += 1
+            player.streak += 1
+            player.max_streak = max(player.max_streak, player.streak)
+        for other in self.members.values():
+            if other is not player:
+                other.streak = 0
+
+        guess_ms = int((received_at - self.round_started_at) * 1000)
+        self.broadcast({"type": "result", "room": self.name, "winner": player.name,
+                        "members": len(self.members),
+                        "scored": not player.hint_used, "guess_ms": guess_ms,
+                        "message": f"{player.name} got it in {guess_ms / 1000:.1f}s! 🎵 The song was {engine.current_song}",
+                        "scoreboard": self.scoreboard()})
+        return None
+
+    def hint(self, session):
+        """
+        Give a member the hint lines of the current round; they can no longer score it.
+
+        Returns:
+            dict or None: Private reply for the member
+        """
+        player = self.members.get(session)
+        if player is None or not self.round_open or not self.engine.hint_lines:
+            return None
+        if player.hint_used:
+            return {"type": "hint", "lines": [], "message": "You've already used your hint for this song!"}
+        player.hint_used = True
+        return {"type": "hint", "lines": list(self.engine.hint_lines[:HINT_LINES]),
+                "message": "Hint added! Score and streak will not increase if you guess correctly now."}
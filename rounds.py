@@ -0,0 +1,197 @@
+"""
+rounds.py
+
+Round preparation for the Song-Guesser game.
+A round (song, prompt lyric and hint lines) is prepared on a background worker so the
+front end never blocks on Genius, and the next round can be prepared while the result
+of the current one is still on screen.
+
+Front ends tag each requested round with a generation number and bump it whenever the
+round or selection changes. Queued preparations are cancelled, ones already running
+skip their fetch if they are stale by the time they start, and late results are
+discarded by comparing generations. A fetch that does complete still fills the lyrics
+cache, so its network work is not lost.
+"""
+
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from instrumentation import timed
+from lyrics import get_random_lyric_line
+
+# Round states: LOADING (waiting for the first round), READY (waiting for a guess),
+# ANSWERED (showing the result, next round preparing), ADVANCING (result shown long
+# enough, waiting for the next round)
+LOADING = "loading"
+READY = "ready"
+ANSWERED = "answered"
+ADVANCING = "advancing"
+
+# How long the result of a round stays on screen before the next round may appear
+RESULT_DISPLAY_MS = 2000
+
+# Blitz mode: number of fully prepared rounds kept ready, and the length of a game
+BLITZ_BUFFER_SIZE = 8
+BLITZ_DURATION_MS = 60000
+
+Round = namedtuple("Round", ["song_id", "title", "artist", "lyric", "hint_lines", "answer_key"])
+
+
+@timed("round.build")
+def build_round(song, is_stale=None):
+    """
+    Fetch lyrics and pick the prompt for a song. Blocking; runs on a worker thread.
+
+    Args:
+        song (Song): Catalog song record
+        is_stale (callable): Returns True if the round is no longer wanted
+
+    Returns:
+        Round or None: Prepared round, or None if it went stale before the fetch started
+
+    Raises:
+        lyrics.LyricsUnavailable: The song is not cached and cannot be fetched
+    """
+    if is_stale is not None and is_stale():
+        return None
+    lyric, hint_lines = get_random_lyric_line(song.title, song.artist)
+    return Round(song.id, song.title, song.artist, lyric, hint_lines, song.key)
+
+
+class RoundScheduler:
+    """
+    Prepares rounds on a small thread pool shared by every front end.
+    """
+
+    def __init__(self, max_workers=4):
+        """
+        Args:
+            max_workers (int): Number of concurrent lyric fetches
+        """
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="round")
+        self.shut_down = False
+
+    def prepare(self, song, is_stale=None):
+        """
+        Start preparing a round in the background.
+
+        Args:
+            song (Song): Catalog song record
+            is_stale (callable): Checked by the worker before fetching; see build_round
+
+        Returns:
+            concurrent.futures.Future: Resolves to the prepared Round, or None if stale;
+            already cancelled once the scheduler is shut down
+        """
+        try:
+            return self.executor.submit(build_round, song, is_stale)
+        except RuntimeError:
+            # Shut down (e.g. the server is stopping while sessions still play)
+            future = Future()
+            future.cancel()
+            return future
+
+    def shutdown(self):
+        self.shut_down = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RoundBuffer:
+    """
+    Ring buffer of fully prepared rounds, prepared by the scheduler's workers.
+    Songs are only drawn on the owner's thread: the owner calls fill() after popping a
+    round and whenever on_ready reports a finished preparation, so workers never touch
+    the game's state.
+    """
+
+    def __init__(self, scheduler, draw_song, capacity=BLITZ_BUFFER_SIZE, on_ready=None):
+        """
+        Args:
+            scheduler (RoundScheduler): Scheduler that prepares the rounds
+            draw_song (callable): Returns the next Song to prepare; called by fill()
+            capacity (int): Number of rounds kept ready or in preparation
+            on_ready (callable): Called from a worker thread whenever a preparation
+                finishes (ready or dropped); should hand over to the owner's thread
+        """
+        self.scheduler = scheduler
+        self.draw_song = draw_song
+        self.capacity = capacity
+        self.on_ready = on_ready
+        self.ready = deque()
+        self.futures = set()
+        self.in_flight = 0
+        self.underruns = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def fill(self):
+        """Queue preparations until the buffer is full (owner's thread)"""
+        while True:
+            with self._lock:
+                if (self.closed or self.scheduler.shut_down
+                        or len(self.ready) + self.in_flight >= self.capacity):
+                    return
+                self.in_flight += 1
+            try:
+                future = self.scheduler.prepare(self.draw_song(), lambda: self.closed)
+            except Exception:
+                with self._lock:
+                    self.in_flight -= 1
+                raise
+            with self._lock:
+                self.futures.add(future)
+            future.add_done_callback(self._on_prepared)
+            if future.cancelled():
+                return  # Came back cancelled: the scheduler is shutting down
+
+    def _on_prepared(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            self.futures.discard(future)
+            if not (self.closed or future.cancelled() or future.exception() is not None):
+                round_ = future.result()
+                if round_ is not None:
+                    self.ready.append(round_)
+        if self.on_ready and not self.closed:
+            self.on_ready()
+
+    def __len__(self):
+        return len(self.ready)
+
+    def pop(self):
+        """
+        Take the oldest ready round; call fill() afterwards to prepare its replacement.
+
+        Returns:
+            Round or None: A ready round, or None if the buffer ran dry (counted in underruns)
+        """
+        with self._lock:
+            round_ = self.ready.popleft() if self.ready else None
+            if round_ is None:
+                self.underruns += 1
+        return round_
+
+    def close(self):
+        """
+        Stop refilling and cancel queued preparations; rounds already being prepared
+        are dropped when they finish
+        """
+        with self._lock:
+            self.closed = True
+            self.ready.clear()
+            futures = list(self.futures)
+        for future in futures:
+            future.cancel()
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Get the shared round scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RoundScheduler()
+    return _scheduler
@@ -0,0 +1,150 @@
+"""
+sampling.py
+
+Weighted song sampling for the Song-Guesser game's endless all-artists mode.
+Draws go artist -> album -> song through precomputed alias tables (Vose's method), so
+each draw is O(1) and the catalog is never flattened into one big song list.
+"""
+
+import random
+
+from catalog import get_catalog
+from matching import SubstringIndex
+
+# Weighting modes for the endless mode: mode -> label shown in the selector
+SAMPLING_MODES = {
+    "song": "Uniform per song",
+    "artist": "Uniform per artist",
+    "year": "Uniform per release year"
+}
+
+
+class AliasTable:
+    """
+    Vose's alias method: O(n) setup, O(1) weighted draws.
+    """
+
+    __slots__ = ("probabilities", "aliases")
+
+    def __init__(self, weights):
+        """
+        Args:
+            weights (list): Non-negative weights, at least one of them positive
+        """
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight")
+
+        scaled = [weight * count / total for weight in weights]
+        self.probabilities = [1.0] * count
+        self.aliases = list(range(count))
+
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # Whatever is left is 1.0 up to rounding error
+        for i in small + large:
+            self.probabilities[i] = 1.0
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def sample(self, rng=random):
+        """Draw an index with probability proportional to its weight"""
+        i = int(rng.random() * len(self.probabilities))
+        return i if rng.random() < self.probabilities[i] else self.aliases[i]
+
+
+class CatalogSampler:
+    """
+    Endless song source over every artist in the catalog.
+
+    Behaves like a read-only song pool (len, iteration and membership over song IDs)
+    so it can be used wherever a selection array is, and adds draw() for O(1)
+    weighted picks.
+    """
+
+    def __init__(self, catalog=None, mode="song", rng=None):
+        """
+        Args:
+            catalog (Catalog): Catalog to sample, defaults to the shared catalog
+            mode (str): One of SAMPLING_MODES
+            rng (random.Random): Random source, defaults to the random module
+        """
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode: {mode}")
+
+        self.catalog = catalog or get_catalog()
+        self.mode = mode
+        self.rng = rng or random
+        self.artists = tuple(self.catalog.artist_names())
+
+        if mode == "year":
+            # Album level table: every release year is equally likely, and albums
+            # sharing a year split its weight by their song counts
+            albums = [album for artist in self.artists for album in self.catalog.artist(artist).albums]
+            year_sizes = {}
+            for album in albums:
+                year_sizes[album.release_year] = year_sizes.get(album.release_year, 0) + album.song_count
+            self.albums = tuple(albums)
+            self.table = AliasTable([album.song_count / year_sizes[album.release_year]
+                                     for album in albums])
+        else:
+            # Artist level table from the manifest counts, so artists load on first draw
+            self.albums = ()
+            if mode == "song":
+                weights = [self.catalog.song_count(artist) for artist in self.artists]
+            else:
+                weights = [1 if self.catalog.song_count(artist) else 0 for artist in self.artists]
+            self.table = AliasTable(weights)
+        self._suggestion_index = None
+
+    @property
+    def label(self):
+        return SAMPLING_MODES[self.mode]
+
+    def draw(self):
+        """
+        Draw one song ID.
+
+        Returns:
+            int: Song ID
+        """
+        rng = self.rng
+        if self.mode == "year":
+            song_ids = self.albums[self.table.sample(rng)].song_ids
+        else:
+            song_ids = self.catalog.artist(self.artists[self.table.sample(rng)]).song_ids
+        return song_ids[int(rng.random() * len(song_ids))]
+
+    def suggestion_index(self):
+        """
+        Autocomplete index over every song, built on first use (this loads every artist)
+        and shared by every game playing on this sampler.
+
+        Returns:
+            SubstringIndex: Index of the songs in iteration order
+        """
+        if self._suggestion_index is None:
+            self._suggestion_index = SubstringIndex(map(self.catalog.song, self))
+        return self._suggestion_index
+
+    def __len__(self):
+        return sum(self.catalog.song_count(artist) for artist in self.artists)
+
+    def __iter__(self):
+        for artist in self.artists:
+            yield from self.catalog.artist(artist).song_ids
+
+    def __contains__(self, song_id):
+        return 0 <= song_id < len(self)
@@ -0,0 +1,553 @@
+"""
+server.py
+
+Multiplayer server for the Song-Guesser game.
+One asyncio process hosts any number of players, each with their own GameEngine, over
+WebSocket (/ws). All sessions share the catalog and title indexes, the lyrics cache and
+the RoundScheduler's worker pool, so a song's lyrics are fetched once for everyone and
+blocking Genius calls never run on the event loop.
+
+Players can also join a room (see rooms.py) to race each other on shared rounds.
+
+HTTP endpoints:
+    GET /          server stats (sessions, rooms, lyrics cache hits and misses) as JSON
+    GET /artists   the catalog: artists, albums and endless sampling modes
+    GET /ws        WebSocket upgrade for a game session
+
+Session messages are JSON objects with a "type":
+    client: select {artist, album} or {mode} or {query: SongQuery fields}, guess {text},
+            hint, skip, suggest {text}, join {room, name, and a selection to create it},
+            leave
+    server: hello, round, result, hint, suggestions, room, error
+"""
+
+import asyncio
+import json
+import time
+
+from keywords import *
+from catalog import get_catalog
+from catalog_query import CatalogQuery, SongQuery, describe_query
+from engine import GameEngine, NoPlayableSongs
+from sampling import CatalogSampler, SAMPLING_MODES
+import lyrics
+from rooms import Room
+from rounds import RoundScheduler
+from websocket import WebSocket, handshake_response
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Concurrent lyric fetches shared by every session
+DEFAULT_FETCH_WORKERS = 16
+
+# Largest HTTP request head accepted before the upgrade
+MAX_REQUEST_HEAD = 16 * 1024
+
+# Suggestions returned for a suggest message
+MAX_SUGGESTIONS = 10
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def http_response(status, body, content_type="application/json"):
+    """Encode a complete HTTP/1.1 response that closes the connection"""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    head = (f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n"
+            "\r\n")
+    return head.encode("ascii") + body
+
+
+def parse_request_head(head):
+    """
+    Parse an HTTP request line and headers.
+
+    Args:
+        head (bytes): Request head up to and including the blank line
+
+    Returns:
+        tuple: (method, path, headers) with lower-case header names
+    """
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _version = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, path.split("?", 1)[0], headers
+
+
+def parse_query(fields):
+    """
+    Build a SongQuery from the fields of a select or join message.
+
+    Args:
+        fields: The message's "query" value
+
+    Returns:
+        SongQuery: The query
+
+    Raises:
+        ValueError: The fields are not an object of known filters with the expected types
+    """
+    if not isinstance(fields, dict):
+        raise ValueError("query must be an object")
+    values = {}
+    for name in SongQuery._fields:
+        value = fields.get(name)
+        if value is None:
+            continue
+        if name in ("artists", "albums"):
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError(f"query {name} must be a list of names")
+        elif (not isinstance(value, list) or len(value) != 2
+              or not all(isinstance(item, int) and not isinstance(item, bool) for item in value)):
+            raise ValueError(f"query {name} must be a [first, last] pair of integers")
+        values[name] = value
+    return SongQuery(**values)
+
+
+def task_cancelling():
+    """True if the running task was asked to cancel (always False before Python 3.11)"""
+    task = asyncio.current_task()
+    cancelling = getattr(task, "cancelling", None)
+    return cancelling is not None and cancelling() > 0
+
+
+class Session:
+    """
+    One player's connection: a GameEngine driven by WebSocket messages, with the next
+    round prepared on the shared scheduler while the current one is played.
+    """
+
+    __slots__ = ("server", "websocket", "engine", "next_round", "room", "started")
+
+    def __init__(self, server, websocket):
+        """
+        Args:
+            server (GameServer): Server owning the shared resources
+            websocket (WebSocket): The player's connection
+        """
+        self.server = server
+        self.websocket = websocket
+        self.engine = GameEngine(server.catalog)
+        self.next_round = None  # asyncio future of the round prepared ahead
+        self.room = None
+        self.started = time.monotonic()
+
+    async def send(self, message):
+        return await self.websocket.send_text(json.dumps(message, ensure_ascii=False))
+
+    async def error(self, text):
+        await self.send({"type": "error", "message": text})
+
+    def prepare_next(self):
+        """Start drawing and preparing the next round"""
+        self.cancel_next()
+        self.next_round = asyncio.ensure_future(self.server.prepare_round(self.engine))
+
+    def cancel_next(self):
+        if self.next_round is not None:
+            if self.next_round.done() and not self.next_round.cancelled():
+                self.next_round.exception()  # A failed preparation nobody will play is not an error
+            self.next_round.cancel()
+            self.next_round = None
+
+    async def advance(self):
+        """Wait for the prepared round, start it, send it and prepare the one after"""
+        if self.next_round is None:
+            self.prepare_next()
+        future, self.next_round = self.next_round, None
+        try:
+            round_ = await future
+        except asyncio.CancelledError:
+            self.cancel_next()
+            if task_cancelling():
+                raise  # The session itself is closing
+            # Only the round was cancelled: the scheduler is shutting down
+            await self.error("Could not prepare the next round")
+            return
+        except NoPlayableSongs as e:
+            await self.error(str(e))
+            return
+        except Exception as e:
+            print_error(f"Error preparing round: {e}")
+            await self.error("Could not prepare the next round")
+            return
+
+        engine = self.engine
+        engine.start_round(round_)
+        self.prepare_next()  # NoPlayableSongs is reported by the next advance
+        await self.send({
+            "type": "round",
+            "round": engine.songs_played,
+            "lyric": round_.lyric,
+            "artist": engine.current_artist,
+            "album": engine.selected_album,
+            "score": engine.score,
+            "streak": engine.streak
+        })
+
+    async def selection(self, message):
+        """
+        Resolve a select message to (artist label, album label, songs). Endless samplers
+        and queries can load every artist, so they are built on worker threads.
+
+        Returns:
+            tuple or None: The selection, or None if it is unknown or empty
+
+        Raises:
+            ValueError: The selection fields have the wrong types
+        """
+        catalog = self.server.catalog
+        if "mode" in message:
+            mode = message["mode"]
+            if not isinstance(mode, str) or mode not in SAMPLING_MODES:
+                return None
+            return "All Artists", f"Endless • {SAMPLING_MODES[mode]}", await self.server.sampler(mode)
+
+        if "query" in message:
+            query = parse_query(message["query"])
+            if query.artists is not None and not all(artist in catalog for artist in query.artists):
+                return None
+            songs = await asyncio.get_running_loop().run_in_executor(
+                None, self.server.query_engine.songs, query)
+            return (*describe_query(query), songs) if songs else None
+
+        artist = message.get("artist")
+        if not isinstance(artist, str) or artist not in catalog:
+            return None
+        artist_record = catalog.artist(artist)
+        album = message.get("album") or "All Albums"
+        if not isinstance(album, str):
+            raise ValueError("album must be a name")
+        if album == "All Albums":
+            return artist, album, artist_record.song_ids
+        if album in artist_record.albums_by_name:
+            return artist, album, artist_record.albums_by_name[album].song_ids
+        return None
+
+    async def suggestions(self, engine, message):
+        """Titles matching a suggest message, found on a worker thread (the first endless-mode
+        search builds the sampler's index over every artist)"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, engine.suggestions, str(message.get("text", "")))
+
+    async def handle_room(self, kind, message, received_at):
+        """Apply a client message while in a room"""
+        room = self.room
+        if kind == "guess":
+            reply = room.guess(self, str(message.get("text", "")), received_at)
+        elif kind == "hint":
+            reply = room.hint(self)
+        elif kind == "suggest":
+            titles = await self.suggestions(room.engine, message)
+            reply = {"type": "suggestions", "titles": titles[:MAX_SUGGESTIONS]}
+        elif kind == "leave":
+            room.leave(self)
+            reply = {"type": "room", "room": None}
+        else:
+            reply = {"type": "error", "message": f"Not available in a room: {kind}"}
+        if reply is not None:
+            await self.send(reply)
+
+    async def join(self, message):
+        """Join (or create) a room"""
+        name = str(message.get("room", "")).strip()
+        if not name:
+            await self.error("Room name required")
+            return
+
+        room = self.server.rooms.get(name)
+        if room is None:
+            try:
+                selection = await self.selection(message)
+            except (TypeError, ValueError) as e:
+                await self.error(f"Invalid selection: {e}")
+                return
+            if selection is None:
+                await self.error("Unknown or empty selection for the new room")
+                return
+            room = self.server.rooms[name] = Room(self.server, name, selection)
+            room.start()
+
+        self.cancel_next()
+        self.room = room
+        player_name = str(message.get("name") or f"Player {self.server.sessions_served}")[:40]
+        for reply in room.join(self, player_name):
+            await self.send(reply)
+
+    async def handle(self, message, received_at=None):
+        """
+        Apply one client message to the game.
+
+        Args:
+            message (dict): Decoded client message
+            received_at (float): time.monotonic() when the message was read, for room
+                guess ordering
+        """
+        engine = self.engine
+        kind = message.get("type")
+
+        if kind == "join":
+            if self.room is not None:
+                self.room.leave(self)
+            await self.join(message)
+        elif self.room is not None:
+            await self.handle_room(kind, message, received_at if received_at is not None else time.monotonic())
+        elif kind == "select":
+            try:
+                selection = await self.selection(message)
+            except (TypeError, ValueError) as e:
+                await self.error(f"Invalid selection: {e}")
+                return
+            if selection is None:
+                await self.error("Unknown or empty selection")
+                return
+            self.cancel_next()
+            engine.select(*selection)
+            await self.advance()
+        elif kind == "guess":
+            result = engine.submit_guess(str(message.get("text", "")))
+            if result is None:
+                return
+            await self.send({"type": "result", "correct": result.correct, "scored": result.scored,
+                             "message": result.message, "score": engine.score, "streak": engine.streak})
+            if result.correct:
+                await self.advance()
+        elif kind == "skip":
+            text = engine.skip_song()
+            if text is None:
+                return
+            await self.send({"type": "result", "correct": False, "scored": False,
+                             "message": text, "score": engine.score, "streak": engine.streak})
+            await self.advance()
+        elif kind == "hint":
+            hint = engine.show_hint()
+            if hint is not None:
+                lines, text = hint
+                await self.send({"type": "hint", "lines": lines, "message": text})
+        elif kind == "suggest":
+            titles = await self.suggestions(engine, message)
+            await self.send({"type": "suggestions", "titles": titles[:MAX_SUGGESTIONS]})
+        else:
+            await self.error(f"Unknown message type: {kind}")
+
+    async def run(self):
+        """Serve the session until the player disconnects"""
+        await self.send({"type": "hello", "artists": self.server.catalog.artist_names(),
+                         "modes": SAMPLING_MODES})
+        try:
+            while True:
+                text = await self.websocket.receive()
+                if text is None:
+                    break
+                received_at = time.monotonic()
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    await self.error("Messages must be JSON")
+                    continue
+                if not isinstance(message, dict):
+                    await self.error("Messages must be JSON objects")
+                    continue
+                await self.handle(message, received_at)
+        finally:
+            self.cancel_next()
+            if self.room is not None:
+                self.room.leave(self)
+
+
+class GameServer:
+    """
+    HTTP/WebSocket front end hosting many game sessions in one process.
+    """
+
+    def __init__(self, catalog=None, scheduler=None):
+        """
+        Args:
+            catalog (Catalog): Catalog shared by all sessions, defaults to the shared catalog
+            scheduler (RoundScheduler): Fetch pool shared by all sessions
+        """
+        self.catalog = catalog or get_catalog()
+        self.scheduler = scheduler or RoundScheduler(max_workers=DEFAULT_FETCH_WORKERS)
+        self.query_engine = CatalogQuery(self.catalog)
+        self.sessions = set()
+        self.sessions_served = 0
+        self.rooms = {}  # Room name -> Room
+        self._builds = {}  # Key -> future of a shared build (/artists body, samplers)
+
+    async def build_once(self, key, build, *args):
+        """
+        Run a blocking build on a worker thread the first time it is asked for, and share
+        the result with every later (and concurrent) caller.
+
+        Args:
+            key: Name of the build
+            build (callable): Builds the value from args
+
+        Returns:
+            The built value
+        """
+        future = self._builds.get(key)
+        if future is None:
+            future = self._builds[key] = asyncio.get_running_loop().run_in_executor(None, build, *args)
+        try:
+            # Shielded: a client disconnecting mid-request must not cancel the shared build
+            return await asyncio.shield(future)
+        except Exception:
+            if self._builds.get(key) is future:
+                del self._builds[key]  # Retried by the next request
+            raise
+
+    async def sampler(self, mode):
+        """Endless-mode sampler for a weighting, shared by all sessions (the year weighting
+        loads every artist)"""
+        return await self.build_once(("sampler", mode), CatalogSampler, self.catalog, mode)
+
+    async def prepare_round(self, engine):
+        """
+        Draw a song from an engine's selection and prepare its round on the shared
+        scheduler (see GameEngine.prepare_playable_round). The draw runs on a worker
+        thread: it can load an artist, and a cache-only draw checks the lyrics cache for
+        many songs.
+
+        Args:
+            engine (GameEngine): Session or room engine to draw from
+
+        Returns:
+            Round: The prepared round
+
+        Raises:
+            NoPlayableSongs: No song of the selection can be played
+        """
+        future = await asyncio.get_running_loop().run_in_executor(
+            None, engine.prepare_playable_round, self.scheduler)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        """Server and lyrics cache counters"""
+        cache = lyrics.get_cache()
+        return {
+            "sessions": len(self.sessions),
+            "sessions_served": self.sessions_served,
+            "rooms": {name: len(room.members) for name, room in self.rooms.items()},
+            "lyrics_cache": {"hits": cache.hits, "misses": cache.misses, "songs": len(cache.memory)}
+        }
+
+    def artists(self):
+        """The catalog as served by /artists; loads every artist, so blocking"""
+        catalog = self.catalog
+        return {
+            "artists": [{"name": name,
+                         "song_count": catalog.song_count(name),
+                         "albums": [{"name": album.name, "release_year": album.release_year,
+                                     "song_count": album.song_count}
+                                    for album in catalog.artist(name).albums]}
+                        for name in catalog.artist_names()],
+            "modes": SAMPLING_MODES
+        }
+
+    async def artists_body(self):
+        """
+        The encoded /artists response, built once on a worker thread so loading the
+        whole catalog never blocks the event loop.
+
+        Returns:
+            str: JSON response body
+        """
+        return await self.build_once("artists", lambda: json.dumps(self.artists(), ensure_ascii=False))
+
+    async def handle_connection(self, reader, writer):
+        """Serve one HTTP request, or a game session if it is a WebSocket upgrade"""
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+                method, path, headers = parse_request_head(head)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+                return
+
+            if method != "GET":
+                writer.write(http_response(405, json.dumps({"error": "GET only"})))
+            elif path == "/ws":
+                key = headers.get("sec-websocket-key")
+                if headers.get("upgrade", "").lower() != "websocket" or not key:
+                    writer.write(http_response(400, json.dumps({"error": "WebSocket upgrade expected"})))
+                else:
+                    writer.write(handshake_response(key))
+                    await writer.drain()
+                    await self.serve_session(WebSocket(reader, writer))
+                    return
+            elif path == "/":
+                writer.write(http_response(200, json.dumps(self.stats())))
+            elif path == "/artists":
+                writer.write(http_response(200, await self.artists_body()))
+            else:
+                writer.write(http_response(404, json.dumps({"error": "Not found"})))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            pass  # Server shutdown: end the connection quietly (the pending round was cancelled)
+        finally:
+            writer.close()
+
+    async def serve_session(self, websocket):
+        session = Session(self, websocket)
+        self.sessions.add(session)
+        self.sessions_served += 1
+        try:
+            await session.run()
+        except Exception as e:
+            print_error(f"Error in session: {e}")
+        finally:
+            self.sessions.discard(session)
+            await websocket.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+        """
+        Accept connections until cancelled.
+
+        Args:
+            host (str): Interface to listen on
+            port (int): TCP port, 0 for any free port
+            ready (asyncio.Future): Resolved with the bound port once listening
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_REQUEST_HEAD,
+                                            backlog=1024)
+        bound_port = server.sockets[0].getsockname()[1]
+        print_success(f"Melo-Guesser server on ws://{host}:{bound_port}/ws "
+                      f"({self.scheduler.max_workers} fetch workers)")
+        if ready is not None:
+            ready.set_result(bound_port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.scheduler.shutdown()
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_FETCH_WORKERS):
+    """
+    Run the game server until interrupted.
+
+    Args:
+        host (str): Interface to listen on
+        port (int): TCP port
+        workers (int): Concurrent lyric fetches shared by all sessions
+
+    Returns:
+        int: Exit code
+    """
+    game_server = GameServer(scheduler=RoundScheduler(max_workers=workers))
+    lyrics.warm_up()
+    try:
+        asyncio.run(game_server.serve(host, port))
+    except KeyboardInterrupt:
+        print_success("Server stopped")
+    return 0
@@ -0,0 +1,18 @@
+import pickle
+
+from catalog import Catalog, write_catalog
+
+ARTISTS = {
+    "Artist": {
+        "Album": {"release_year": 2020, "cover_art": None, "songs": ["One", "Two"]},
+        "Album (Deluxe)": {"release_year": 2021, "cover_art": None, "songs": ["One", "Three"]},
+    },
+}
+
+
+def test_artist_pickles(tmp_path):
+    artist = Catalog(write_catalog(ARTISTS, str(tmp_path))).artist("Artist")
+    copy = pickle.loads(pickle.dumps(artist))
+    assert copy == artist
+    assert copy.albums_by_name["Album (Deluxe)"].song_ids == artist.albums_by_name["Album (Deluxe)"].song_ids
+    assert copy.songs_by_title["Three"].id == artist.songs_by_title["Three"].id
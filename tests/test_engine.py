@@ -0,0 +1,84 @@
+import concurrent.futures
+
+import pytest
+
+from catalog import Catalog, write_catalog
+from engine import GameEngine, NoPlayableSongs, UNAVAILABLE_REDRAWS
+import lyrics
+import rounds
+
+ARTISTS = {
+    "Artist": {
+        "Album": {"release_year": 2020, "cover_art": None,
+                  "songs": ["First Song", "Second Song", "Third Song"]},
+    },
+}
+
+LYRICS = "\n".join(["these are the words of a cached song"] * 3)
+
+
+@pytest.fixture
+def cache_only(tmp_path, monkeypatch):
+    """A cache-only game on an empty lyrics cache"""
+    monkeypatch.setattr(lyrics, "_cache", lyrics.LyricsCache(str(tmp_path / "lyrics")))
+    lyrics.set_cache_only(True)
+    yield Catalog(write_catalog(ARTISTS, str(tmp_path / "catalog")))
+    lyrics.set_cache_only(False)
+
+
+def test_uncached_song_is_unavailable_not_instrumental(cache_only):
+    with pytest.raises(lyrics.LyricsUnavailable):
+        lyrics.get_random_lyric_line("First Song", "Artist")
+
+
+def test_empty_cache_has_no_playable_songs(cache_only):
+    engine = GameEngine(cache_only)
+    engine.select("Artist", "All Albums", cache_only.artist("Artist").song_ids)
+    with pytest.raises(NoPlayableSongs):
+        engine.new_song()
+
+
+def test_cache_only_draws_the_cached_song(cache_only, monkeypatch):
+    monkeypatch.setattr("engine.CACHE_ONLY_DRAW_ATTEMPTS", 0)
+    lyrics.get_cache().put("Third Song", "Artist", LYRICS)
+    engine = GameEngine(cache_only)
+    engine.select("Artist", "All Albums", cache_only.artist("Artist").song_ids)
+    for _ in range(10):
+        assert engine.new_song().title == "Third Song"
+    assert rounds.build_round(engine.draw_playable_song()).lyric.startswith("these are the words")
+
+
+class FlakyScheduler:
+    """Fails the first preparations with LyricsUnavailable, then builds rounds inline"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.songs = []
+
+    def prepare(self, song, is_stale=None):
+        self.songs.append(song)
+        future = concurrent.futures.Future()
+        if len(self.songs) <= self.failures:
+            future.set_exception(lyrics.LyricsUnavailable(song.title))
+        else:
+            future.set_result(rounds.build_round(song, is_stale))
+        return future
+
+
+def test_unavailable_lyrics_are_redrawn(cache_only):
+    lyrics.get_cache().put("Third Song", "Artist", LYRICS)
+    engine = GameEngine(cache_only)
+    engine.select("Artist", "All Albums", cache_only.artist("Artist").song_ids)
+    scheduler = FlakyScheduler(UNAVAILABLE_REDRAWS - 1)
+    assert engine.prepare_playable_round(scheduler).result().title == "Third Song"
+    assert len(scheduler.songs) == UNAVAILABLE_REDRAWS
+
+
+def test_redraws_give_up_with_no_playable_songs(cache_only):
+    lyrics.get_cache().put("Third Song", "Artist", LYRICS)
+    engine = GameEngine(cache_only)
+    engine.select("Artist", "All Albums", cache_only.artist("Artist").song_ids)
+    scheduler = FlakyScheduler(UNAVAILABLE_REDRAWS)
+    with pytest.raises(NoPlayableSongs):
+        engine.prepare_playable_round(scheduler).result()
+    assert len(scheduler.songs) == UNAVAILABLE_REDRAWS
@@ -0,0 +1,8 @@
+from keywords import _Message
+
+
+def test_message_snapshots_mutable_arguments():
+    songs = ["Starboy"]
+    message = _Message(("Queue:", songs, 3, 0.5))
+    songs.append("Blinding Lights")
+    assert str(message) == "Queue: ['Starboy'] 3 0.5 "
@@ -0,0 +1,64 @@
+from catalog import Song
+from matching import SubstringIndex, TitleIndex, bounded_edit_distance, title_key, unique_titles
+
+ALBUMS = {
+    "Album": {"release_year": 2018, "cover_art": None,
+              "songs": ["The Only Time I Feel Alive", "The Birds Pt. 1", "The Birds Pt. 2"]},
+    "Album (Deluxe)": {"release_year": 2018, "cover_art": None,
+                       "songs": ["THE ONLY TIME I FEEL ALIVE", "Bonus"]},
+}
+
+
+def test_case_variant_is_one_song():
+    assert unique_titles(ALBUMS) == ["The Only Time I Feel Alive", "The Birds Pt. 1",
+                                     "The Birds Pt. 2", "Bonus"]
+
+
+def test_typo_accepted_despite_case_variant_duplicate():
+    index = TitleIndex(ALBUMS)
+    guess = "the only tme i feel alive"
+    assert index.check_guesses([(guess, "The Only Time I Feel Alive"),
+                                (guess, "THE ONLY TIME I FEEL ALIVE")]) == [True, True]
+
+
+def test_closer_rival_song_still_rejects_typo():
+    index = TitleIndex(ALBUMS)
+    assert not index.is_correct_guess("The Birds Pt. 2", "The Birds Pt. 1")
+    assert not index.is_correct_guess("The Birds Pt 3", "The Birds Pt. 1")
+
+
+def test_rival_candidates_include_every_close_key():
+    titles = ["Starlight", "Tsarlight", "Starlite", "Midnight City", "Midnight Cities",
+              "Night City", "Sunlight", "Stair Light"]
+    index = TitleIndex({"Album": {"release_year": 2020, "cover_art": None, "songs": titles}})
+    for guess in ["starlihgt", "tsarligth", "midnigth city", "nite city", "sun light", "stairlight"]:
+        for distance in (1, 2, 3):
+            close = {key for key in index.aliases if bounded_edit_distance(guess, key, distance) <= distance}
+            assert close <= set(index.rival_candidates(guess, distance))
+
+
+SYMBOL_TITLES = {"Album": {"release_year": 2019, "cover_art": None,
+                           "songs": ["!!!!!!", "$$$", "💔", "Ocean Eyes"]}}
+
+
+def test_symbol_only_titles_are_distinct_songs():
+    assert unique_titles(SYMBOL_TITLES) == ["!!!!!!", "$$$", "💔", "Ocean Eyes"]
+    assert "" not in TitleIndex(SYMBOL_TITLES).aliases
+
+
+def test_symbol_only_title_is_matched_on_its_own_text():
+    index = TitleIndex(SYMBOL_TITLES)
+    assert index.is_correct_guess("!!!!!!", "!!!!!!")
+    assert index.is_correct_guess("💔", "💔")
+    assert not index.is_correct_guess("ocean eyes", "!!!!!!")
+    assert not index.is_correct_guess("$$$", "!!!!!!")
+    assert not index.is_correct_guess("!!!!!!", "Ocean Eyes")
+
+
+def test_substring_index_finds_what_a_scan_finds():
+    titles = ["Love Me Harder", "Lover", "Glove", "Shallow", "Low", "Love", "!!!!!!"]
+    songs = [Song(song_id, title, title_key(title), "Artist") for song_id, title in enumerate(titles)]
+    index = SubstringIndex(songs)
+    for text in ["love", "lo", "low", "e", "harder", "!!", "w", "glove", "shallow low"]:
+        text_key = title_key(text)
+        assert index.search(text_key) == [song for song in songs if text_key in song.key]
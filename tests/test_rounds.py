@@ -0,0 +1,55 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rounds import RoundBuffer, RoundScheduler
+
+
+class FakeScheduler:
+    """Prepares a "round" (the song itself) on a worker thread"""
+
+    shut_down = False
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+
+    def prepare(self, song, is_stale=None):
+        return self.executor.submit(lambda: song)
+
+
+def test_songs_are_only_drawn_on_the_owner_thread():
+    draw_threads = []
+    finished = threading.Semaphore(0)
+
+    def draw_song():
+        draw_threads.append(threading.get_ident())
+        return len(draw_threads)
+
+    buffer = RoundBuffer(FakeScheduler(), draw_song, capacity=3, on_ready=finished.release)
+    buffer.fill()
+    for _ in range(3):
+        assert finished.acquire(timeout=5)
+    assert len(buffer) == 3
+
+    assert buffer.pop() == 1
+    buffer.fill()
+    assert finished.acquire(timeout=5)
+    assert draw_threads == [threading.get_ident()] * 4
+    assert [buffer.pop() for _ in range(3)] == [2, 3, 4]
+
+
+def test_fill_after_shutdown_returns():
+    scheduler = RoundScheduler(max_workers=1)
+    scheduler.shutdown()
+    draws = []
+    buffer = RoundBuffer(scheduler, lambda: draws.append(None), capacity=3)
+    buffer.fill()
+    assert draws == [] and len(buffer) == 0 and buffer.in_flight == 0
+
+
+def test_fill_stops_when_a_preparation_comes_back_cancelled():
+    scheduler = RoundScheduler(max_workers=1)
+    scheduler.executor.shutdown()  # Shut down behind the flag's back, as in a race
+    draws = []
+    buffer = RoundBuffer(scheduler, lambda: draws.append(None), capacity=3)
+    buffer.fill()
+    assert len(draws) == 1 and buffer.in_flight == 0
@@ -0,0 +1,92 @@
+import asyncio
+import concurrent.futures
+import json
+
+import lyrics
+from server import GameServer, Session
+
+
+class ManualScheduler:
+    """Hands out round futures that the test settles"""
+
+    def __init__(self):
+        self.futures = []
+
+    def prepare(self, song, is_stale=None):
+        future = concurrent.futures.Future()
+        self.futures.append(future)
+        return future
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+def test_cancelled_round_is_reported_not_raised(monkeypatch):
+    monkeypatch.setattr(lyrics, "can_fetch", lambda: True)
+
+    async def play():
+        server = GameServer(scheduler=ManualScheduler())
+        session = Session(server, RecordingWebSocket())
+        handling = asyncio.ensure_future(
+            session.handle({"type": "select", "artist": server.catalog.artist_names()[0]}))
+        while not server.scheduler.futures:  # The song is drawn on a worker thread
+            await asyncio.sleep(0.001)
+        server.scheduler.futures[0].cancel()  # e.g. the scheduler shutting down
+        await handling
+        return session
+
+    session = asyncio.run(play())
+    assert session.websocket.sent == [{"type": "error", "message": "Could not prepare the next round"}]
+    assert session.next_round is None
+
+
+def test_artists_body_is_built_once():
+    async def fetch_twice():
+        server = GameServer(scheduler=ManualScheduler())
+        first, second = await asyncio.gather(server.artists_body(), server.artists_body())
+        return server, first, second
+
+    server, first, second = asyncio.run(fetch_twice())
+    assert first is second
+    listing = json.loads(first)
+    assert [artist["name"] for artist in listing["artists"]] == server.catalog.artist_names()
+
+
+def test_malformed_selections_get_an_error_frame():
+    async def send_all(messages):
+        server = GameServer(scheduler=ManualScheduler())
+        session = Session(server, RecordingWebSocket())
+        for message in messages:
+            await session.handle(message)
+        return session.websocket.sent
+
+    sent = asyncio.run(send_all([
+        {"type": "select", "query": "The Weeknd"},
+        {"type": "select", "query": {"years": [2010]}},
+        {"type": "select", "query": {"artists": "The Weeknd"}},
+        {"type": "select", "artist": ["The Weeknd"]},
+        {"type": "select", "mode": {}},
+        {"type": "join", "room": "r", "query": [1, 2]},
+    ]))
+    assert [reply["type"] for reply in sent] == ["error"] * 6
+    assert sent[0]["message"] == "Invalid selection: query must be an object"
+
+
+def test_endless_sessions_share_one_sampler_and_suggest():
+    async def select_endless():
+        server = GameServer(scheduler=ManualScheduler())
+        sessions = [Session(server, RecordingWebSocket()) for _ in range(2)]
+        selections = await asyncio.gather(*(session.selection({"mode": "song"}) for session in sessions))
+        sessions[0].engine.select(*selections[0])
+        titles = await sessions[0].suggestions(sessions[0].engine, {"text": "the"})
+        return server, selections, titles
+
+    server, (first, second), titles = asyncio.run(select_endless())
+    assert first[2] is second[2]
+    expected = [song.title for song in map(server.catalog.song, first[2]) if "the" in song.key]
+    assert expected and set(expected) <= set(titles)
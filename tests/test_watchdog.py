@@ -0,0 +1,14 @@
+import watchdog
+
+
+def test_malformed_threshold_falls_back_to_default(monkeypatch):
+    for value in ("fifty", "nan", "inf", "-inf", "-5"):
+        monkeypatch.setenv("MELO_STALL_MS", value)
+        assert watchdog.stall_threshold_ms() == watchdog.STALL_THRESHOLD_MS
+
+
+def test_threshold_from_environment(monkeypatch):
+    monkeypatch.setenv("MELO_STALL_MS", "120")
+    assert watchdog.stall_threshold_ms() == 120
+    monkeypatch.setenv("MELO_STALL_MS", "0")
+    assert watchdog.start_watchdog() is None
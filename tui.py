@@ -0,0 +1,259 @@
+"""
+tui.py
+
+Terminal front end for the Song-Guesser game.
+Plays the same rules as the window through the headless GameEngine, with the colored
+console helpers from keywords.py instead of Qt, so it starts quickly and stays small on
+headless machines. Rounds come from the shared RoundScheduler and lyrics cache; the next
+round is prepared while the player is still guessing the current one.
+
+Commands during a round:
+    <title>   guess the song
+    ?<text>   list matching titles from the selection
+    :hint     show two more lyric lines (no points for this round)
+    :skip     reveal the song and move on
+    :menu     back to artist selection
+    :quit     leave the game
+"""
+
+import getpass
+import os
+
+from keywords import *
+from catalog import get_catalog
+from engine import GameEngine, NoPlayableSongs
+from sampling import CatalogSampler, SAMPLING_MODES
+import lyrics
+from rounds import get_scheduler
+
+# Selector entry for the endless mode across every artist
+ALL_ARTISTS = "All Artists (Endless)"
+ALL_ALBUMS = "All Albums"
+
+# Suggestions listed for a ?<text> query
+MAX_SUGGESTIONS = 10
+
+
+class Quit(Exception):
+    """Raised when the player leaves the game"""
+
+
+def read_input(prompt):
+    """Read a line from the player; end of input leaves the game"""
+    try:
+        return input(f"{c_white}{prompt}{c_rst}").strip()
+    except (EOFError, KeyboardInterrupt):
+        print()
+        raise Quit()
+
+
+def choose(title, options):
+    """
+    Let the player pick one of a numbered list of options.
+
+    Args:
+        title (str): Heading printed above the list
+        options (list): Option labels
+
+    Returns:
+        int: Index of the chosen option
+    """
+    print(f"\n{c_yellow}{title}{c_rst}")
+    for number, option in enumerate(options, 1):
+        print(f"  {c_blue}{number:>2}{c_rst}  {option}")
+
+    if os.getenv("MELO_STARTUP_PROBE"):
+        # Used by benchmarks/startup.py: report once the first menu is drawn, then quit
+        print("startup-probe: menu shown", flush=True)
+        raise Quit()
+
+    while True:
+        answer = read_input("> ")
+        if answer in (":quit", ":q"):
+            raise Quit()
+        if answer.isdigit() and 1 <= int(answer) <= len(options):
+            return int(answer) - 1
+        print_warning(f"Enter a number from 1 to {len(options)}")
+
+
+class TerminalGame:
+    """
+    The game loop: selection menus, then rounds until the player goes back or quits.
+    """
+
+    def __init__(self, catalog=None):
+        """
+        Args:
+            catalog (Catalog): Catalog to play from, defaults to the shared catalog
+        """
+        self.catalog = catalog or get_catalog()
+        self.engine = GameEngine(self.catalog)
+        self.scheduler = get_scheduler()
+        self.next_round = None  # Future of the round prepared ahead
+
+    def select(self):
+        """Ask for an artist and album and start a game on them"""
+        names = self.catalog.artist_names()
+        choice = choose("SELECT YOUR MUSIC", names + [ALL_ARTISTS])
+
+        if choice == len(names):
+            # Endless mode offers song weightings instead of albums
+            modes = list(SAMPLING_MODES)
+            mode = modes[choose("SONG WEIGHTING", [SAMPLING_MODES[mode] for mode in modes])]
+            self.engine.select("All Artists", f"Endless • {SAMPLING_MODES[mode]}",
+                               CatalogSampler(self.catalog, mode))
+            return
+
+        artist = self.catalog.artist(names[choice])
+        labels = [f"{ALL_ALBUMS} ({artist.song_count} songs)"]
+        labels += [f"{album.name} ({album.release_year} • {album.song_count} songs)" for album in artist.albums]
+        album_choice = choose(f"{artist.name.upper()}: SELECT AN ALBUM", labels)
+        if album_choice == 0:
+            self.engine.select(artist.name, ALL_ALBUMS, artist.song_ids)
+        else:
+            album = artist.albums[album_choice - 1]
+            self.engine.select(artist.name, album.name, album.song_ids)
+
+    @staticmethod
+    def ask_token():
+        """Ask for a Genius token at the terminal; empty keeps playing from the cache"""
+        print_warning("This song's lyrics aren't cached yet.")
+        try:
+            return getpass.getpass("Genius API token (leave empty to play from the cache): ")
+        except (EOFError, KeyboardInterrupt):
+            return ""
+
+    def ensure_fetch_possible(self):
+        """Make sure lyrics can be fetched, asking for a token the first time one is needed"""
+        return lyrics.ensure_fetch_possible(self.ask_token)
+
+    def prepare_next(self):
+        """Start preparing the next round on the shared scheduler"""
+        self.next_round = None
+        self.next_round = self.engine.prepare_playable_round(self.scheduler, self.ensure_fetch_possible)
+
+    def take_next(self):
+        """
+        Wait for the round prepared ahead, start it and queue the one after.
+
+        Returns:
+            bool: False if the round could not be prepared
+        """
+        try:
+            if self.next_round is None:
+                self.prepare_next()
+            future, self.next_round = self.next_round, None
+            if not future.done():
+                print_debug("Now loading...")
+            round_ = future.result()
+        except NoPlayableSongs as e:
+            print_warning(e)
+            return False
+        except Exception as e:
+            print_error(f"Error preparing round: {e}")
+            return False
+
+        self.engine.start_round(round_)
+        try:
+            self.prepare_next()
+        except NoPlayableSongs:
+            pass  # Reported when the next round is taken
+        return True
+
+    def show_round(self):
+        """Print the header, scores and lyric of the current round"""
+        engine = self.engine
+        print(f"\n{c_yellow}GUESS THE SONG FROM LYRICS{c_rst}  "
+              f"{c_white}[{engine.selected_album}]{c_rst}  "
+              f"score {c_green}{engine.score}{c_rst} • streak {c_green}{engine.streak}{c_rst}")
+        print(f'  "{engine.current_round.lyric}"')
+
+    def show_suggestions(self, text):
+        """Print the titles matching partly typed text"""
+        matches = self.engine.suggestions(text)
+        if not matches:
+            print_warning("No matching songs")
+            return
+        for title in matches[:MAX_SUGGESTIONS]:
+            print(f"  {c_blue}•{c_rst} {title}")
+        if len(matches) > MAX_SUGGESTIONS:
+            print(f"  ... and {len(matches) - MAX_SUGGESTIONS} more")
+
+    def play_round(self):
+        """
+        Play one round until it is answered or skipped.
+
+        Returns:
+            bool: False if the player went back to the menu
+        """
+        self.show_round()
+        while True:
+            command = read_input("guess> ")
+            if not command:
+                continue
+            if command in (":quit", ":q"):
+                raise Quit()
+            if command in (":menu", ":m"):
+                return False
+            if command.startswith("?"):
+                self.show_suggestions(command[1:])
+            elif command in (":hint", ":h"):
+                hint = self.engine.show_hint()
+                if hint is not None:
+                    new_lines, message = hint
+                    for line in new_lines:
+                        print(f'  "{line}"')
+                    print_debug(message)
+            elif command in (":skip", ":s"):
+                message = self.engine.skip_song()
+                if message is not None:
+                    print_warning(message)
+                    return True
+            else:
+                result = self.engine.submit_guess(command)
+                if result is None:
+                    continue
+                if result.correct:
+                    print_success(result.message)
+                    return True
+                print_error(result.message)
+
+    def play(self):
+        """Selection menu and rounds until the player goes back to the menu"""
+        self.select()
+        self.next_round = None
+        while self.take_next():
+            if not self.play_round():
+                break
+
+        engine = self.engine
+        print_success(f"Score: {engine.score} • Best streak: {engine.max_streak} • Rounds: {engine.songs_played}")
+        if self.next_round is not None:
+            self.next_round.cancel()
+            self.next_round = None
+        engine.clear()
+
+
+def run_tui():
+    """
+    Run the terminal game until the player quits.
+
+    Returns:
+        int: Exit code
+    """
+    game = TerminalGame()
+    print_success(f"Melo-Guesser • {len(game.catalog.artist_names())} artists • "
+                  f"lyrics cache: {lyrics.CACHE_DIR}")
+    print_debug("Commands: <title> to guess, ?<text> for suggestions, :hint, :skip, :menu, :quit")
+
+    # Build the Genius client in the background while the player picks an artist
+    lyrics.warm_up()
+
+    try:
+        while True:
+            game.play()
+    except Quit:
+        print_success("Bye!")
+    finally:
+        game.scheduler.shutdown()
+    return 0
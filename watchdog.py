@@ -0,0 +1,184 @@
+"""
+watchdog.py
+
+Event-loop stall watchdog for the Song-Guesser window.
+A heartbeat timer on the GUI thread records when the event loop last ran, and a monitor
+thread checks it. When the loop has not run for longer than the threshold, the monitor
+captures the main thread's Python stack while it is still stuck, so the blocking call
+(a synchronous fetch, a slow layout) is named in the log. When the loop recovers, the
+stall's length goes into the session's "gui.stall" histogram and the delay of every
+heartbeat into "gui.loop_latency" (see instrumentation.py; main.py --timings exports
+them). At exit, the code sites that stalled most are summarized.
+
+MELO_STALL_MS sets the threshold (50 by default); 0 turns the watchdog off. It is read
+when the watchdog starts; a value that is not a finite, non-negative number of
+milliseconds falls back to the default.
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+
+from keywords import *
+from instrumentation import record
+
+STALL_THRESHOLD_ENV = "MELO_STALL_MS"
+STALL_THRESHOLD_MS = 50
+
+# Stalls kept with their stacks, and stack frames shown per stall in the log
+MAX_STALLS = 100
+STACK_DEPTH = 8
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Stall:
+    """One stall of the event loop"""
+
+    __slots__ = ("started_at", "duration", "stack")
+
+    def __init__(self, started_at, duration, stack):
+        self.started_at = started_at
+        self.duration = duration
+        self.stack = stack
+
+
+def stall_site(stack):
+    """
+    The innermost project frame of a captured stack, e.g. "gui.py:752 in new_song".
+
+    Args:
+        stack (traceback.StackSummary): Captured main-thread stack
+
+    Returns:
+        str: Site description, "unknown" for an empty stack
+    """
+    if not stack:
+        return "unknown"
+    frames = [frame for frame in stack if frame.filename.startswith(PROJECT_DIR)] or stack
+    frame = frames[-1]
+    return f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}"
+
+
+class StallWatchdog:
+    """
+    Detects stalls of the thread running the event loop.
+    The heartbeat (beat) runs on that thread; everything else runs on the monitor thread.
+    """
+
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS):
+        """
+        Args:
+            threshold_ms (float): Loop delay counted as a stall, in milliseconds
+        """
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 2  # Heartbeat period
+        self.poll_interval = self.threshold / 4  # Monitor checks, so short stalls are caught in the act
+        self.main_thread_id = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        self.stalls = deque(maxlen=MAX_STALLS)
+        self.sites = Counter()
+        self.stall_count = 0
+        self._pending_stack = None  # Captured for the stall in progress
+        self._stop = threading.Event()
+        self._thread = None
+        self._timer = None
+
+    def beat(self):
+        """Heartbeat, called by a timer on the event loop thread"""
+        now = time.perf_counter()
+        late = max(0.0, now - self.last_beat - self.interval)
+        self.last_beat = now
+        record("gui.loop_latency", late)
+        if late > self.threshold:
+            stack, self._pending_stack = self._pending_stack, None
+            self.report(Stall(now - late, late, stack))
+
+    def report(self, stall):
+        """Record a finished stall and log where the loop was stuck"""
+        self.stall_count += 1
+        self.stalls.append(stall)
+        site = stall_site(stall.stack)
+        self.sites[site] += 1
+        record("gui.stall", stall.duration)
+        if stall.stack:
+            print_warning(f"Event loop stalled for {stall.duration * 1000:.0f}ms at {site}:\n"
+                          + "".join(stall.stack.format()[-STACK_DEPTH:]).rstrip())
+        else:
+            print_warning(f"Event loop stalled for {stall.duration * 1000:.0f}ms")
+
+    def capture_stack(self):
+        """The main thread's current Python stack"""
+        frame = sys._current_frames().get(self.main_thread_id)
+        return traceback.extract_stack(frame) if frame is not None else None
+
+    def monitor(self):
+        """Monitor thread: capture the stack once per stall, while the loop is stuck"""
+        captured_for = None
+        while not self._stop.wait(self.poll_interval):
+            beat = self.last_beat
+            if beat != captured_for and time.perf_counter() - beat - self.interval > self.threshold:
+                self._pending_stack = self.capture_stack()
+                captured_for = beat
+
+    def start(self):
+        """Start the heartbeat timer and the monitor thread (from the event loop thread)"""
+        from PySide6.QtCore import QTimer, Qt
+
+        self.main_thread_id = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.beat)
+        self._timer.start(max(1, int(self.interval * 1000)))
+        self._thread = threading.Thread(target=self.monitor, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching and log the sites that stalled most"""
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.stop()
+        if self.stall_count:
+            print_warning(f"{self.stall_count} event loop stalls this session; most frequent: "
+                          + ", ".join(f"{site} ({count})" for site, count in self.sites.most_common(5)))
+
+
+def stall_threshold_ms():
+    """The threshold set by MELO_STALL_MS (0 for off), or the default if it is unset or invalid"""
+    value = os.getenv(STALL_THRESHOLD_ENV)
+    if value is None:
+        return STALL_THRESHOLD_MS
+    try:
+        threshold_ms = float(value)
+    except ValueError:
+        threshold_ms = math.nan
+    # nan, inf and negative values would never (or always) report a stall
+    if math.isfinite(threshold_ms) and threshold_ms >= 0:
+        return threshold_ms
+    print_warning(f"Ignoring {STALL_THRESHOLD_ENV}={value!r}, not a positive number of milliseconds "
+                  f"(or 0 for off); using {STALL_THRESHOLD_MS}")
+    return STALL_THRESHOLD_MS
+
+
+def start_watchdog(threshold_ms=None):
+    """
+    Start watching the running Qt event loop's thread.
+
+    Args:
+        threshold_ms (float): Stall threshold, defaults to MELO_STALL_MS
+
+    Returns:
+        StallWatchdog or None: The watchdog, or None if it is turned off
+    """
+    if threshold_ms is None:
+        threshold_ms = stall_threshold_ms()
+    if threshold_ms <= 0:
+        return None
+    watchdog = StallWatchdog(threshold_ms)
+    watchdog.start()
+    return watchdog
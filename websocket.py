@@ -0,0 +1,212 @@
+"""
+websocket.py
+
+Minimal WebSocket (RFC 6455) support on asyncio streams for the Song-Guesser server.
+Covers what the game needs: the HTTP upgrade handshake, text messages (fragmented or
+not), ping/pong and close. Frames are encoded once as bytes, so a message sent to many
+players is serialized a single time.
+"""
+
+import asyncio
+import base64
+import hashlib
+import struct
+
+# Key suffix from RFC 6455 section 1.3
+HANDSHAKE_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Largest message accepted from a client; game messages are a few hundred bytes
+MAX_MESSAGE_SIZE = 64 * 1024
+
+CLOSE_NORMAL = 1000
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_TOO_BIG = 1009
+
+
+class WebSocketError(Exception):
+    """Protocol violation by the client; the connection is closed with code"""
+
+    def __init__(self, message, code=CLOSE_PROTOCOL_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept value for a client's Sec-WebSocket-Key"""
+    digest = hashlib.sha1((key + HANDSHAKE_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def handshake_response(key):
+    """
+    HTTP response accepting a WebSocket upgrade.
+
+    Args:
+        key (str): The client's Sec-WebSocket-Key header
+
+    Returns:
+        bytes: Response to write before switching to frames
+    """
+    return ("HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(key)}\r\n"
+            "\r\n").encode("ascii")
+
+
+def encode_frame(payload, opcode=OP_TEXT):
+    """
+    Encode one unfragmented, unmasked (server to client) frame.
+
+    Args:
+        payload (bytes or str): Message; str is sent as UTF-8
+        opcode (int): Frame opcode
+
+    Returns:
+        bytes: The frame, ready to be written to any number of connections
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def unmask(payload, mask):
+    """XOR a client payload with its 4-byte masking key, a machine word at a time"""
+    length = len(payload)
+    if not length:
+        return payload
+    key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+    return (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+
+
+class WebSocket:
+    """
+    A server-side WebSocket connection over an asyncio stream pair.
+    """
+
+    __slots__ = ("reader", "writer", "max_message_size", "closed")
+
+    def __init__(self, reader, writer, max_message_size=MAX_MESSAGE_SIZE):
+        """
+        Args:
+            reader (asyncio.StreamReader): Connection reader, after the handshake
+            writer (asyncio.StreamWriter): Connection writer, after the handshake
+            max_message_size (int): Largest accepted message in bytes
+        """
+        self.reader = reader
+        self.writer = writer
+        self.max_message_size = max_message_size
+        self.closed = False
+
+    async def _read_frame(self):
+        """Read one frame: (fin, opcode, payload)"""
+        first, second = await self.reader.readexactly(2)
+        fin = bool(first & 0x80)
+        opcode = first & 0x0F
+        if not second & 0x80:
+            raise WebSocketError("Client frames must be masked")
+
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await self.reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await self.reader.readexactly(8))[0]
+        if length > self.max_message_size:
+            raise WebSocketError("Message too big", CLOSE_TOO_BIG)
+
+        mask = await self.reader.readexactly(4)
+        payload = unmask(await self.reader.readexactly(length), mask)
+        return fin, opcode, payload
+
+    async def receive(self):
+        """
+        Wait for the next text message, answering pings along the way.
+
+        Returns:
+            str or None: The message, or None once the connection is closed
+        """
+        fragments = []
+        size = 0
+        while not self.closed:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+            except WebSocketError as e:
+                await self.close(e.code)
+                return None
+
+            if opcode == OP_PING:
+                await self.send_frame(encode_frame(payload, OP_PONG))
+            elif opcode == OP_PONG:
+                continue
+            elif opcode == OP_CLOSE:
+                await self.close()
+                return None
+            elif opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                if (opcode == OP_CONTINUATION) != bool(fragments):
+                    await self.close(CLOSE_PROTOCOL_ERROR)
+                    return None
+                size += len(payload)
+                if size > self.max_message_size:
+                    await self.close(CLOSE_TOO_BIG)
+                    return None
+                fragments.append(payload)
+                if fin:
+                    try:
+                        return b"".join(fragments).decode("utf-8")
+                    except UnicodeDecodeError:
+                        await self.close(CLOSE_PROTOCOL_ERROR)
+                        return None
+            else:
+                await self.close(CLOSE_PROTOCOL_ERROR)
+                return None
+        return None
+
+    async def send_frame(self, frame):
+        """
+        Write an already encoded frame (see encode_frame).
+
+        Returns:
+            bool: False if the connection is gone
+        """
+        if self.closed:
+            return False
+        try:
+            self.writer.write(frame)
+            await self.writer.drain()
+        except ConnectionError:
+            self.closed = True
+            return False
+        return True
+
+    async def send_text(self, text):
+        """Send a text message"""
+        return await self.send_frame(encode_frame(text))
+
+    async def close(self, code=CLOSE_NORMAL):
+        """Send a close frame (once) and close the connection"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.writer.write(encode_frame(struct.pack("!H", code), OP_CLOSE))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()